@@ -0,0 +1,242 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import platform
+import resource
+import statistics
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import aclosing
+from pathlib import Path
+from typing import Any, Optional
+
+from src.schemas.collector.place import PlaceSchema
+from src.schemas.collector.review import dump_reviews
+from src.services.collector.request_metrics import RequestMetrics, RequestTiming
+from src.utils.constants import DETAILS_CONCURRENCY, PLACE_TYPES_FUNCTION
+
+from benchmarks.fixtures import load_fixtures
+from benchmarks.server import ServerProfile, StandInServer
+
+# Scraper settings compared by the benchmark, on top of the shared ones below
+MODES = {
+    "html-beautifulsoup": {"parser_backend": "beautifulsoup"},
+    "html-lxml": {"parser_backend": "lxml"},
+    "html-lxml-process": {"parser_backend": "lxml", "parse_executor": "process"},
+    "graphql-lxml": {"parser_backend": "lxml", "reviews_source": "graphql"},
+}
+
+
+class LatencyRecorder(RequestMetrics):
+    def __init__(self) -> None:
+        super().__init__()
+        self.latencies: list[float] = []
+
+    def record(self, url: str, timing: RequestTiming, status: Optional[int]) -> None:
+        super().record(url, timing=timing, status=status)
+        if timing.started_at is not None and status is not None:
+            self.latencies.append(time.perf_counter() - timing.started_at)
+
+
+def cpu_seconds() -> float:
+    # Parse workers run as child processes, their time counts too
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime + children.ru_utime + children.ru_stime
+
+
+def percentiles(values: list[float]) -> dict[str, Optional[float]]:
+    if len(values) < 2:
+        return {"p50": None, "p95": None, "p99": None}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {
+        "p50": round(cuts[49] * 1000, 2),
+        "p95": round(cuts[94] * 1000, 2),
+        "p99": round(cuts[98] * 1000, 2),
+    }
+
+
+async def scrape(
+    base_url: str, mode: dict, place_type: str, queries: int, config: dict
+) -> dict:
+    from src.services.collector.reviews_scraper import PageFetchError, ReviewsScraper
+
+    search_func, _, iter_details_func = PLACE_TYPES_FUNCTION[place_type]
+    request_metrics = LatencyRecorder()
+    scraper = ReviewsScraper(
+        use_apify_proxies=False,
+        requests_per_second=0,
+        request_metrics=request_metrics,
+        base_url=base_url,
+        **mode,
+    )
+    # Every run looks locations up again instead of reading a stored result
+    scraper.location_cache.store_name = None
+    counts = {"places": 0, "review_pages": 0, "reviews": 0, "failed_places": 0}
+
+    async def scrape_place(url_path: str) -> None:
+        stream = getattr(scraper, iter_details_func)(
+            url_path=url_path, max_reviews_page=config["max_reviews_page"]
+        )
+        try:
+            async with aclosing(stream) as items:
+                async for item in items:
+                    if isinstance(item, PlaceSchema):
+                        counts["places"] += 1
+                        item.model_dump(exclude={"reviews"})
+                        reviews = item.reviews or []
+                    else:
+                        reviews = item
+                    counts["review_pages"] += 1
+                    counts["reviews"] += len(dump_reviews(reviews))
+        except PageFetchError:
+            counts["failed_places"] += 1
+
+    started_at = time.perf_counter()
+    cpu_started_at = cpu_seconds()
+    async with scraper:
+        results = await asyncio.gather(
+            *(
+                getattr(scraper, search_func)(
+                    query=f"Hanoi {i}", max_places_page=config["max_places_page"]
+                )
+                for i in range(queries)
+            )
+        )
+        urls = list(
+            dict.fromkeys(place.url for places in results for place in places or [])
+        )
+        semaphore = asyncio.Semaphore(config["details_concurrency"])
+
+        async def limited(url_path: str) -> None:
+            async with semaphore:
+                await scrape_place(url_path)
+
+        await asyncio.gather(*(limited(url) for url in urls))
+    elapsed = time.perf_counter() - started_at
+    # Children only show up in RUSAGE_CHILDREN once they exited and were joined
+    for child in multiprocessing.active_children():
+        child.join(timeout=10)
+    cpu = cpu_seconds() - cpu_started_at
+
+    statuses: dict[str, int] = {}
+    for endpoint in request_metrics.summary()["endpoints"].values():
+        for status, count in endpoint["statuses"].items():
+            statuses[status] = statuses.get(status, 0) + count
+    return {
+        **counts,
+        "seconds": round(elapsed, 3),
+        "requests": sum(statuses.values()),
+        "statuses": statuses,
+        "requests_per_sec": round(sum(statuses.values()) / elapsed, 2),
+        "review_pages_per_sec": round(counts["review_pages"] / elapsed, 2),
+        "reviews_per_sec": round(counts["reviews"] / elapsed, 2),
+        "latency_ms": percentiles(request_metrics.latencies),
+        "cpu_seconds": round(cpu, 3),
+        "cpu_ms_per_review": (
+            round(cpu * 1000 / counts["reviews"], 4) if counts["reviews"] else None
+        ),
+        # Linux reports the peak in KiB
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+    }
+
+
+def run_mode(
+    base_url: str, mode: dict, place_type: str, queries: int, config: dict
+) -> dict:
+    return asyncio.run(scrape(base_url, mode, place_type, queries, config))
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def benchmark(args: argparse.Namespace) -> dict[str, Any]:
+    profile = ServerProfile(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        seed=args.seed,
+    )
+    server = StandInServer(
+        load_fixtures(directory=args.fixtures_dir, seed=args.seed), profile=profile
+    )
+    config = {
+        "max_places_page": args.max_places_page,
+        "max_reviews_page": args.max_reviews_page,
+        "details_concurrency": args.details_concurrency,
+    }
+    report: dict[str, Any] = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "started_at": time.time(),
+        "place_type": args.type,
+        "queries": args.queries,
+        "server": vars(profile),
+        "config": config,
+        "modes": {},
+    }
+
+    await server.start()
+    loop = asyncio.get_running_loop()
+    try:
+        for name in args.modes:
+            server.requests.clear()
+            # A fresh process per mode keeps peak RSS and CPU time separate
+            with ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                result = await loop.run_in_executor(
+                    executor,
+                    run_mode,
+                    server.base_url,
+                    MODES[name],
+                    args.type,
+                    args.queries,
+                    config,
+                )
+            report["modes"][name] = {**result, "server_requests": dict(server.requests)}
+    finally:
+        await server.stop()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="End-to-end scraper benchmark")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--type", choices=list(PLACE_TYPES_FUNCTION), default="hotels")
+    parser.add_argument("--queries", type=int, default=1)
+    parser.add_argument("--max-places-page", type=int, default=2)
+    parser.add_argument("--max-reviews-page", type=int, default=5)
+    parser.add_argument("--details-concurrency", type=int, default=DETAILS_CONCURRENCY)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fixtures-dir", type=Path, default=None)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    report = asyncio.run(benchmark(args))
+    output = json.dumps(report, indent=2)
+    if args.output is not None:
+        args.output.write_text(output, encoding="utf-8")
+    print(output)  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import json
+import random
+from pathlib import Path
+from typing import Optional
+
+# Synthetic pages that mirror the markup the scraper selects on. Recorded pages can
+# be dropped into a directory as <kind>*.html and loaded with load_fixtures instead.
+FIXTURE_KINDS = (
+    "attractions_search",
+    "hotels_search",
+    "restaurants_search",
+    "attraction_details",
+    "hotel_details",
+    "restaurant_details",
+)
+
+WORDS = (
+    "amazing view old quarter lake temple guide food street market night tour "
+    "friendly staff clean room breakfast pool walk river boat history museum"
+).split()
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def filler(rng: random.Random, size_kb: int) -> str:
+    # TripAdvisor pages are mostly unrelated markup and inline state blobs
+    blocks = []
+    size = 0
+    while size < size_kb * 1024:
+        state = {f"k{i}": sentence(rng, 6) for i in range(20)}
+        block = (
+            f'<div class="c{rng.randrange(10**6)} _T"><span>{sentence(rng, 12)}</span>'
+            f"<ul>{''.join(f'<li>{sentence(rng, 3)}</li>' for _ in range(5))}</ul></div>"
+            f"<script>window.__WEB_CONTEXT__={json.dumps(state)}</script>"
+        )
+        blocks.append(block)
+        size += len(block)
+    return "".join(blocks)
+
+
+def page(body: str, head: str = "") -> str:
+    return f"<!DOCTYPE html><html><head>{head}</head><body>{body}</body></html>"
+
+
+def json_ld(rng: random.Random, name: str, review_count: int) -> str:
+    data = {
+        "@context": "https://schema.org",
+        "@type": "LocalBusiness",
+        "name": name,
+        "url": f"/Attraction_Review-g293924-d{rng.randrange(10**6)}-Reviews.html",
+        "priceRange": "$$",
+        "aggregateRating": {
+            "@type": "AggregateRating",
+            "ratingValue": "4.5",
+            "reviewCount": review_count,
+        },
+        "address": {
+            "@type": "PostalAddress",
+            "streetAddress": sentence(rng, 3),
+            "addressLocality": "Hanoi",
+            "postalCode": "100000",
+            "addressCountry": {"@type": "Country", "name": "Vietnam"},
+        },
+        "image": "https://media-cdn.tripadvisor.com/media/photo-o/image.jpg",
+    }
+    return f'<script type="application/ld+json">{json.dumps(data)}</script>'
+
+
+def attractions_search_page(
+    rng: random.Random, cards: int = 30, total: int = 1200, size_kb: int = 400
+) -> str:
+    body = "".join(
+        '<section class="mowmC" data-automation="WebPresentation_SingleFlexCardSection">'
+        f'<header class="VLKGO"><a href="/Attraction_Review-g293924-d{rng.randrange(10**6)}'
+        f'-Reviews-Place_{i}-Hanoi.html"><h3>{i + 1}. {sentence(rng, 3)}</h3></a>'
+        f'<a href="/Attraction_Review-g293924-d{i}-Reviews.html#REVIEWS">reviews</a></header>'
+        "</section>"
+        for i in range(cards)
+    )
+    body += (
+        '<section data-automation="WebPresentation_WebSortDisclaimer">'
+        f"<span>{total} results match your filters</span></section>"
+        '<a aria-label="Next page" href="/Attractions-g293924-Activities-oa30-Hanoi.html">'
+        "Next</a>"
+    )
+    return page(filler(rng, size_kb // 2) + body + filler(rng, size_kb // 2))
+
+
+def hotels_search_page(
+    rng: random.Random, cards: int = 30, total: int = 1200, size_kb: int = 400
+) -> str:
+    body = "".join(
+        '<span class="listItem"><div data-automation="hotel-card-title">'
+        f'<a href="/Hotel_Review-g293924-d{rng.randrange(10**6)}-Reviews-Hotel_{i}.html">'
+        f"<h3>{i + 1}. {sentence(rng, 3)}</h3></a></div></span>"
+        for i in range(cards)
+    )
+    body += (
+        f"<span>{total:,} properties</span>"
+        '<a aria-label="Next page" href="/Hotels-g293924-oa30-Hanoi-Hotels.html">'
+        "Next</a>"
+    )
+    return page(filler(rng, size_kb // 2) + body + filler(rng, size_kb // 2))
+
+
+def restaurants_search_page(
+    rng: random.Random, cards: int = 30, total: int = 1200, size_kb: int = 400
+) -> str:
+    body = ""
+    for i in range(cards):
+        url = (
+            f"/Restaurant_Review-g293924-d{rng.randrange(10**6)}-Reviews-Place_{i}.html"
+        )
+        body += (
+            f'<div data-automation="restaurantCard"><a href="{url}"><img src="x.jpg"></a>'
+            f'<div><a href="{url}"><span>{i + 1}.</span> {sentence(rng, 3)}</a></div>'
+            f'<a href="{url}#REVIEWS">{rng.randint(1, 900)} reviews</a></div>'
+        )
+    body += (
+        f"<span>{total:,} results</span>"
+        '<a aria-label="Next page" href="/Restaurants-g293924-oa30-Hanoi.html">'
+        "Next</a>"
+    )
+    return page(filler(rng, size_kb // 2) + body + filler(rng, size_kb // 2))
+
+
+def attraction_details_page(
+    rng: random.Random, reviews: int = 10, review_count: int = 2500, size_kb: int = 800
+) -> str:
+    cards = "".join(
+        f'<div data-automation="reviewCard"><svg><title id="lithium-{i}">'
+        f"{rng.randint(1, 5)},0 of 5 bubbles</title></svg>"
+        f'<a href="/ShowUserReviews-g293924-d1-r{rng.randrange(10**9)}-Place.html">'
+        f"<span>{sentence(rng, 5)}</span></a>"
+        f'<div class="fIrGe _T"><span>{sentence(rng, 60)}</span></div>'
+        f'<div class="RpeCd">{rng.choice(["Mar", "Apr", "Dec"])} 2024 • Couples</div>'
+        "</div>"
+        for i in range(reviews)
+    )
+    body = f'<div class="fIrGe _T">{sentence(rng, 40)}</div>' + cards
+    head = json_ld(rng, sentence(rng, 3), review_count)
+    return page(filler(rng, size_kb // 2) + body + filler(rng, size_kb // 2), head)
+
+
+def hotel_details_page(
+    rng: random.Random, reviews: int = 10, review_count: int = 2500, size_kb: int = 800
+) -> str:
+    amenities = "".join(
+        f'<div data-test-target="amenity_text">{sentence(rng, 2)}</div>'
+        for _ in range(15)
+    )
+    cards = "".join(
+        f'<div data-reviewid="{rng.randrange(10**9)}">'
+        '<div data-test-target="review-rating"><svg>'
+        f"<title>{rng.randint(1, 5)},0 of 5 bubbles</title></svg></div>"
+        '<div data-test-target="review-title"><a href="/ShowUserReviews">'
+        f"<span><span>{sentence(rng, 5)}</span></span></a></div>"
+        f'<span data-automation="reviewText_{i}"><span>{sentence(rng, 60)}</span></span>'
+        f'<div class="PDZqu"><span>Date of stay: {rng.choice(["march", "june"])} 2024'
+        "</span></div></div>"
+        for i in range(reviews)
+    )
+    body = f'<div class="fIrGe _T">{sentence(rng, 40)}</div>' + amenities + cards
+    head = json_ld(rng, sentence(rng, 3), review_count)
+    return page(filler(rng, size_kb // 2) + body + filler(rng, size_kb // 2), head)
+
+
+GENERATORS = {
+    "attractions_search": attractions_search_page,
+    "hotels_search": hotels_search_page,
+    "restaurants_search": restaurants_search_page,
+    "attraction_details": attraction_details_page,
+    "hotel_details": hotel_details_page,
+    # Restaurant pages use the same review cards as attractions
+    "restaurant_details": attraction_details_page,
+}
+
+
+def load_fixtures(
+    directory: Optional[Path] = None, pages: int = 5, seed: int = 0
+) -> dict[str, list[str]]:
+    if directory is not None:
+        return {
+            kind: [
+                path.read_text(encoding="utf-8")
+                for path in sorted(directory.glob(f"{kind}*.html"))
+            ]
+            for kind in FIXTURE_KINDS
+        }
+
+    rng = random.Random(seed)
+    return {
+        kind: [GENERATORS[kind](rng) for _ in range(pages)] for kind in FIXTURE_KINDS
+    }
@@ -0,0 +1,82 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Any
+
+TARGET = "src.__main__"
+# Loaded on first use, so they must stay out of the startup import graph
+LAZY_MODULES = ("bs4", "soupsieve", "lxml", "fake_useragent")
+# Enforced by tests/test_importtime.py, with headroom over the ~0.9s measured locally
+BUDGET_MS = 1500
+
+
+def measure(target: str) -> dict[str, tuple[int, int]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        if not self_us.strip().isdigit():
+            continue
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def median_total_ms(runs: list[dict[str, tuple[int, int]]], target: str) -> float:
+    return statistics.median(run[target][1] for run in runs) / 1000
+
+
+def eager_lazy_modules(modules: dict[str, tuple[int, int]]) -> list[str]:
+    return sorted(
+        name
+        for name in modules
+        if name.split(".")[0] in LAZY_MODULES and "." not in name
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Actor startup import time check")
+    parser.add_argument("--target", default=TARGET)
+    parser.add_argument("--repeat", type=int, default=5)
+    # Mostly apify, crawlee and aiohttp, so only enforced when asked for
+    parser.add_argument("--budget-ms", type=float)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    runs = [measure(args.target) for _ in range(args.repeat)]
+    total_ms = median_total_ms(runs, args.target)
+    last_run = runs[-1]
+    eager = eager_lazy_modules(last_run)
+
+    report: dict[str, Any] = {
+        "target": args.target,
+        "total_ms": round(total_ms, 1),
+        "budget_ms": args.budget_ms,
+        "eager_lazy_modules": eager,
+        "slowest": [
+            {"module": name, "self_ms": round(self_us / 1000, 1)}
+            for name, (self_us, _) in sorted(
+                last_run.items(), key=lambda item: item[1][0], reverse=True
+            )[: args.top]
+        ],
+    }
+    print(json.dumps(report, indent=2))  # noqa: T201
+
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        msg = f"Startup imports took {total_ms:.0f}ms, budget is {args.budget_ms:.0f}ms"
+        raise SystemExit(msg)
+    if eager:
+        msg = f"Modules imported at startup instead of on first use: {', '.join(eager)}"
+        raise SystemExit(msg)
+
+
+if __name__ == "__main__":
+    main()
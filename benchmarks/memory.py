@@ -0,0 +1,94 @@
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+from typing import Any, Callable, Optional
+
+from src.schemas.base import SnakeCaseAliasMixin
+from src.schemas.collector.review import CompactReview, dump_reviews
+
+from benchmarks.fixtures import sentence
+
+
+# The per-review pydantic model the scraper used before CompactReview
+class ReviewSchema(SnakeCaseAliasMixin):
+    title: Optional[str] = None
+    text: Optional[str] = None
+    rate: Optional[str] = None
+    trip_date: Optional[str] = None
+
+
+MONTHS = [
+    f"tháng {month} năm {year}" for year in (2023, 2024) for month in range(1, 13)
+]
+
+
+def review_dicts(count: int, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    # Fresh strings per review, the way a parser hands them over
+    return [
+        {
+            "title": sentence(rng, 6),
+            "text": sentence(rng, 60),
+            "rate": "".join(str(rng.randint(1, 5))),
+            "trip_date": "".join(rng.choice(MONTHS)),
+        }
+        for _ in range(count)
+    ]
+
+
+def measure(
+    build: Callable[[list[dict]], list],
+    dump: Callable[[list], list],
+    count: int,
+    seed: int,
+) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    # Parsed dicts are dropped once converted, only what the reviews hold stays
+    reviews = build(review_dicts(count, seed))
+    gc.collect()
+    held_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started_at = time.perf_counter()
+    dump(reviews)
+    dump_ms = (time.perf_counter() - started_at) * 1000
+    return {
+        "held_mb": round(held_bytes / 1024 / 1024, 2),
+        "bytes_per_review": round(held_bytes / count),
+        "dump_ms": round(dump_ms, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Review representation memory benchmark"
+    )
+    parser.add_argument("--reviews", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    report: dict[str, Any] = {"reviews": args.reviews}
+    report["pydantic"] = measure(
+        lambda data: [ReviewSchema.model_validate(review) for review in data],
+        lambda reviews: [review.model_dump() for review in reviews],
+        args.reviews,
+        args.seed,
+    )
+    report["compact"] = measure(
+        lambda data: [CompactReview.from_dict(review) for review in data],
+        dump_reviews,
+        args.reviews,
+        args.seed,
+    )
+    report["saved"] = round(
+        1 - report["compact"]["held_mb"] / report["pydantic"]["held_mb"], 2
+    )
+    print(json.dumps(report, indent=2))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Any
+
+from src.services.collector.parsers.executor import parse_page
+from src.services.collector.parsers.registry import PARSER_BACKENDS
+
+from benchmarks.fixtures import load_fixtures
+
+EXTRACTORS = {
+    "attractions_search": (
+        "parse_search_attractions",
+        "parse_total_attractions",
+        "parse_next_page",
+    ),
+    "hotels_search": ("parse_search_hotel", "parse_total_hotels", "parse_next_page"),
+    "restaurants_search": (
+        "parse_search_restaurants",
+        "parse_total_restaurants",
+        "parse_next_page",
+    ),
+    "attraction_details": ("parse_attraction_details",),
+    "hotel_details": ("parse_hotel_details",),
+    "restaurant_details": ("parse_restaurant_details",),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Parser backends benchmark")
+    parser.add_argument("--fixtures-dir", type=Path, default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(directory=args.fixtures_dir)
+
+    report: dict[str, Any] = {}
+    mismatches = []
+    for kind, extractors in EXTRACTORS.items():
+        pages = fixtures[kind]
+        if not pages:
+            continue
+
+        report[kind] = {"pages": len(pages)}
+        outputs = {}
+        for name in PARSER_BACKENDS:
+            timings = []
+            for _ in range(args.repeat):
+                for html in pages:
+                    started_at = time.perf_counter()
+                    parse_page(name, html, extractors)
+                    timings.append(time.perf_counter() - started_at)
+
+            outputs[name] = [parse_page(name, html, extractors) for html in pages]
+            report[kind][f"{name}_ms_per_page"] = round(
+                statistics.median(timings) * 1000, 2
+            )
+
+        reference = next(iter(outputs.values()))
+        for name, output in outputs.items():
+            if output != reference:
+                mismatches.append(f"{kind}: {name}")
+        report[kind]["identical"] = all(o == reference for o in outputs.values())
+
+    print(json.dumps(report, indent=2))  # noqa: T201
+    if mismatches:
+        msg = f"Parser output mismatch: {', '.join(mismatches)}"
+        raise SystemExit(msg)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Callable
+
+from src.services.collector.parsers.soup_parser import SoupPageParser
+
+from benchmarks.fixtures import load_fixtures
+
+
+def double_parse_attractions(parser: SoupPageParser, html: str) -> None:
+    # The search flow before the single-parse change
+    parser.parse_search_attractions(parser.parse_document(html))
+    document = parser.parse_document(html)
+    parser.parse_total_attractions(document)
+    parser.parse_next_page(document)
+
+
+def single_parse_attractions(parser: SoupPageParser, html: str) -> None:
+    document = parser.parse_document(html)
+    parser.parse_search_attractions(document)
+    parser.parse_total_attractions(document)
+    parser.parse_next_page(document)
+
+
+def double_parse_hotels(parser: SoupPageParser, html: str) -> None:
+    parser.parse_search_hotel(parser.parse_document(html))
+    document = parser.parse_document(html)
+    parser.parse_total_hotels(document)
+    parser.parse_next_page(document)
+
+
+def single_parse_hotels(parser: SoupPageParser, html: str) -> None:
+    document = parser.parse_document(html)
+    parser.parse_search_hotel(document)
+    parser.parse_total_hotels(document)
+    parser.parse_next_page(document)
+
+
+def measure(
+    func: Callable, parser: SoupPageParser, pages: list[str], repeat: int
+) -> float:
+    timings = []
+    for _ in range(repeat):
+        for html in pages:
+            started_at = time.perf_counter()
+            func(parser, html)
+            timings.append(time.perf_counter() - started_at)
+    return statistics.median(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Search page parse benchmark")
+    parser.add_argument("--fixtures-dir", type=Path, default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(directory=args.fixtures_dir)
+    page_parser = SoupPageParser()
+
+    cases = {
+        "attractions_search": (double_parse_attractions, single_parse_attractions),
+        "hotels_search": (double_parse_hotels, single_parse_hotels),
+    }
+
+    report = {}
+    for kind, (before, after) in cases.items():
+        pages = fixtures[kind]
+        if not pages:
+            continue
+
+        before_ms = measure(before, page_parser, pages, args.repeat)
+        after_ms = measure(after, page_parser, pages, args.repeat)
+        report[kind] = {
+            "pages": len(pages),
+            "before_ms_per_page": round(before_ms, 2),
+            "after_ms_per_page": round(after_ms, 2),
+            "speedup": round(before_ms / after_ms, 2),
+        }
+
+    print(json.dumps(report, indent=2))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import asyncio
+import random
+import re
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional
+
+from aiohttp import web
+
+from benchmarks.fixtures import sentence
+
+REVIEW_ID = re.compile(r'(data-reviewid="|-r)(\d+)')
+REVIEW_OFFSET = re.compile(r"-Reviews-or(\d+)-")
+
+# Path prefix of each page kind, checked in order
+ROUTES = (
+    ("/Attractions-", "attractions_search"),
+    ("/Hotels-", "hotels_search"),
+    ("/Restaurants-", "restaurants_search"),
+    ("/Attraction_Review-", "attraction_details"),
+    ("/Hotel_Review-", "hotel_details"),
+    ("/Restaurant_Review-", "restaurant_details"),
+)
+
+LOCATION = {
+    "localizedName": "Hanoi",
+    "url": "/Tourism-g293924-Hanoi_Vietnam-Vacations.html",
+    "isGeo": True,
+    "placeType": "CITY",
+    "ATTRACTIONS_URL": "/Attractions-g293924-Activities-Hanoi.html",
+    "HOTELS_URL": "/Hotels-g293924-Hanoi-Hotels.html",
+    "RESTAURANTS_URL": "/Restaurants-g293924-Hanoi.html",
+}
+
+
+@dataclass
+class ServerProfile:
+    latency: float = 0.05
+    jitter: float = 0.02
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    seed: int = 0
+
+
+class StandInServer:
+    def __init__(
+        self,
+        fixtures: dict[str, list[str]],
+        profile: ServerProfile,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.fixtures = fixtures
+        self.profile = profile
+        self.host = host
+        self.port = port
+        self.rng = random.Random(profile.seed)
+        self.requests: Counter[str] = Counter()
+        self.runner: Optional[web.AppRunner] = None
+        self.review_texts = [sentence(self.rng, 60) for _ in range(50)]
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        app = web.Application(client_max_size=16 * 1024 * 1024)
+        app.router.add_post("/data/graphql/ids", self.handle_graphql)
+        app.router.add_get("/{path:.*}", self.handle_page)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+        # Port 0 lets the OS pick a free one
+        self.port = self.runner.addresses[0][1]
+
+    async def stop(self) -> None:
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def delay(self) -> Optional[web.Response]:
+        # Latency first, so failures cost as much time as they do live
+        await asyncio.sleep(
+            max(self.profile.latency + self.rng.uniform(-1, 1) * self.profile.jitter, 0)
+        )
+        roll = self.rng.random()
+        if roll < self.profile.error_rate:
+            self.requests["503"] += 1
+            return web.Response(status=503)
+        if roll < self.profile.error_rate + self.profile.throttle_rate:
+            self.requests["429"] += 1
+            return web.Response(status=429, headers={"Retry-After": "1"})
+        return None
+
+    async def handle_page(self, request: web.Request) -> web.Response:
+        failure = await self.delay()
+        if failure is not None:
+            return failure
+
+        path = "/" + request.match_info["path"]
+        kind = next((kind for prefix, kind in ROUTES if path.startswith(prefix)), None)
+        pages = self.fixtures.get(kind) if kind else None
+        if not pages:
+            self.requests["404"] += 1
+            return web.Response(status=404)
+
+        self.requests[kind] += 1
+        salt = zlib.crc32(path.encode())
+        html = pages[salt % len(pages)]
+        if kind.endswith("_details"):
+            # Every review page gets its own review ids, or dedup would drop them
+            html = REVIEW_ID.sub(lambda m: f"{m.group(1)}{m.group(2)}{salt}", html)
+        return web.Response(text=html, content_type="text/html")
+
+    async def handle_graphql(self, request: web.Request) -> web.Response:
+        failure = await self.delay()
+        if failure is not None:
+            return failure
+
+        operations = await request.json()
+        self.requests["graphql"] += 1
+        self.requests["graphql_operations"] += len(operations)
+        return web.json_response(
+            [self.resolve_operation(operation) for operation in operations]
+        )
+
+    def resolve_operation(self, operation: dict) -> dict:
+        variables = operation.get("variables") or {}
+        if "request" in variables:
+            return {
+                "data": {"Typeahead_autocomplete": {"results": [{"details": LOCATION}]}}
+            }
+
+        location_id = variables.get("locationId", 0)
+        offset = variables.get("offset", 0)
+        reviews = [
+            {
+                "id": int(f"{location_id}{offset + i:06d}"),
+                "title": f"Review {offset + i}",
+                "text": self.review_texts[(offset + i) % len(self.review_texts)],
+                "rating": (offset + i) % 5 + 1,
+                "tripInfo": {"stayDate": "2024-03-31"},
+            }
+            for i in range(variables.get("limit", 10))
+        ]
+        return {"data": {"locations": [{"reviewListPage": {"reviews": reviews}}]}}
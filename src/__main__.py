@@ -1,24 +1,89 @@
 import asyncio
 
-from apify import Actor
+from apify import Actor, Configuration
 from loguru import logger as log
 
+from src.presentation.distributed_handler import handle_distributed_request
 from src.presentation.request_handler import handle_request
+from src.services.collector.dataset_writer import DatasetWriter
+from src.services.collector.metrics_reporter import MetricsReporter
+from src.services.collector.request_metrics import RequestMetrics
+from src.utils.constants import (
+    METRICS_INTERVAL,
+    PROFILE_FLAMEGRAPH_KEY,
+    PROFILE_KEY,
+    PROFILE_SAMPLE_INTERVAL,
+    RUN_SUMMARY_KEY,
+    WORK_QUEUE,
+    WORK_QUEUES,
+)
+from src.utils.profiling import get_profiler
 
 
 async def main() -> None:
-    async with Actor:
+    request_metrics = RequestMetrics()
+    profiler = get_profiler()
+    metrics_reporter = None
+    # The writer is closed before the actor exits, flushing any buffered records
+    async with Actor, DatasetWriter() as dataset_writer:
         try:
             log.info("Fetching input data...")
             input_data = await Actor.get_input() or {}
+            if input_data.get("profile", False):
+                profiler.start(
+                    sample_interval=input_data.get(
+                        "profileSampleMs", PROFILE_SAMPLE_INTERVAL * 1000
+                    )
+                    / 1000,
+                    trace_memory=input_data.get("profileMemory", False),
+                )
+            metrics_reporter = MetricsReporter(
+                interval=input_data.get("metricsIntervalSecs", METRICS_INTERVAL),
+                # Defaults to the port the platform exposes for the run's live view
+                port=(
+                    input_data.get(
+                        "metricsPort",
+                        Configuration.get_global_configuration().web_server_port,
+                    )
+                    if input_data.get("metricsServer", False)
+                    else None
+                ),
+            )
+            await metrics_reporter.start()
 
             log.info("Processing request...")
-            await handle_request(input_data=input_data)
+            work_queue = input_data.get("workQueue", WORK_QUEUE)
+            if work_queue not in WORK_QUEUES:
+                msg = f"Unknown work queue: {work_queue}"
+                raise ValueError(msg)
+            # With a work queue this run is one of several sharing the crawl
+            handler = (
+                handle_request if work_queue == "off" else handle_distributed_request
+            )
+            await handler(
+                input_data=input_data,
+                dataset_writer=dataset_writer,
+                request_metrics=request_metrics,
+            )
 
             log.info("Scraping process completed successfully.")
         except Exception as e:
             log.error(f"An error occurred during the scraping process: {e}")
             raise
+        finally:
+            if metrics_reporter is not None:
+                await metrics_reporter.stop()
+            await Actor.set_value(RUN_SUMMARY_KEY, request_metrics.summary())
+            if profiler.enabled:
+                await profiler.stop()
+                await Actor.set_value(PROFILE_KEY, profiler.report())
+                await Actor.set_value(
+                    PROFILE_FLAMEGRAPH_KEY,
+                    profiler.collapsed(),
+                    content_type="text/plain",
+                )
 
 
-asyncio.run(main())
+# Guarded so parse worker processes can import this module without running the actor
+if __name__ == "__main__":
+    asyncio.run(main())
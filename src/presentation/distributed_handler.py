@@ -0,0 +1,321 @@
+import asyncio
+import math
+import os
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Awaitable, Callable, Optional
+from urllib.parse import urljoin
+
+from loguru import logger as log
+
+from src.presentation.request_handler import (
+    build_place_record,
+    build_review_records,
+    build_scraper,
+)
+from src.schemas.collector.place import PlaceSchema
+from src.services.collector.dataset_writer import DatasetWriter, FlushCallback
+from src.services.collector.place_types import PLACE_TYPES, PlaceType
+from src.services.collector.request_metrics import RequestMetrics
+from src.services.collector.reviews_scraper import PageFetchError, ReviewsScraper
+from src.services.collector.work_queue import WorkItem, WorkQueue, create_work_queue
+from src.utils.constants import (
+    DETAILS_CONCURRENCY,
+    LEASE_POLL_INTERVAL,
+    LEASE_TIMEOUT,
+    OUTPUT_MODE,
+    OUTPUT_MODES,
+    REVIEW_PAGES_PER_ITEM,
+    WORK_ITEM_MAX_ATTEMPTS,
+    WORK_QUEUE,
+    WORK_QUEUE_NAME,
+    WORK_QUEUE_TTL,
+)
+from src.utils.metrics import MetricsRegistry, get_metrics
+
+
+@dataclass
+class DistributedCrawl:
+    scraper: ReviewsScraper
+    work_queue: WorkQueue
+    dataset_writer: DatasetWriter
+    place_type: PlaceType
+    output_mode: str
+    max_places_page: Optional[int] = None
+    max_reviews_page: Optional[int] = None
+    pages_per_item: int = REVIEW_PAGES_PER_ITEM
+    metrics: MetricsRegistry = field(default_factory=get_metrics)
+
+
+def build_work_queue(input_data: Any) -> WorkQueue:
+    return create_work_queue(
+        input_data.get("workQueue", WORK_QUEUE),
+        name=input_data.get("workQueueName", WORK_QUEUE_NAME),
+        lease_timeout=input_data.get("leaseSecs", LEASE_TIMEOUT),
+        redis_url=input_data.get("redisUrl") or os.environ.get("REDIS_URL"),
+        ttl=input_data.get("workQueueTtlSecs", WORK_QUEUE_TTL),
+    )
+
+
+async def seed_queries(
+    work_queue: WorkQueue, place_type_name: str, queries: list[str], queue_name: str
+) -> None:
+    # Every run seeds the same queries, the queue keeps only the first copy
+    for query in queries:
+        added = await work_queue.put(
+            [
+                WorkItem(
+                    id=f"query:{place_type_name}:{query}",
+                    kind="query",
+                    payload={"query": query},
+                )
+            ]
+        )
+        if not added:
+            log.warning(
+                f"Query {query} was already queued in {queue_name}, by another run of "
+                "this crawl or by an earlier crawl with the same work queue name"
+            )
+
+
+async def keep_leased(work_queue: WorkQueue, item: WorkItem) -> None:
+    # Three tries per lease period, so one failed extend does not lose the lease
+    while True:
+        await asyncio.sleep(work_queue.lease_timeout / 3)
+        try:
+            await work_queue.extend(item)
+        except Exception as e:
+            log.warning(f"Failed to extend the lease of {item.id}: {e}")
+
+
+async def push_once(
+    crawl: DistributedCrawl,
+    item: WorkItem,
+    records: list[dict],
+    on_flushed: Optional[FlushCallback] = None,
+) -> bool:
+    # A run whose lease expired may process the same item as the run that took it
+    # over. The claim is only taken once the records are stored, so a crash in
+    # between pushes them again on retry: delivery is at least once
+    if await crawl.work_queue.is_claimed(item.id):
+        log.info(f"Skipping {item.id}, already pushed by another run")
+        return False
+
+    await crawl.dataset_writer.push(records, on_flushed=on_flushed)
+    await crawl.dataset_writer.flush()
+    if not await crawl.work_queue.claim(item.id):
+        log.warning(f"{item.id} was pushed by another run as well")
+    return True
+
+
+async def process_query(crawl: DistributedCrawl, item: WorkItem) -> None:
+    results = await crawl.scraper.scrape_search_places(
+        crawl.place_type,
+        query=item.payload["query"],
+        max_places_page=crawl.max_places_page,
+    )
+    if results is None:
+        msg = f"Search for {item.payload['query']} failed"
+        raise PageFetchError(msg)
+
+    added = await crawl.work_queue.put(
+        [
+            WorkItem(
+                id=f"place:{result.url}",
+                kind="place",
+                payload={"url": result.url, "name": result.name},
+            )
+            for result in results
+        ]
+    )
+    log.info(f"Queued {added} new places for {item.payload['query']}")
+
+
+async def process_place(crawl: DistributedCrawl, item: WorkItem) -> None:
+    url_path = item.payload["url"]
+    place_url = urljoin(crawl.scraper.base_url, url_path)
+
+    if crawl.output_mode == "places":
+        place = await crawl.scraper.scrape_place_details(
+            crawl.place_type, url_path=url_path, max_reviews_page=crawl.max_reviews_page
+        )
+        if place is None:
+            msg = f"Failed to scrape {place_url}"
+            raise PageFetchError(msg)
+        if await push_once(
+            crawl,
+            item,
+            [place.model_dump()],
+            on_flushed=partial(
+                crawl.scraper.review_dedup.commit, place_url, place.reviews or []
+            ),
+        ):
+            crawl.metrics.inc("places_total")
+        await crawl.dataset_writer.on_flushed(
+            partial(crawl.scraper.review_watermarks.commit, place_url)
+        )
+        return
+
+    place = await crawl.scraper.fetch_place(crawl.place_type, url_path=url_path)
+    place_name = place.basic_data.name if place.basic_data else item.payload["name"]
+    await queue_review_ranges(crawl, url_path, place, place_name)
+
+    reviews = await crawl.scraper.filter_duplicates(place_url, place.reviews or [])
+    if await push_once(
+        crawl,
+        item,
+        [
+            build_place_record(place_url, place),
+            *build_review_records(place_url, place_name, reviews),
+        ],
+        on_flushed=partial(crawl.scraper.review_dedup.commit, place_url, reviews),
+    ):
+        crawl.metrics.inc("places_total")
+
+
+async def queue_review_ranges(
+    crawl: DistributedCrawl, url_path: str, place: PlaceSchema, place_name: str
+) -> None:
+    # The review pages after the details page are split into items other runs can take
+    page_size = len(place.reviews or [])
+    if page_size == 0:
+        return
+
+    total_reviews = int(place.basic_data.aggregate_rating.review_count or 0)
+    total_pages = math.ceil(total_reviews / page_size)
+    if crawl.max_reviews_page and crawl.max_reviews_page < total_pages:
+        total_pages = crawl.max_reviews_page
+
+    await crawl.work_queue.put(
+        [
+            WorkItem(
+                id=f"reviews:{url_path}:{start_page}",
+                kind="reviews",
+                payload={
+                    "url": url_path,
+                    "name": place_name,
+                    "page_size": page_size,
+                    "start_page": start_page,
+                    "end_page": min(start_page + crawl.pages_per_item, total_pages),
+                },
+            )
+            for start_page in range(1, total_pages, crawl.pages_per_item)
+        ]
+    )
+
+
+async def process_reviews(crawl: DistributedCrawl, item: WorkItem) -> None:
+    url_path = item.payload["url"]
+    place_url = urljoin(crawl.scraper.base_url, url_path)
+    reviews = []
+    # Raises on a failed page, so the whole range is retried
+    try:
+        async for page in crawl.scraper.iter_review_range(
+            crawl.place_type,
+            url_path=url_path,
+            page_size=item.payload["page_size"],
+            start_page=item.payload["start_page"],
+            end_page=item.payload["end_page"],
+        ):
+            reviews.extend(page)
+    except Exception:
+        crawl.scraper.review_dedup.forget(place_url, reviews)
+        raise
+
+    # The whole range is pushed at once, so a retried item never pushes half of it
+    if reviews:
+        await push_once(
+            crawl,
+            item,
+            build_review_records(place_url, item.payload["name"], reviews),
+            on_flushed=partial(crawl.scraper.review_dedup.commit, place_url, reviews),
+        )
+    log.info(
+        f"Pushed {len(reviews)} reviews of pages {item.payload['start_page']}-"
+        f"{item.payload['end_page'] - 1} for {item.payload['name']}"
+    )
+
+
+PROCESSORS: dict[str, Callable[[DistributedCrawl, WorkItem], Awaitable[None]]] = {
+    "query": process_query,
+    "place": process_place,
+    "reviews": process_reviews,
+}
+
+
+async def process_item(crawl: DistributedCrawl, item: WorkItem) -> None:
+    heartbeat = asyncio.create_task(keep_leased(crawl.work_queue, item))
+    try:
+        await PROCESSORS[item.kind](crawl, item)
+        await crawl.work_queue.ack(item)
+        crawl.metrics.inc("work_items_total", kind=item.kind, outcome="done")
+    except Exception as e:
+        log.error(f"Error in processing {item.id} (attempt {item.attempts}): {e}")
+        if item.attempts >= WORK_ITEM_MAX_ATTEMPTS:
+            log.error(f"Giving up on {item.id}")
+            await crawl.work_queue.ack(item)
+            crawl.metrics.inc("work_items_total", kind=item.kind, outcome="failed")
+        else:
+            await crawl.work_queue.nack(item)
+            crawl.metrics.inc("work_items_total", kind=item.kind, outcome="retried")
+    finally:
+        heartbeat.cancel()
+
+
+async def run_worker(crawl: DistributedCrawl) -> None:
+    while True:
+        items = await crawl.work_queue.lease()
+        if not items:
+            # Leased items of other runs may still queue more work
+            if await crawl.work_queue.is_drained():
+                return
+            await asyncio.sleep(LEASE_POLL_INTERVAL)
+            continue
+
+        [item] = items
+        await process_item(crawl, item)
+
+
+async def handle_distributed_request(
+    input_data: Any,
+    dataset_writer: DatasetWriter,
+    request_metrics: Optional[RequestMetrics] = None,
+) -> None:
+    params = input_data.get("params", {})
+    place_type_name = input_data.get("type", "attractions")
+
+    output_mode = input_data.get("outputMode", OUTPUT_MODE)
+    if output_mode not in OUTPUT_MODES:
+        msg = f"Unknown output mode: {output_mode}"
+        raise ValueError(msg)
+
+    crawl = DistributedCrawl(
+        scraper=build_scraper(input_data, request_metrics=request_metrics),
+        work_queue=build_work_queue(input_data),
+        dataset_writer=dataset_writer,
+        place_type=PLACE_TYPES[place_type_name],
+        output_mode=output_mode,
+        max_places_page=params.get("max_places_page", None),
+        max_reviews_page=params.get("max_reviews_page", None),
+        pages_per_item=max(
+            input_data.get("reviewPagesPerItem", REVIEW_PAGES_PER_ITEM), 1
+        ),
+    )
+    workers = max(input_data.get("detailsConcurrency", DETAILS_CONCURRENCY), 1)
+
+    await crawl.work_queue.open()
+    try:
+        await seed_queries(
+            crawl.work_queue,
+            place_type_name,
+            params.get("query", []),
+            queue_name=input_data.get("workQueueName", WORK_QUEUE_NAME),
+        )
+        async with crawl.scraper:
+            try:
+                await asyncio.gather(*(run_worker(crawl) for _ in range(workers)))
+            finally:
+                # Records left by a failed flush, before the review index closes
+                await crawl.dataset_writer.flush()
+    finally:
+        await crawl.work_queue.close()
@@ -1,42 +1,297 @@
-from typing import Any
+import asyncio
+from contextlib import aclosing
+from functools import partial
+from typing import Any, Optional, Union
+from urllib.parse import urljoin
 
-from apify import Actor
 from loguru import logger as log
 
+from src.schemas.collector.place import PlaceSchema
+from src.schemas.collector.review import CompactReview, dump_reviews
+from src.schemas.collector.search import SearchSchema
+from src.services.collector.checkpoint import CrawlCheckpoint
+from src.services.collector.dataset_writer import DatasetWriter, FlushCallback
+from src.services.collector.request_metrics import RequestMetrics
 from src.services.collector.reviews_scraper import ReviewsScraper
-from src.utils.constants import PLACE_TYPES_FUNCTION
+from src.utils.constants import (
+    BURST,
+    CACHE_MAX_SIZE_MB,
+    CACHE_MODE,
+    CONCURRENCY,
+    CONNECT_TIMEOUT,
+    DETAILS_CONCURRENCY,
+    GRAPHQL_BATCH_SIZE,
+    MAX_CONCURRENCY,
+    OUTPUT_MODE,
+    OUTPUT_MODES,
+    PARSE_EXECUTOR,
+    PARSER_BACKEND,
+    PLACE_TYPES_FUNCTION,
+    QUERY_CONCURRENCY,
+    READ_TIMEOUT,
+    REQUEST_DEADLINE,
+    REQUESTS_PER_SECOND,
+    RETRY_ATTEMPTS,
+    REVIEWS_SOURCE,
+    TOTAL_TIMEOUT,
+)
+from src.utils.metrics import get_metrics
+from src.utils.profiling import get_profiler
 
 
-async def handle_request(input_data: Any) -> None:
-    use_apify_proxies = input_data.get("useApifyProxy", False)
-    scraper = ReviewsScraper(use_apify_proxies=use_apify_proxies)
+def build_scraper(
+    input_data: Any, request_metrics: Optional[RequestMetrics] = None
+) -> ReviewsScraper:
+    return ReviewsScraper(
+        use_apify_proxies=input_data.get("useApifyProxy", False),
+        proxy_urls=input_data.get("proxyUrls"),
+        concurrency=input_data.get("concurrency", CONCURRENCY),
+        requests_per_second=input_data.get("requestsPerSecond", REQUESTS_PER_SECOND),
+        burst=input_data.get("burst", BURST),
+        max_concurrency=input_data.get("maxConcurrency", MAX_CONCURRENCY),
+        parser_backend=input_data.get("parserBackend", PARSER_BACKEND),
+        parse_executor=input_data.get("parseExecutor", PARSE_EXECUTOR),
+        cache_mode=input_data.get("cacheMode", CACHE_MODE),
+        cache_max_size_mb=input_data.get("cacheMaxSizeMb", CACHE_MAX_SIZE_MB),
+        max_retries=input_data.get("maxRetries", RETRY_ATTEMPTS),
+        request_deadline=input_data.get("requestDeadlineSecs", REQUEST_DEADLINE),
+        connect_timeout=input_data.get("connectTimeoutSecs", CONNECT_TIMEOUT),
+        read_timeout=input_data.get("readTimeoutSecs", READ_TIMEOUT),
+        total_timeout=input_data.get("totalTimeoutSecs", TOTAL_TIMEOUT),
+        request_metrics=request_metrics,
+        incremental=input_data.get("incremental", False),
+        dedup_index=input_data.get("dedupIndex", False),
+        reviews_source=input_data.get("reviewsSource", REVIEWS_SOURCE),
+        graphql_batch_size=input_data.get("graphqlBatchSize", GRAPHQL_BATCH_SIZE),
+    )
 
-    params = input_data.get("params", {})
-    places_query = params.get("query", [])
-
-    place_type = input_data.get("type", "attractions")
-    search_func, details_func = PLACE_TYPES_FUNCTION[place_type]
-
-    for place_query in places_query:
-        scrape_search_func = getattr(scraper, search_func)
-        scrape_details_func = getattr(scraper, details_func)
-        results = await scrape_search_func(
-            query=place_query,
-            max_places_page=params.get("max_places_page", None),
-            max_reviews_page=params.get("max_reviews_page", None),
+
+def build_place_record(place_url: str, place: PlaceSchema) -> dict:
+    return {
+        "record_type": "place",
+        "place_url": place_url,
+        **place.model_dump(exclude={"reviews"}),
+    }
+
+
+def build_review_records(
+    place_url: str, place_name: Optional[str], reviews: list[CompactReview]
+) -> list[dict]:
+    return [
+        {
+            "record_type": "review",
+            "place_url": place_url,
+            "place_name": place_name,
+            **review,
+        }
+        for review in dump_reviews(reviews)
+    ]
+
+
+class CrawlPipeline:
+    # Query workers feed the places they find to the details workers
+    def __init__(
+        self,
+        scraper: ReviewsScraper,
+        dataset_writer: DatasetWriter,
+        checkpoint: CrawlCheckpoint,
+        place_type: str,
+        output_mode: str,
+        params: dict,
+    ) -> None:
+        self.scraper = scraper
+        self.dataset_writer = dataset_writer
+        self.checkpoint = checkpoint
+        self.search_func, self.details_func, self.iter_details_func = (
+            PLACE_TYPES_FUNCTION[place_type]
+        )
+        self.output_mode = output_mode
+        self.max_places_page = params.get("max_places_page", None)
+        self.max_reviews_page = params.get("max_reviews_page", None)
+        self.queries: asyncio.Queue[str] = asyncio.Queue()
+        # None tells a details worker that no more search results will come
+        self.search_results: asyncio.Queue[Optional[SearchSchema]] = asyncio.Queue()
+        self.profiler = get_profiler()
+        self.metrics = get_metrics()
+
+    def seed(self, places_query: list[str]) -> None:
+        for place_query in places_query:
+            if not self.checkpoint.is_query_completed(place_query):
+                self.queries.put_nowait(place_query)
+        for pending_place in self.checkpoint.pending_places():
+            self.search_results.put_nowait(pending_place)
+
+    async def run(self, query_concurrency: int, details_concurrency: int) -> None:
+        details_workers = [
+            asyncio.create_task(self.details_worker())
+            for _ in range(max(details_concurrency, 1))
+        ]
+
+        await asyncio.gather(
+            *(self.query_worker() for _ in range(max(query_concurrency, 1)))
         )
 
-        if isinstance(results, list):
-            for result in results:
+        for _ in details_workers:
+            await self.search_results.put(None)
+        await asyncio.gather(*details_workers)
+        # Only the stop markers were left in the queue
+        self.metrics.set("queue_depth", 0, queue="places")
+
+    async def query_worker(self) -> None:
+        while not self.queries.empty():
+            place_query = self.queries.get_nowait()
+            self.metrics.set("queue_depth", self.queries.qsize(), queue="queries")
+            try:
+                await self.process_query(place_query)
+            except Exception as e:
+                log.error(f"Error in processing query {place_query}: {e}")
+
+    async def process_query(self, place_query: str) -> None:
+        scrape_search_func = getattr(self.scraper, self.search_func)
+        with self.profiler.span("query"):
+            results = await scrape_search_func(
+                query=place_query,
+                max_places_page=self.max_places_page,
+                max_reviews_page=self.max_reviews_page,
+            )
+
+        if results is None:
+            log.warning(f"Search for {place_query} failed, it is retried on resume")
+            return
+
+        for result in results:
+            if self.checkpoint.discover_place(result):
+                await self.search_results.put(result)
+        self.metrics.set("queue_depth", self.search_results.qsize(), queue="places")
+        self.checkpoint.complete_query(place_query)
+
+    async def details_worker(self) -> None:
+        push_result = (
+            self.push_reviews if self.output_mode == "reviews" else self.push_place
+        )
+        while (result := await self.search_results.get()) is not None:
+            self.metrics.set("queue_depth", self.search_results.qsize(), queue="places")
+            try:
                 log.info(f"Scraping data for {result.url}")
-                place = await scrape_details_func(
-                    url_path=result.url,
-                    max_reviews_page=params.get("max_reviews_page", None),
-                )
-                if place:
-                    log.info("Pushing result to the dataset...")
-                    await Actor.push_data(place.model_dump())
-        else:
-            if results:
-                log.info("Pushing result to the dataset...")
-                await Actor.push_data(results.model_dump())
+                with self.profiler.span("place"):
+                    await push_result(result)
+            except Exception as e:
+                log.error(f"Error in processing place {result.url}: {e}")
+
+    async def push(
+        self,
+        records: Union[dict, list[dict]],
+        on_flushed: Optional[FlushCallback] = None,
+    ) -> None:
+        # Includes any wait for the flusher when the buffer is full
+        with self.profiler.span("dataset.push"):
+            await self.dataset_writer.push(records, on_flushed=on_flushed)
+
+    async def push_place(self, result: SearchSchema) -> None:
+        scrape_details_func = getattr(self.scraper, self.details_func)
+        place = await scrape_details_func(
+            url_path=result.url, max_reviews_page=self.max_reviews_page
+        )
+        if place:
+            place_url = urljoin(self.scraper.base_url, result.url)
+            log.info("Pushing result to the dataset...")
+            with self.profiler.span("serialize.place"):
+                record = place.model_dump()
+            await self.push(
+                record,
+                on_flushed=partial(
+                    self.scraper.review_dedup.commit, place_url, place.reviews or []
+                ),
+            )
+            await self.dataset_writer.on_flushed(
+                partial(self.scraper.review_watermarks.commit, place_url)
+            )
+            self.checkpoint.complete_place(result.url)
+            self.metrics.inc("places_total")
+
+    async def push_reviews(self, result: SearchSchema) -> None:
+        # A failed page raises, leaving the cursor on it and the place pending
+        iter_details = getattr(self.scraper, self.iter_details_func)
+        place_url = urljoin(self.scraper.base_url, result.url)
+        place_name = result.name
+        pushed = 0
+        # Resumed places skip the review pages pushed before the restart
+        start_page = self.checkpoint.get_review_cursor(result.url)
+        next_page = 0
+        async with aclosing(
+            iter_details(
+                url_path=result.url,
+                max_reviews_page=self.max_reviews_page,
+                start_page=start_page,
+            )
+        ) as stream:
+            async for item in stream:
+                if isinstance(item, PlaceSchema):
+                    place_name = item.basic_data.name
+                    if start_page == 0:
+                        with self.profiler.span("serialize.place"):
+                            record = build_place_record(place_url, item)
+                        await self.push(record)
+                    reviews = item.reviews or []
+                    next_page = max(start_page, 1)
+                else:
+                    reviews = item
+                    next_page += 1
+
+                if reviews:
+                    with self.profiler.span("serialize.reviews"):
+                        records = build_review_records(place_url, place_name, reviews)
+                    await self.push(
+                        records,
+                        on_flushed=partial(
+                            self.scraper.review_dedup.commit, place_url, reviews
+                        ),
+                    )
+                    pushed += len(reviews)
+                self.checkpoint.set_review_cursor(result.url, next_page)
+
+        await self.dataset_writer.on_flushed(
+            partial(self.scraper.review_watermarks.commit, place_url)
+        )
+        self.checkpoint.complete_place(result.url)
+        self.metrics.inc("places_total")
+        log.info(f"Pushed {pushed} reviews for {place_name}")
+
+
+async def handle_request(
+    input_data: Any,
+    dataset_writer: DatasetWriter,
+    request_metrics: Optional[RequestMetrics] = None,
+) -> None:
+    params = input_data.get("params", {})
+
+    output_mode = input_data.get("outputMode", OUTPUT_MODE)
+    if output_mode not in OUTPUT_MODES:
+        msg = f"Unknown output mode: {output_mode}"
+        raise ValueError(msg)
+
+    scraper = build_scraper(input_data, request_metrics=request_metrics)
+
+    checkpoint = CrawlCheckpoint(dataset_writer=dataset_writer)
+    await checkpoint.start()
+
+    pipeline = CrawlPipeline(
+        scraper=scraper,
+        dataset_writer=dataset_writer,
+        checkpoint=checkpoint,
+        place_type=input_data.get("type", "attractions"),
+        output_mode=output_mode,
+        params=params,
+    )
+    pipeline.seed(params.get("query", []))
+
+    async with scraper:
+        try:
+            await pipeline.run(
+                query_concurrency=input_data.get("queryConcurrency", QUERY_CONCURRENCY),
+                details_concurrency=input_data.get(
+                    "detailsConcurrency", DETAILS_CONCURRENCY
+                ),
+            )
+        finally:
+            await checkpoint.stop()
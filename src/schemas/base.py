@@ -4,5 +4,8 @@ from pydantic.alias_generators import to_camel
 
 class SnakeCaseAliasMixin(BaseModel):
     model_config = ConfigDict(
-        alias_generator=to_camel, populate_by_name=True, from_attributes=True
+        alias_generator=to_camel,
+        populate_by_name=True,
+        from_attributes=True,
+        defer_build=True,
     )
@@ -1,9 +1,17 @@
 from typing import List, Optional, Union
 from urllib.parse import urljoin
 
-from pydantic import ConfigDict, Field, model_validator
+from pydantic import (
+    ConfigDict,
+    Field,
+    ValidationInfo,
+    field_serializer,
+    model_validator,
+)
 
 from src.schemas.base import SnakeCaseAliasMixin
+from src.schemas.collector.review import CompactReview, dump_reviews
+from src.utils.constants import BASE_URL
 
 
 class AddressCountrySchema(SnakeCaseAliasMixin):
@@ -36,24 +44,24 @@ class BasicDataSchema(SnakeCaseAliasMixin):
     image: Optional[str] = None
 
     @model_validator(mode="after")
-    def validate_url(self) -> "BasicDataSchema":
-        self.url = urljoin("https://www.tripadvisor.com", self.url)
+    def validate_url(self, info: ValidationInfo) -> "BasicDataSchema":
+        # The scraper passes its own base url, e.g. a stand-in server's
+        base_url = (info.context or {}).get("base_url", BASE_URL)
+        self.url = urljoin(base_url, self.url)
         return self
 
 
-class ReviewSchema(SnakeCaseAliasMixin):
-    model_config = ConfigDict(populate_by_name=True)
-
-    title: Optional[str] = None
-    text: Optional[str] = None
-    rate: Optional[str] = None
-    trip_date: Optional[str] = None
-
-
 class PlaceSchema(SnakeCaseAliasMixin):
     model_config = ConfigDict(populate_by_name=True)
 
     basic_data: Optional[BasicDataSchema] = None
     description: Optional[str] = None
     features: Optional[List[str]] = None
-    reviews: Optional[List[ReviewSchema]] = None
+    reviews: Optional[List[CompactReview]] = None
+
+    @field_serializer("reviews")
+    def serialize_reviews(
+        self, reviews: Optional[List[CompactReview]]
+    ) -> Optional[List[dict]]:
+        # Scraped reviews are kept compact and only validated here, in one batch
+        return dump_reviews(reviews) if reviews is not None else None
@@ -0,0 +1,52 @@
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from pydantic import ConfigDict, TypeAdapter
+
+
+@dataclass(slots=True)
+class CompactReview:
+    # Validated in bulk when dumped, not per review while scraping
+    __pydantic_config__ = ConfigDict(revalidate_instances="always")
+
+    review_id: Optional[str] = None
+    title: Optional[str] = None
+    text: Optional[str] = None
+    rate: Optional[str] = None
+    trip_date: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CompactReview":
+        # Ratings and trip dates repeat across thousands of reviews, share one copy
+        rate = data.get("rate")
+        trip_date = data.get("trip_date")
+        return cls(
+            review_id=data.get("review_id"),
+            title=data.get("title"),
+            text=data.get("text"),
+            rate=sys.intern(rate) if rate else rate,
+            trip_date=sys.intern(trip_date) if trip_date else trip_date,
+        )
+
+
+@lru_cache(maxsize=1)
+def get_reviews_adapter() -> TypeAdapter:
+    return TypeAdapter(list[CompactReview])
+
+
+def dump_reviews(reviews: Iterable[CompactReview]) -> list[dict]:
+    adapter = get_reviews_adapter()
+    return adapter.dump_python(adapter.validate_python(list(reviews)))
+
+
+def load_reviews(reviews: Iterable[dict]) -> list[CompactReview]:
+    # Validated in one call, then interned like CompactReview.from_dict
+    loaded = get_reviews_adapter().validate_python(list(reviews))
+    for review in loaded:
+        if review.rate:
+            review.rate = sys.intern(review.rate)
+        if review.trip_date:
+            review.trip_date = sys.intern(review.trip_date)
+    return loaded
@@ -1,89 +1,449 @@
 import asyncio
-from typing import Any, Optional, Union
+import json
+import time
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Optional, Type, Union
 
-from aiohttp import ClientError, ClientResponse, ClientSession
-from apify import Actor
+from aiohttp import (
+    ClientError,
+    ClientResponse,
+    ClientSession,
+    ClientTimeout,
+    DummyCookieJar,
+    TCPConnector,
+)
+from apify import Configuration
 from loguru import logger as log
 
-from src.utils.headers import get_headers
+from src.services.collector.cache import CachedResponse, ResponseCache
+from src.services.collector.graphql import GraphQLClient
+from src.services.collector.proxy_pool import ProxyPool, ProxySession
+from src.services.collector.request_metrics import RequestMetrics, RequestTiming
+from src.utils.blocking import is_blocked
+from src.utils.constants import (
+    BASE_URL,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_RESET_TIMEOUT,
+    BURST,
+    CACHE_MAX_SIZE_MB,
+    CACHE_MODE,
+    CONNECT_TIMEOUT,
+    DNS_CACHE_TTL,
+    GRAPHQL_BATCH_SIZE,
+    GRAPHQL_PATH,
+    KEEPALIVE_TIMEOUT,
+    MAX_CONCURRENCY,
+    MAX_CONNECTIONS,
+    MAX_CONNECTIONS_PER_HOST,
+    READ_TIMEOUT,
+    REQUEST_DEADLINE,
+    REQUESTS_PER_SECOND,
+    RETRY_ATTEMPTS,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+    TOTAL_TIMEOUT,
+)
+from src.utils.endpoints import get_endpoint_type
+from src.utils.headers import get_header_factory
+from src.utils.metrics import get_metrics
+from src.utils.profiling import get_profiler
+from src.utils.rate_limiter import RateLimiter
+from src.utils.retry import (
+    RETRY_STATUSES,
+    CircuitBreakers,
+    RetryableError,
+    RetryPolicy,
+)
 
 
 class ReviewsBaseScraper:
-    def __init__(self, use_apify_proxies: bool) -> None:
+    def __init__(
+        self,
+        use_apify_proxies: bool,
+        proxy_urls: Optional[list[str]] = None,
+        max_connections: int = MAX_CONNECTIONS,
+        max_connections_per_host: int = MAX_CONNECTIONS_PER_HOST,
+        requests_per_second: float = REQUESTS_PER_SECOND,
+        burst: int = BURST,
+        max_concurrency: int = MAX_CONCURRENCY,
+        cache_mode: str = CACHE_MODE,
+        cache_max_size_mb: int = CACHE_MAX_SIZE_MB,
+        max_retries: int = RETRY_ATTEMPTS,
+        request_deadline: float = REQUEST_DEADLINE,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        read_timeout: float = READ_TIMEOUT,
+        total_timeout: float = TOTAL_TIMEOUT,
+        request_metrics: Optional[RequestMetrics] = None,
+        graphql_batch_size: int = GRAPHQL_BATCH_SIZE,
+        base_url: str = BASE_URL,
+    ) -> None:
+        self.base_url = base_url
         self.use_apify_proxies = use_apify_proxies
+        self.proxy_pool = ProxyPool(
+            use_apify_proxies=use_apify_proxies, proxy_urls=proxy_urls
+        )
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.rate_limiter = RateLimiter(rate=requests_per_second, burst=burst)
+        self.retry_policy = RetryPolicy(
+            attempts=max_retries,
+            base_delay=RETRY_BASE_DELAY,
+            max_delay=RETRY_MAX_DELAY,
+            deadline=request_deadline,
+        )
+        self.circuit_breakers = CircuitBreakers(
+            failure_threshold=BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=BREAKER_RESET_TIMEOUT,
+        )
+        # Shared by every worker level, caps the requests in flight at any time
+        self.request_semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+        self.timeout = ClientTimeout(
+            total=total_timeout, connect=connect_timeout, sock_read=read_timeout
+        )
+        self.request_metrics = request_metrics or RequestMetrics()
+        self.header_factory = get_header_factory()
+        self.profiler = get_profiler()
+        self.metrics = get_metrics()
+        self.session: Optional[ClientSession] = None
+        self.graphql = GraphQLClient(
+            post=self.post_graphql, batch_size=graphql_batch_size
+        )
+        self.storage_dir = Path(Configuration.get_global_configuration().storage_dir)
+        self.response_cache = ResponseCache(
+            mode=cache_mode,
+            path=self.storage_dir / "response_cache" / "responses.sqlite",
+            max_size=cache_max_size_mb * 1024 * 1024,
+        )
 
-    async def get_proxy_url(self) -> str | None:
-        if self.use_apify_proxies:
-            proxy_configuration = await Actor.create_proxy_configuration()
-            proxy_url = await proxy_configuration.new_url()
-            log.info(f"Using proxy: {proxy_url}")
-            return proxy_url
-        return None
+    async def __aenter__(self) -> "ReviewsBaseScraper":
+        await self.open_session()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        await self.close_session()
+
+    async def open_session(self) -> ClientSession:
+        if self.session is None or self.session.closed:
+            connector = TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+                enable_cleanup_closed=True,
+            )
+            # Cookies are not shared between requests, same as with a fresh session.
+            self.session = ClientSession(
+                connector=connector,
+                cookie_jar=DummyCookieJar(),
+                timeout=self.timeout,
+                trace_configs=[self.request_metrics.trace_config()],
+            )
+        return self.session
+
+    async def close_session(self) -> None:
+        await self.graphql.close()
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+        await self.response_cache.close()
 
     async def get_data(
         self,
         url: str,
         type: Optional[str] = None,
-        retries: Optional[int] = 3,
+        retries: Optional[int] = None,
+        session_key: Optional[str] = None,
     ) -> Union[ClientResponse, dict, str, Any, None]:
-        attempts = 0
-        proxy_url = await self.get_proxy_url()
-        params = {"proxy": proxy_url} if proxy_url else {}
-        async with ClientSession() as session:
-            async with session.get(
-                url=url, headers=get_headers(), **params
-            ) as response:
-                while attempts < retries:
-                    try:
-                        if type == "json":
-                            data = await response.json()
-                            return data
-
-                        if type == "text":
-                            data = await response.text(encoding="utf-8")
-                            return data
-
-                        return response
-                    except ClientError as e:
-                        log.error(f"Error posting data: {e}. Retrying...")
-                        attempts += 1
-                        await asyncio.sleep(1)
-                    except ValueError:
-                        log.error("Failed to parse response as JSON. Retrying...")
-                        attempts += 1
-                        await asyncio.sleep(1)
-
-        log.error(f"Failed to post data to {url} after {retries} attempts.")
-        return None
+        return await self.request(
+            "GET", url=url, type=type, retries=retries, session_key=session_key
+        )
 
     async def post_data(
         self,
         url: str,
         data: Any,
-        retries: Optional[int] = 3,
+        retries: Optional[int] = None,
+        session_key: Optional[str] = None,
     ) -> dict:
-        attempts = 0
-        proxy_url = await self.get_proxy_url()
-        params = {"proxy": proxy_url} if proxy_url else {}
-        async with ClientSession() as session:
-            async with session.post(
-                url=url, headers=get_headers(), json=data, **params
+        result = await self.request(
+            "POST",
+            url=url,
+            type="json",
+            data=data,
+            retries=retries,
+            session_key=session_key,
+        )
+        return result if result is not None else {}
+
+    async def post_graphql(self, operations: list[dict]) -> list[Optional[dict]]:
+        # Cached per operation rather than per batch, which depends on timing
+        url = self.base_url + GRAPHQL_PATH
+        if not self.response_cache.enabled:
+            return await self.post_data(url=url, data=operations)
+
+        keys = [
+            self.response_cache.build_key("POST", url, operation)
+            for operation in operations
+        ]
+        results: list[Optional[dict]] = [None] * len(operations)
+        missing = []
+        for index, key in enumerate(keys):
+            cached = await self.response_cache.get(key, url)
+            if cached and (cached.is_fresh or self.response_cache.replay):
+                self.metrics.inc("cache_hits_total", endpoint=get_endpoint_type(url))
+                results[index] = self.decode_body(body=cached.body, type="json")
+            else:
+                missing.append(index)
+        if not missing:
+            return results
+        if self.response_cache.replay:
+            log.warning(f"No cached response to replay for {len(missing)} operations")
+            return results
+
+        fetched = await self.request(
+            "POST",
+            url=url,
+            type="json",
+            data=[operations[index] for index in missing],
+            cache=False,
+        )
+        if not isinstance(fetched, list) or len(fetched) != len(missing):
+            if fetched:
+                log.error(
+                    f"GraphQL batch returned {len(fetched)} results "
+                    f"for {len(missing)} operations"
+                )
+            return results
+
+        for index, result in zip(missing, fetched):
+            results[index] = result
+            if (
+                isinstance(result, dict)
+                and result.get("data")
+                and not result.get("errors")
+            ):
+                await self.response_cache.set(
+                    keys[index], url=url, body=json.dumps(result)
+                )
+        return results
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        type: Optional[str] = None,
+        data: Any = None,
+        retries: Optional[int] = None,
+        session_key: Optional[str] = None,
+        cache: bool = True,
+    ) -> Union[ClientResponse, dict, str, Any, None]:
+        with self.profiler.span(f"http.{get_endpoint_type(url)}"):
+            return await self.fetch(
+                method,
+                url=url,
+                type=type,
+                data=data,
+                retries=retries,
+                session_key=session_key,
+                cache=cache,
+            )
+
+    async def fetch(
+        self,
+        method: str,
+        url: str,
+        type: Optional[str],
+        data: Any,
+        retries: Optional[int],
+        session_key: Optional[str],
+        cache: bool = True,
+    ) -> Union[ClientResponse, dict, str, Any, None]:
+        cache_key = self.response_cache.build_key(method, url, data) if cache else None
+        cached = (
+            await self.response_cache.get(cache_key, url) if type and cache else None
+        )
+        if cached and (cached.is_fresh or self.response_cache.replay):
+            self.metrics.inc("cache_hits_total", endpoint=get_endpoint_type(url))
+            return self.decode_body(body=cached.body, type=type)
+        if self.response_cache.replay:
+            log.warning(f"No cached response to replay for {url}")
+            return None
+
+        attempts = retries or self.retry_policy.attempts
+        deadline = time.monotonic() + self.retry_policy.deadline
+        breaker = self.circuit_breakers.get(url)
+        last_error = None
+        for attempt in range(attempts):
+            if not await self.circuit_breakers.wait(url, deadline):
+                last_error = f"circuit for {breaker.host} is open"
+                break
+
+            retry_after = None
+            try:
+                async with asyncio.timeout(deadline - time.monotonic()):
+                    result = await self.send(
+                        method,
+                        url=url,
+                        type=type,
+                        data=data,
+                        cache_key=cache_key,
+                        cached=cached,
+                        session_key=session_key,
+                    )
+                breaker.record_success()
+                return result
+            except RetryableError as e:
+                if e.host_failure:
+                    breaker.record_failure()
+                last_error = str(e)
+                retry_after = e.retry_after
+            except (ClientError, asyncio.TimeoutError) as e:
+                breaker.record_failure()
+                last_error = str(e) or e.__class__.__name__
+
+            if attempt + 1 == attempts:
+                break
+            delay = self.retry_policy.backoff(attempt, retry_after=retry_after)
+            if time.monotonic() + delay >= deadline:
+                last_error = f"{last_error}, deadline exceeded"
+                break
+            log.warning(
+                f"Request to {url} failed ({last_error}), retry in {delay:.1f}s"
+            )
+            self.metrics.inc("retries_total", endpoint=get_endpoint_type(url))
+            await asyncio.sleep(delay)
+
+        log.error(f"Failed to fetch {url} after {attempt + 1} attempts: {last_error}")
+        self.metrics.inc("request_failures_total", endpoint=get_endpoint_type(url))
+        return None
+
+    async def send(
+        self,
+        method: str,
+        url: str,
+        type: Optional[str],
+        data: Any,
+        cache_key: Optional[str],
+        cached: Optional[CachedResponse],
+        session_key: Optional[str],
+    ) -> Union[ClientResponse, dict, str, Any, None]:
+        proxy = await self.proxy_pool.acquire(session_key)
+        endpoint_type = get_endpoint_type(url)
+        params = {"proxy": proxy.url} if proxy else {}
+        timing = RequestTiming()
+        status = None
+        if data is not None:
+            params["json"] = data
+        headers = {
+            **self.header_factory.get_headers(
+                proxy.session_id if proxy else session_key
+            ),
+            **self.response_cache.revalidation_headers(cached),
+        }
+        session = await self.open_session()
+        await self.rate_limiter.acquire(url)
+        started = time.perf_counter()
+        self.metrics.add("requests_in_flight", 1)
+        try:
+            async with self.request_semaphore, session.request(
+                method, url=url, headers=headers, trace_request_ctx=timing, **params
             ) as response:
-                while attempts < retries:
-                    try:
-                        data = await response.json()
-                        return data
-                    except ClientError as e:
-                        log.error(f"Error posting data: {e}. Retrying...")
-                        attempts += 1
-                        await asyncio.sleep(1)
-                    except ValueError:
-                        log.error("Failed to parse response as JSON. Retrying...")
-                        attempts += 1
-                        await asyncio.sleep(1)
-
-        log.error(f"Failed to post data to {url} after {retries} attempts.")
-        return {}
+                latency = time.perf_counter() - started
+                status = response.status
+                self.metrics.observe("request_seconds", latency, endpoint=endpoint_type)
+                if response.status == 304 and cached:
+                    self.proxy_pool.report(proxy, latency)
+                    await self.response_cache.refresh(cache_key)
+                    return self.decode_body(body=cached.body, type=type)
+
+                body = None
+                if type in ("json", "text"):
+                    body = await response.text(encoding="utf-8")
+                    self.metrics.inc(
+                        "response_bytes_total",
+                        response.content.total_bytes,
+                        endpoint=endpoint_type,
+                    )
+
+                blocked = self.is_blocked_response(proxy, response, body, latency)
+                if blocked or response.status in RETRY_STATUSES:
+                    raise RetryableError(
+                        f"status {response.status}" + (", blocked" if blocked else ""),
+                        retry_after=self.retry_policy.parse_retry_after(
+                            response.headers.get("Retry-After")
+                        ),
+                        host_failure=response.status in RETRY_STATUSES,
+                    )
+                if response.status >= 400:
+                    log.error(f"Request to {url} failed with status {response.status}")
+                    return None
+                if body is None:
+                    return response
+
+                try:
+                    result = self.decode_body(body=body, type=type)
+                except ValueError:
+                    msg = "invalid JSON body"
+                    raise RetryableError(msg, host_failure=False)
+                if cache_key is not None:
+                    await self.store_response(
+                        cache_key, url=url, response=response, body=body
+                    )
+                return result
+        except (ClientError, asyncio.TimeoutError):
+            self.proxy_pool.report(
+                proxy, latency=time.perf_counter() - started, error=True
+            )
+            raise
+        finally:
+            self.metrics.add("requests_in_flight", -1)
+            self.metrics.inc(
+                "requests_total",
+                endpoint=endpoint_type,
+                status=str(status) if status else "error",
+            )
+            self.request_metrics.record(url, timing=timing, status=status)
+
+    def is_blocked_response(
+        self,
+        proxy: Optional[ProxySession],
+        response: ClientResponse,
+        body: Optional[str],
+        latency: float,
+    ) -> bool:
+        blocked = is_blocked(response.status, body)
+        self.proxy_pool.report(
+            proxy, latency=latency, error=response.status >= 500, blocked=blocked
+        )
+        if blocked:
+            log.warning(f"Blocked response ({response.status}) for {response.url}")
+            self.metrics.inc(
+                "blocked_total", endpoint=get_endpoint_type(str(response.url))
+            )
+        return blocked
+
+    def decode_body(self, body: str, type: Optional[str]) -> Union[dict, str, Any]:
+        return json.loads(body) if type == "json" else body
+
+    async def store_response(
+        self, key: str, url: str, response: ClientResponse, body: str
+    ) -> None:
+        if response.status != 200:
+            return
+
+        await self.response_cache.set(
+            key,
+            url=url,
+            body=body,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
 
     def generate_pagination_urls(
         self,
@@ -0,0 +1,241 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from loguru import logger as log
+
+from src.utils.constants import CACHE_ACCESS_BATCH_SIZE, CACHE_TTLS
+from src.utils.endpoints import get_endpoint_type
+
+CACHE_MODES = ("off", "on", "replay")
+
+
+@dataclass
+class CachedResponse:
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+    ttl: int
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() - self.stored_at < self.ttl
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        mode: str = "off",
+        path: Optional[Path] = None,
+        max_size: int = 0,
+        ttls: dict[str, int] = CACHE_TTLS,
+        access_batch_size: int = CACHE_ACCESS_BATCH_SIZE,
+    ) -> None:
+        if mode not in CACHE_MODES:
+            msg = f"Unknown cache mode: {mode}"
+            raise ValueError(msg)
+
+        self.mode = mode
+        self.path = path
+        self.max_size = max_size
+        self.ttls = ttls
+        self.access_batch_size = access_batch_size
+        self.connection: Optional[sqlite3.Connection] = None
+        # One thread owns the connection, so queries keep their order and never
+        # block the event loop
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.accessed: dict[str, float] = {}
+        self.total_size = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    @property
+    def replay(self) -> bool:
+        return self.mode == "replay"
+
+    async def run(self, function: Callable[..., Any], *args: Any) -> Any:
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="response-cache"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, function, *args)
+
+    def open(self) -> None:
+        if not self.enabled or self.connection is not None:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)"
+        )
+        self.connection.commit()
+        # Summed once, then kept up to date by every insert and eviction
+        (self.total_size,) = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        log.info(f"Using response cache at {self.path} (mode: {self.mode})")
+
+    async def close(self) -> None:
+        if self.executor is None:
+            return
+
+        await self.run(self.close_connection)
+        self.executor.shutdown(wait=True)
+        self.executor = None
+
+    def close_connection(self) -> None:
+        if self.connection is not None:
+            self.write_accessed()
+            self.connection.commit()
+            self.connection.close()
+            self.connection = None
+
+    def build_key(self, method: str, url: str, data: Any = None) -> str:
+        body = json.dumps(data, sort_keys=True) if data is not None else ""
+        body_hash = hashlib.sha256(body.encode()).hexdigest()
+        return hashlib.sha256(f"{method} {url} {body_hash}".encode()).hexdigest()
+
+    async def get(self, key: str, url: str) -> Optional[CachedResponse]:
+        if not self.enabled:
+            return None
+
+        return await self.run(self.read, key, url)
+
+    def read(self, key: str, url: str) -> Optional[CachedResponse]:
+        self.open()
+        row = self.connection.execute(
+            "SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+
+        # Access times only order evictions, so they are written in batches
+        self.accessed[key] = time.time()
+        if len(self.accessed) >= self.access_batch_size:
+            self.write_accessed()
+            self.connection.commit()
+
+        body, etag, last_modified, stored_at = row
+        return CachedResponse(
+            body=zlib.decompress(body).decode("utf-8"),
+            etag=etag,
+            last_modified=last_modified,
+            stored_at=stored_at,
+            ttl=self.ttls.get(get_endpoint_type(url), 0),
+        )
+
+    def write_accessed(self) -> None:
+        if not self.accessed:
+            return
+
+        self.connection.executemany(
+            "UPDATE responses SET accessed_at = ? WHERE key = ?",
+            [(accessed_at, key) for key, accessed_at in self.accessed.items()],
+        )
+        self.accessed.clear()
+
+    async def set(
+        self,
+        key: str,
+        url: str,
+        body: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        if not self.enabled:
+            return
+
+        await self.run(self.write, key, url, body, etag, last_modified)
+
+    def write(
+        self,
+        key: str,
+        url: str,
+        body: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+    ) -> None:
+        self.open()
+        compressed = zlib.compress(body.encode("utf-8"))
+        now = time.time()
+        replaced = self.connection.execute(
+            "SELECT size FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        self.connection.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, url, compressed, etag, last_modified, now, now, len(compressed)),
+        )
+        self.accessed.pop(key, None)
+        self.total_size += len(compressed) - (replaced[0] if replaced else 0)
+        self.evict()
+        self.connection.commit()
+
+    async def refresh(self, key: str) -> None:
+        # The server confirmed the cached body is still valid (304 Not Modified)
+        if not self.enabled:
+            return
+
+        await self.run(self.write_refresh, key)
+
+    def write_refresh(self, key: str) -> None:
+        self.open()
+        self.connection.execute(
+            "UPDATE responses SET stored_at = ? WHERE key = ?", (time.time(), key)
+        )
+        self.connection.commit()
+
+    def evict(self) -> None:
+        if self.max_size <= 0 or self.total_size <= self.max_size:
+            return
+
+        # Pending access times decide which entries are the least recently used
+        self.write_accessed()
+        rows = self.connection.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ).fetchall()
+        evicted = []
+        for key, size in rows:
+            if self.total_size <= self.max_size:
+                break
+            evicted.append((key,))
+            self.total_size -= size
+
+        self.connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+    def revalidation_headers(self, cached: Optional[CachedResponse]) -> dict[str, str]:
+        if cached is None:
+            return {}
+
+        headers = {}
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+        return headers
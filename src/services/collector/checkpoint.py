@@ -0,0 +1,115 @@
+import asyncio
+import time
+from typing import Any, Optional
+
+from apify import Actor, Event
+from loguru import logger as log
+
+from src.schemas.collector.search import SearchSchema
+from src.services.collector.dataset_writer import DatasetWriter
+from src.utils.constants import CHECKPOINT_KEY
+
+
+class CrawlCheckpoint:
+    def __init__(
+        self,
+        dataset_writer: Optional[DatasetWriter] = None,
+        key: str = CHECKPOINT_KEY,
+    ) -> None:
+        self.dataset_writer = dataset_writer
+        self.key = key
+        self.completed_queries: set[str] = set()
+        self.discovered_places: dict[str, SearchSchema] = {}
+        self.completed_places: set[str] = set()
+        self.review_cursors: dict[str, int] = {}
+        self.lock = asyncio.Lock()
+        self.dirty = False
+
+    async def start(self) -> None:
+        await self.load()
+        Actor.on(Event.PERSIST_STATE, self.persist)
+        Actor.on(Event.MIGRATING, self.persist)
+
+    async def stop(self) -> None:
+        Actor.off(Event.PERSIST_STATE, self.persist)
+        Actor.off(Event.MIGRATING, self.persist)
+        await self.persist()
+
+    async def load(self) -> None:
+        try:
+            state = await Actor.get_value(self.key)
+        except Exception as e:
+            log.warning(f"Failed to load crawl checkpoint: {e}")
+            return
+        if not state:
+            return
+
+        self.completed_queries = set(state.get("completed_queries", []))
+        self.discovered_places = {
+            place["url"]: SearchSchema(**place)
+            for place in state.get("discovered_places", [])
+        }
+        self.completed_places = set(state.get("completed_places", []))
+        self.review_cursors = state.get("review_cursors", {})
+        log.info(
+            f"Resuming from checkpoint: {len(self.completed_queries)} queries and "
+            f"{len(self.completed_places)}/{len(self.discovered_places)} places done"
+        )
+
+    async def persist(self, event_data: Any = None) -> None:
+        async with self.lock:
+            if not self.dirty:
+                return
+
+            state = {
+                "completed_queries": sorted(self.completed_queries),
+                "discovered_places": [
+                    place.model_dump() for place in self.discovered_places.values()
+                ],
+                "completed_places": sorted(self.completed_places),
+                "review_cursors": dict(self.review_cursors),
+                "updated_at": time.time(),
+            }
+            # Cleared first so changes made while saving are kept for the next persist
+            self.dirty = False
+            try:
+                # Records must reach the dataset before the state that skips them
+                if self.dataset_writer is not None:
+                    await self.dataset_writer.flush()
+                await Actor.set_value(self.key, state)
+            except Exception as e:
+                self.dirty = True
+                log.error(f"Failed to persist crawl checkpoint: {e}")
+
+    def is_query_completed(self, query: str) -> bool:
+        return query in self.completed_queries
+
+    def complete_query(self, query: str) -> None:
+        self.completed_queries.add(query)
+        self.dirty = True
+
+    def discover_place(self, place: SearchSchema) -> bool:
+        if place.url in self.discovered_places:
+            return False
+        self.discovered_places[place.url] = place
+        self.dirty = True
+        return True
+
+    def pending_places(self) -> list[SearchSchema]:
+        return [
+            place
+            for url, place in self.discovered_places.items()
+            if url not in self.completed_places
+        ]
+
+    def complete_place(self, url: str) -> None:
+        self.completed_places.add(url)
+        self.review_cursors.pop(url, None)
+        self.dirty = True
+
+    def get_review_cursor(self, url: str) -> int:
+        return self.review_cursors.get(url, 0)
+
+    def set_review_cursor(self, url: str, page: int) -> None:
+        self.review_cursors[url] = page
+        self.dirty = True
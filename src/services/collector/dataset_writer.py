@@ -0,0 +1,179 @@
+import asyncio
+import inspect
+import json
+from types import TracebackType
+from typing import Any, Awaitable, Callable, Optional, Type, Union
+
+from apify import Actor
+from loguru import logger as log
+
+from src.utils.constants import (
+    DATASET_BATCH_BYTES,
+    DATASET_BATCH_SIZE,
+    DATASET_BUFFER_SIZE,
+    DATASET_FLUSH_INTERVAL,
+)
+from src.utils.metrics import get_metrics
+from src.utils.profiling import get_profiler
+
+FlushCallback = Callable[[], Optional[Awaitable[None]]]
+# A record, its JSON size and what to run once it reaches the dataset
+BufferedRecord = tuple[dict, int, list[FlushCallback]]
+
+
+class DatasetWriter:
+    def __init__(
+        self,
+        batch_size: int = DATASET_BATCH_SIZE,
+        batch_bytes: int = DATASET_BATCH_BYTES,
+        flush_interval: float = DATASET_FLUSH_INTERVAL,
+        buffer_size: int = DATASET_BUFFER_SIZE,
+    ) -> None:
+        self.batch_size = max(batch_size, 1)
+        self.batch_bytes = batch_bytes
+        self.flush_interval = flush_interval
+        self.buffer_size = max(buffer_size, self.batch_size)
+        self.buffer: list[BufferedRecord] = []
+        self.buffer_bytes = 0
+        self.not_full = asyncio.Condition()
+        self.flush_needed = asyncio.Event()
+        self.flush_lock = asyncio.Lock()
+        self.task: Optional[asyncio.Task] = None
+        self.closing = False
+        self.pushed = 0
+        self.profiler = get_profiler()
+        self.metrics = get_metrics()
+
+    async def __aenter__(self) -> "DatasetWriter":
+        self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        await self.close()
+
+    def start(self) -> None:
+        if self.task is None:
+            self.closing = False
+            self.task = asyncio.create_task(self.run())
+
+    async def close(self) -> None:
+        self.closing = True
+        self.flush_needed.set()
+        if self.task is not None:
+            await self.task
+            self.task = None
+        await self.flush()
+        log.info(f"Pushed {self.pushed} records to the dataset")
+
+    async def push(
+        self,
+        records: Union[dict, list[dict]],
+        on_flushed: Optional[FlushCallback] = None,
+    ) -> None:
+        if isinstance(records, dict):
+            records = [records]
+
+        for index, record in enumerate(records):
+            size = self.record_size(record)
+            # Batches keep the buffer order, so the last record flushes the rest
+            is_last = index == len(records) - 1
+            callbacks = [on_flushed] if on_flushed is not None and is_last else []
+            # Producers wait here while the flusher catches up
+            async with self.not_full:
+                await self.not_full.wait_for(
+                    lambda: len(self.buffer) < self.buffer_size
+                )
+                self.buffer.append((record, size, callbacks))
+                self.buffer_bytes += size
+                self.metrics.set("dataset_buffer_records", len(self.buffer))
+
+            if self.is_batch_ready():
+                if self.task is None:
+                    await self.flush()
+                else:
+                    self.flush_needed.set()
+
+    async def on_flushed(self, callback: FlushCallback) -> None:
+        # Runs the callback once every record pushed so far reaches the dataset
+        if not self.buffer:
+            # A batch being pushed has already left the buffer
+            async with self.flush_lock:
+                if not self.buffer:
+                    await self.run_callbacks([({}, 0, [callback])])
+                    return
+        _, _, callbacks = self.buffer[-1]
+        callbacks.append(callback)
+
+    async def run(self) -> None:
+        while not self.closing:
+            try:
+                await asyncio.wait_for(
+                    self.flush_needed.wait(), timeout=self.flush_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            self.flush_needed.clear()
+
+            try:
+                await self.flush()
+            except Exception as e:
+                log.error(f"Failed to flush records to the dataset: {e}")
+
+    async def flush(self) -> None:
+        async with self.flush_lock:
+            while self.buffer:
+                batch = self.take_batch()
+                try:
+                    with self.profiler.span("dataset.push_data"):
+                        await Actor.push_data([record for record, _, _ in batch])
+                except Exception:
+                    # Keep the batch for the next flush instead of dropping it
+                    self.buffer[:0] = batch
+                    self.buffer_bytes += sum(size for _, size, _ in batch)
+                    raise
+
+                await self.run_callbacks(batch)
+
+                self.pushed += len(batch)
+                self.metrics.inc("dataset_records_total", len(batch))
+                self.metrics.inc("dataset_batches_total")
+                self.metrics.set("dataset_buffer_records", len(self.buffer))
+                async with self.not_full:
+                    self.not_full.notify_all()
+
+    async def run_callbacks(self, batch: list[BufferedRecord]) -> None:
+        for _, _, callbacks in batch:
+            for callback in callbacks:
+                try:
+                    result = callback()
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    log.error(f"Failed to run a dataset flush callback: {e}")
+
+    def take_batch(self) -> list[BufferedRecord]:
+        count = 0
+        batch_bytes = 0
+        for _, size, _ in self.buffer[: self.batch_size]:
+            if count and batch_bytes + size > self.batch_bytes:
+                break
+            count += 1
+            batch_bytes += size
+
+        batch = self.buffer[:count]
+        del self.buffer[:count]
+        self.buffer_bytes -= batch_bytes
+        return batch
+
+    def is_batch_ready(self) -> bool:
+        return (
+            len(self.buffer) >= self.batch_size or self.buffer_bytes >= self.batch_bytes
+        )
+
+    def record_size(self, record: Any) -> int:
+        return len(json.dumps(record, ensure_ascii=False, default=str))
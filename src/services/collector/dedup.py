@@ -0,0 +1,135 @@
+import asyncio
+import sqlite3
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from loguru import logger as log
+
+from src.schemas.collector.review import CompactReview
+from src.utils.constants import DEDUP_SEEN_SIZE
+from src.utils.fingerprint import review_fingerprint
+
+
+class ReviewDeduplicator:
+    def __init__(
+        self, path: Optional[Path] = None, seen_size: int = DEDUP_SEEN_SIZE
+    ) -> None:
+        # Without a path duplicates are only dropped within the current run
+        self.path = path
+        # Least recently seen first, the oldest fall back to the index
+        self.seen: OrderedDict[str, None] = OrderedDict()
+        self.seen_size = max(seen_size, 1)
+        self.connection: Optional[sqlite3.Connection] = None
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.dropped = 0
+
+    @property
+    def persistent(self) -> bool:
+        return self.path is not None
+
+    async def run(self, function: Callable[..., Any], *args: Any) -> Any:
+        # One thread owns the connection, so SQLite never blocks the event loop
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="review-index"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, function, *args)
+
+    def open(self) -> None:
+        if not self.persistent or self.connection is not None:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS reviews (
+                place TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                PRIMARY KEY (place, fingerprint)
+            ) WITHOUT ROWID
+            """
+        )
+        self.connection.commit()
+        log.info(f"Using review index at {self.path}")
+
+    async def close(self) -> None:
+        if self.executor is not None:
+            await self.run(self.close_connection)
+            self.executor.shutdown(wait=True)
+            self.executor = None
+        if self.dropped:
+            log.info(f"Dropped {self.dropped} duplicate reviews")
+
+    def close_connection(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    async def filter(
+        self, place: str, reviews: list[CompactReview]
+    ) -> list[CompactReview]:
+        candidates: dict[str, CompactReview] = {}
+        for review in reviews:
+            fingerprint = review_fingerprint(review)
+            key = f"{place}\x1f{fingerprint}"
+            if key in self.seen:
+                self.seen.move_to_end(key)
+                continue
+            if fingerprint not in candidates:
+                candidates[fingerprint] = review
+                # Before the index lookup, so a concurrent page cannot pass them too
+                self.remember(key)
+
+        if self.persistent and candidates:
+            known = await self.run(self.load_known, place, list(candidates))
+            candidates = {
+                fingerprint: review
+                for fingerprint, review in candidates.items()
+                if fingerprint not in known
+            }
+
+        self.dropped += len(reviews) - len(candidates)
+        return list(candidates.values())
+
+    def remember(self, key: str) -> None:
+        self.seen[key] = None
+        self.seen.move_to_end(key)
+        if len(self.seen) > self.seen_size:
+            self.seen.popitem(last=False)
+
+    def forget(self, place: str, reviews: list[CompactReview]) -> None:
+        # Filtered reviews that were never pushed, so a retry keeps them
+        for review in reviews:
+            self.seen.pop(f"{place}\x1f{review_fingerprint(review)}", None)
+
+    def load_known(self, place: str, fingerprints: list[str]) -> set[str]:
+        self.open()
+        placeholders = ",".join("?" * len(fingerprints))
+        rows = self.connection.execute(
+            "SELECT fingerprint FROM reviews "
+            f"WHERE place = ? AND fingerprint IN ({placeholders})",
+            (place, *fingerprints),
+        ).fetchall()
+        return {fingerprint for (fingerprint,) in rows}
+
+    async def commit(self, place: str, reviews: list[CompactReview]) -> None:
+        # Run once the reviews reached the dataset, a crash before that must not
+        # make the next run drop them as already scraped
+        if self.persistent and reviews:
+            await self.run(
+                self.save, place, [review_fingerprint(review) for review in reviews]
+            )
+
+    def save(self, place: str, fingerprints: list[str]) -> None:
+        if not fingerprints:
+            return
+        self.open()
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO reviews (place, fingerprint) VALUES (?, ?)",
+            [(place, fingerprint) for fingerprint in fingerprints],
+        )
+        self.connection.commit()
@@ -0,0 +1,96 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+from loguru import logger as log
+
+from src.utils.constants import GRAPHQL_BATCH_DELAY, GRAPHQL_BATCH_SIZE
+
+
+class GraphQLClient:
+    def __init__(
+        self,
+        post: Callable[[list[dict]], Awaitable[Any]],
+        batch_size: int = GRAPHQL_BATCH_SIZE,
+        batch_delay: float = GRAPHQL_BATCH_DELAY,
+    ) -> None:
+        # `post` sends a list of operations and returns the list of their results
+        self.post = post
+        self.batch_size = max(batch_size, 1)
+        self.batch_delay = batch_delay
+        self.pending: list[tuple[dict, asyncio.Future]] = []
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        self.tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.operations = 0
+
+    def build_operation(self, query_id: str, variables: dict) -> dict:
+        return {
+            "variables": variables,
+            "query": query_id,
+            "extensions": {"preRegisteredQueryId": query_id},
+        }
+
+    async def execute(self, query_id: str, variables: dict) -> Optional[dict]:
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((self.build_operation(query_id, variables), future))
+
+        # Operations issued within `batch_delay` of each other share one POST
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        elif self.flush_handle is None:
+            self.flush_handle = asyncio.get_running_loop().call_later(
+                self.batch_delay, self.flush
+            )
+        return await future
+
+    def flush(self) -> None:
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+
+        while self.pending:
+            batch = self.pending[: self.batch_size]
+            self.pending = self.pending[self.batch_size :]
+            task = asyncio.ensure_future(self.send(batch))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def send(self, batch: list[tuple[dict, asyncio.Future]]) -> None:
+        # Callers that were cancelled while waiting are left out of the request
+        batch = [
+            (operation, future) for operation, future in batch if not future.done()
+        ]
+        if not batch:
+            return
+
+        operations = [operation for operation, _ in batch]
+        self.batches += 1
+        self.operations += len(operations)
+        try:
+            results = await self.post(operations)
+        except Exception as e:
+            log.error(f"GraphQL batch of {len(operations)} operations failed: {e}")
+            results = None
+        if not isinstance(results, list) or len(results) != len(batch):
+            if results:
+                log.error(
+                    f"GraphQL batch returned {len(results)} results "
+                    f"for {len(batch)} operations"
+                )
+            results = [None] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, dict) and result.get("errors"):
+                log.warning(f"GraphQL operation failed: {result['errors']}")
+            future.set_result(result.get("data") if isinstance(result, dict) else None)
+
+    async def close(self) -> None:
+        self.flush()
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+        if self.batches:
+            log.info(
+                f"Sent {self.operations} GraphQL operations in {self.batches} batches"
+            )
@@ -0,0 +1,112 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from apify import Actor
+from apify.storages import KeyValueStore
+from loguru import logger as log
+
+from src.schemas.collector.location import LocationSchema
+from src.utils.constants import (
+    LOCATION_CACHE_SIZE,
+    LOCATION_CACHE_STORE,
+    LOCATION_CACHE_TTL,
+)
+
+
+class LocationCache:
+    def __init__(
+        self,
+        max_size: int = LOCATION_CACHE_SIZE,
+        store_name: Optional[str] = LOCATION_CACHE_STORE,
+        ttl: int = LOCATION_CACHE_TTL,
+    ) -> None:
+        self.max_size = max_size
+        self.store_name = store_name
+        self.ttl = ttl
+        self.entries: OrderedDict[str, list[LocationSchema]] = OrderedDict()
+        self.in_flight: dict[str, asyncio.Task] = {}
+        self.store: Optional[KeyValueStore] = None
+
+    def build_key(self, query: str, limit: int, locale: str) -> str:
+        normalized_query = " ".join(query.lower().split())
+        return f"{normalized_query}|{limit}|{locale}"
+
+    async def get(
+        self, key: str, fetch: Callable[[], Awaitable[list[LocationSchema]]]
+    ) -> list[LocationSchema]:
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        # Concurrent lookups of the same query share one request
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self.resolve(key=key, fetch=fetch))
+            self.in_flight[key] = task
+            task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+
+        return await asyncio.shield(task)
+
+    async def resolve(
+        self, key: str, fetch: Callable[[], Awaitable[list[LocationSchema]]]
+    ) -> list[LocationSchema]:
+        locations = await self.load(key)
+        if locations is None:
+            locations = await fetch()
+            if locations:
+                await self.save(key, locations)
+
+        if locations:
+            self.remember(key, locations)
+        return locations
+
+    def remember(self, key: str, locations: list[LocationSchema]) -> None:
+        self.entries[key] = locations
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    async def open_store(self) -> Optional[KeyValueStore]:
+        if self.store is None and self.store_name:
+            try:
+                self.store = await Actor.open_key_value_store(name=self.store_name)
+            except Exception as e:
+                log.warning(f"Location cache store unavailable: {e}")
+                self.store_name = None
+        return self.store
+
+    def store_key(self, key: str) -> str:
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    async def load(self, key: str) -> Optional[list[LocationSchema]]:
+        store = await self.open_store()
+        if store is None:
+            return None
+
+        try:
+            record = await store.get_value(self.store_key(key))
+        except Exception as e:
+            log.warning(f"Failed to read cached location for {key}: {e}")
+            return None
+
+        if not record or time.time() - record.get("stored_at", 0) > self.ttl:
+            return None
+        return [LocationSchema.model_validate(item) for item in record["locations"]]
+
+    async def save(self, key: str, locations: list[LocationSchema]) -> None:
+        store = await self.open_store()
+        if store is None:
+            return
+
+        record = {
+            "query": key,
+            "stored_at": time.time(),
+            "locations": [location.model_dump(by_alias=True) for location in locations],
+        }
+        try:
+            await store.set_value(self.store_key(key), record)
+        except Exception as e:
+            log.warning(f"Failed to cache location for {key}: {e}")
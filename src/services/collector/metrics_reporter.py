@@ -0,0 +1,108 @@
+import asyncio
+import time
+from types import TracebackType
+from typing import Optional, Type
+
+from aiohttp import web
+from apify import Actor
+from loguru import logger as log
+
+from src.utils.constants import METRICS_HOST, METRICS_INTERVAL, METRICS_KEY
+from src.utils.metrics import MetricsRegistry, get_metrics
+
+# Counters reported as per second rates in the progress log and METRICS record
+RATES = {
+    "requests": "requests_total",
+    "pages": "pages_total",
+    "reviews": "reviews_total",
+    "bytes": "response_bytes_total",
+}
+
+
+class MetricsReporter:
+    def __init__(
+        self,
+        metrics: Optional[MetricsRegistry] = None,
+        interval: float = METRICS_INTERVAL,
+        port: Optional[int] = None,
+        host: str = METRICS_HOST,
+    ) -> None:
+        self.metrics = metrics or get_metrics()
+        self.interval = interval
+        self.port = port
+        self.host = host
+        self.task: Optional[asyncio.Task] = None
+        self.runner: Optional[web.AppRunner] = None
+        self.last_totals = {name: 0.0 for name in RATES}
+        self.last_reported_at = time.monotonic()
+
+    async def __aenter__(self) -> "MetricsReporter":
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        await self.stop()
+
+    async def start(self) -> None:
+        if self.port is not None and self.runner is None:
+            app = web.Application()
+            app.router.add_get("/metrics", self.handle_metrics)
+            self.runner = web.AppRunner(app, access_log=None)
+            await self.runner.setup()
+            await web.TCPSite(self.runner, self.host, self.port).start()
+            log.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+        if self.interval > 0 and self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        # Final values, also for runs shorter than one interval
+        await self.persist()
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.persist()
+            except Exception as e:
+                log.error(f"Failed to persist metrics: {e}")
+
+    async def persist(self) -> None:
+        rates = self.rates()
+        log.info(
+            f"Progress: {self.metrics.total('pages_total'):.0f} pages "
+            f"({rates['pages']:.1f}/s), "
+            f"{self.metrics.total('reviews_total'):.0f} reviews "
+            f"({rates['reviews']:.1f}/s), "
+            f"{self.metrics.total('requests_in_flight'):.0f} requests in flight, "
+            f"{self.metrics.total('response_bytes_total') / 1024 / 1024:.1f} MB"
+        )
+        await Actor.set_value(METRICS_KEY, {**self.metrics.snapshot(), "rates": rates})
+
+    def rates(self) -> dict[str, float]:
+        # Over the time since the previous report, not the whole run
+        now = time.monotonic()
+        elapsed = max(now - self.last_reported_at, 1e-9)
+        rates = {}
+        for name, metric in RATES.items():
+            total = self.metrics.total(metric)
+            rates[name] = round((total - self.last_totals[name]) / elapsed, 3)
+            self.last_totals[name] = total
+        self.last_reported_at = now
+        return rates
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(
+            text=self.metrics.render(),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
@@ -0,0 +1,86 @@
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+REVIEW_ID_PATTERN = re.compile(r"-r(\d+)-")
+RANK_PATTERN = re.compile(r"^\d+\.\s*")
+COUNT_PATTERN = re.compile(r"\d[\d,.]*")
+
+
+class PageParser(ABC):
+    name: str
+
+    @abstractmethod
+    def parse_document(self, response: str) -> Any: ...
+
+    @abstractmethod
+    def parse_search_attractions(self, document: Any) -> list[dict]: ...
+
+    @abstractmethod
+    def parse_search_hotel(self, document: Any) -> list[dict]: ...
+
+    @abstractmethod
+    def parse_search_restaurants(self, document: Any) -> list[dict]: ...
+
+    @abstractmethod
+    def parse_total_attractions(self, document: Any) -> int: ...
+
+    @abstractmethod
+    def parse_total_hotels(self, document: Any) -> int: ...
+
+    @abstractmethod
+    def parse_total_restaurants(self, document: Any) -> int: ...
+
+    @abstractmethod
+    def parse_next_page(self, document: Any) -> str: ...
+
+    @abstractmethod
+    def parse_attraction_details(self, document: Any) -> dict: ...
+
+    @abstractmethod
+    def parse_hotel_details(self, document: Any) -> dict: ...
+
+    @abstractmethod
+    def parse_restaurant_details(self, document: Any) -> dict: ...
+
+    def strip_rank(self, name: str) -> str:
+        return RANK_PATTERN.sub("", name)
+
+    def parse_count(self, text: str) -> int:
+        return int(re.sub(r"[,.]", "", COUNT_PATTERN.search(text).group()))
+
+    def parse_rate(self, text: Optional[str]) -> Optional[str]:
+        return text.split()[0].replace(",", ".") if text is not None else None
+
+    def parse_attraction_trip_date(self, text: Optional[str]) -> Optional[str]:
+        return text.split("•")[0] if text is not None else None
+
+    def parse_hotel_trip_date(self, text: Optional[str]) -> Optional[str]:
+        if text is None:
+            return None
+        return " ".join([word.capitalize() for word in text.split(":")[-1].split()])
+
+    def parse_review_id(
+        self, review_id: Optional[str], href: Optional[str] = None
+    ) -> Optional[str]:
+        if review_id:
+            return review_id
+        # Review links look like /ShowUserReviews-g293924-d311073-r912345678-...
+        match = REVIEW_ID_PATTERN.search(href or "")
+        return match.group(1) if match else None
+
+    def build_review(
+        self,
+        title: Optional[str],
+        text: Optional[str],
+        rate: Optional[str],
+        trip_date: Optional[str],
+        review_id: Optional[str] = None,
+    ) -> dict:
+        return {
+            "review_id": review_id,
+            "title": title,
+            "text": text,
+            "rate": rate,
+            "trip_date": trip_date,
+        }
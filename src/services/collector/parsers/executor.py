@@ -0,0 +1,91 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Any, Optional
+
+from loguru import logger as log
+
+from src.services.collector.parsers.base import PageParser
+from src.services.collector.parsers.registry import get_parser, resolve_parser
+from src.utils.metrics import get_metrics
+from src.utils.profiling import get_profiler
+
+
+@lru_cache
+def load_parser(backend: str) -> PageParser:
+    return get_parser(backend)
+
+
+def parse_page(backend: str, response: str, extractors: tuple[str, ...]) -> list[Any]:
+    # Runs in the worker: the page is parsed once and only plain data goes back
+    parser = load_parser(backend)
+    document = parser.parse_document(response)
+    return [getattr(parser, extractor)(document) for extractor in extractors]
+
+
+class ParseExecutor:
+    def __init__(
+        self, backend: str, mode: str, max_workers: Optional[int] = None
+    ) -> None:
+        self.backend = backend
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.executor: Optional[Executor] = None
+        # Fails fast on a bad name, the backend itself is imported on first parse
+        resolve_parser(backend)
+
+    def start(self) -> None:
+        if self.executor is not None:
+            return
+
+        if self.mode == "process":
+            # Spawned workers do not inherit the event loop or open sockets
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        elif self.mode == "thread":
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def fallback_to_threads(self, error: Exception) -> None:
+        log.warning(f"Process pool unavailable, parsing in threads instead: {error}")
+        self.shutdown()
+        self.mode = "thread"
+        self.start()
+
+    async def parse(self, response: str, *extractors: str) -> list[Any]:
+        # Named after the first extractor, e.g. parse.parse_hotel_details
+        started = time.perf_counter()
+        with get_profiler().span(f"parse.{extractors[0]}"):
+            results = await self.run_parse(response, extractors)
+        get_metrics().observe(
+            "parse_seconds", time.perf_counter() - started, extractor=extractors[0]
+        )
+        return results
+
+    async def run_parse(self, response: str, extractors: tuple[str, ...]) -> list[Any]:
+        self.start()
+        if self.executor is None:
+            return parse_page(self.backend, response, extractors)
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self.executor, parse_page, self.backend, response, extractors
+            )
+        except (BrokenProcessPool, OSError, NotImplementedError) as e:
+            if self.mode != "process":
+                raise
+            self.fallback_to_threads(error=e)
+            return await loop.run_in_executor(
+                self.executor, parse_page, self.backend, response, extractors
+            )
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,265 @@
+import json
+from typing import Optional
+
+import lxml.html
+from lxml import etree
+
+from src.services.collector.parsers.base import PageParser
+
+
+def has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# Same strings BeautifulSoup.get_text returns: no comments, scripts, styles or templates
+TEXT = etree.XPath(
+    "descendant::text()[not(parent::script or parent::style or ancestor::template)]"
+)
+
+SEARCH_ATTRACTIONS = etree.XPath(
+    f"//section[{has_class('mowmC')}]"
+    "[@data-automation='WebPresentation_SingleFlexCardSection']"
+    f"//header[{has_class('VLKGO')}]//a[not(preceding-sibling::a)]"
+)
+SEARCH_HOTELS = etree.XPath(
+    f"//span[{has_class('listItem')}]//div[@data-automation='hotel-card-title']//a"
+)
+SEARCH_HOTELS_FALLBACK = etree.XPath(f"//div[{has_class('listing_title')}]/a")
+SEARCH_RESTAURANTS = etree.XPath("//div[@data-automation='restaurantCard']")
+RESTAURANT_LINKS = etree.XPath(".//a[contains(@href, '/Restaurant_Review-')]")
+TOTAL_ATTRACTIONS = etree.XPath(
+    "//section[@data-automation='WebPresentation_WebSortDisclaimer']"
+)
+SPANS = etree.XPath("//span")
+NEXT_PAGE = etree.XPath("//a[@aria-label='Next page']")
+BASIC_DATA = etree.XPath("//script[contains(., 'aggregateRating')]")
+DESCRIPTION = etree.XPath(f"//div[{has_class('fIrGe')} and {has_class('_T')}]")
+
+REVIEW_CARDS = etree.XPath("//div[@data-automation='reviewCard']")
+REVIEW_CARD_RATE = etree.XPath(".//title[contains(@id, 'lithium')]")
+REVIEW_CARD_TITLE = etree.XPath(".//a[contains(@href, '/ShowUserReviews')]")
+REVIEW_CARD_TEXT = etree.XPath(f".//div[{has_class('fIrGe')} and {has_class('_T')}]")
+REVIEW_CARD_TRIP_DATE = etree.XPath(f".//div[{has_class('RpeCd')}]")
+
+HOTEL_AMENITIES = etree.XPath("//div[contains(@data-test-target, 'amenity')]")
+HOTEL_REVIEWS = etree.XPath("//div[@data-reviewid]")
+HOTEL_RATE = etree.XPath(".//div[@data-test-target='review-rating']//title")
+HOTEL_TITLE = etree.XPath(".//div[@data-test-target='review-title']//a//span//span")
+HOTEL_TEXT = etree.XPath(".//span[contains(@data-automation, 'reviewText')]//span")
+HOTEL_TRIP_DATE = etree.XPath(f".//div[{has_class('PDZqu')}]")
+DESCENDANT_SPAN = etree.XPath(".//span")
+
+
+class LxmlPageParser(PageParser):
+    name = "lxml"
+
+    def parse_document(self, response: str) -> lxml.html.HtmlElement:
+        return lxml.html.document_fromstring(response)
+
+    def first(self, elements: list) -> Optional[lxml.html.HtmlElement]:
+        return elements[0] if elements else None
+
+    def get_text(
+        self, element: lxml.html.HtmlElement, strip: bool = False, separator: str = ""
+    ) -> str:
+        strings = TEXT(element)
+        if strip:
+            strings = [text.strip() for text in strings if text.strip()]
+        return separator.join(strings)
+
+    def get_string(self, element: lxml.html.HtmlElement) -> Optional[str]:
+        # Equivalent of BeautifulSoup's Tag.string
+        children = list(element)
+        if not children:
+            return element.text
+        if len(children) == 1 and not element.text and not children[0].tail:
+            return self.get_string(children[0])
+        return None
+
+    def parse_search_attractions(self, document: lxml.html.HtmlElement) -> list[dict]:
+        return [
+            {
+                "name": self.get_text(box, strip=True, separator=" "),
+                "url": box.get("href"),
+            }
+            for box in SEARCH_ATTRACTIONS(document)
+        ]
+
+    def parse_search_hotel(self, document: lxml.html.HtmlElement) -> list[dict]:
+        parsed = [
+            {
+                "name": self.get_text(box, strip=True, separator=" "),
+                "url": box.get("href"),
+            }
+            for box in SEARCH_HOTELS(document)
+        ]
+        if parsed:
+            return parsed
+
+        return [
+            {
+                "name": self.get_text(box, strip=True).split(". ")[-1],
+                "url": box.get("href"),
+            }
+            for box in SEARCH_HOTELS_FALLBACK(document)
+        ]
+
+    def parse_search_restaurants(self, document: lxml.html.HtmlElement) -> list[dict]:
+        results = []
+        for card in SEARCH_RESTAURANTS(document):
+            # Cards also link the photo and the reviews anchor of the same place
+            box = next(
+                (
+                    link
+                    for link in RESTAURANT_LINKS(card)
+                    if "#" not in link.get("href") and self.get_text(link, strip=True)
+                ),
+                None,
+            )
+            if box is not None:
+                results.append(
+                    {
+                        "name": self.strip_rank(
+                            self.get_text(box, strip=True, separator=" ")
+                        ),
+                        "url": box.get("href"),
+                    }
+                )
+        return results
+
+    def parse_total_attractions(self, document: lxml.html.HtmlElement) -> int:
+        total_tag = TOTAL_ATTRACTIONS(document)[0]
+        return int(self.get_text(total_tag).split(" ")[0])
+
+    def parse_total_hotels(self, document: lxml.html.HtmlElement) -> int:
+        total_tag = next(
+            (
+                span
+                for span in SPANS(document)
+                if "properties" in (self.get_string(span) or "")
+            ),
+            None,
+        )
+        return int(self.get_text(total_tag).replace(",", "").split()[0])
+
+    def parse_total_restaurants(self, document: lxml.html.HtmlElement) -> int:
+        total_tag = next(
+            (
+                span
+                for span in SPANS(document)
+                if "results" in (self.get_string(span) or "")
+            ),
+            None,
+        )
+        return self.parse_count(self.get_text(total_tag))
+
+    def parse_next_page(self, document: lxml.html.HtmlElement) -> str:
+        return NEXT_PAGE(document)[0].attrib["href"]
+
+    def parse_basic_data(self, document: lxml.html.HtmlElement) -> dict:
+        script_tag = self.first(BASIC_DATA(document))
+        return json.loads(script_tag.text) if script_tag is not None else {}
+
+    def parse_description(self, document: lxml.html.HtmlElement) -> str | None:
+        description_tag = self.first(DESCRIPTION(document))
+        if description_tag is None:
+            return None
+        return self.get_text(description_tag, strip=True)
+
+    def parse_review_cards(self, document: lxml.html.HtmlElement) -> list[dict]:
+        reviews = []
+        for review in REVIEW_CARDS(document):
+            rate_tag = self.first(REVIEW_CARD_RATE(review))
+            title_tag = self.first(REVIEW_CARD_TITLE(review))
+            text_tag = REVIEW_CARD_TEXT(review)
+            trip_date_tag = self.first(REVIEW_CARD_TRIP_DATE(review))
+
+            reviews.append(
+                self.build_review(
+                    title=(
+                        self.get_text(title_tag, strip=True)
+                        if title_tag is not None
+                        else None
+                    ),
+                    text=(
+                        "".join([self.get_text(span, strip=True) for span in text_tag])
+                        if text_tag
+                        else None
+                    ),
+                    rate=self.parse_rate(
+                        self.get_text(rate_tag, strip=True)
+                        if rate_tag is not None
+                        else None
+                    ),
+                    trip_date=self.parse_attraction_trip_date(
+                        self.get_text(trip_date_tag, strip=True)
+                        if trip_date_tag is not None
+                        else None
+                    ),
+                    review_id=self.parse_review_id(
+                        review.get("data-reviewid"),
+                        title_tag.get("href") if title_tag is not None else None,
+                    ),
+                )
+            )
+        return reviews
+
+    def parse_attraction_details(self, document: lxml.html.HtmlElement) -> dict:
+        return {
+            "basic_data": self.parse_basic_data(document),
+            "description": self.parse_description(document),
+            "reviews": self.parse_review_cards(document),
+        }
+
+    def parse_restaurant_details(self, document: lxml.html.HtmlElement) -> dict:
+        return {
+            "basic_data": self.parse_basic_data(document),
+            "description": self.parse_description(document),
+            "reviews": self.parse_review_cards(document),
+        }
+
+    def parse_hotel_details(self, document: lxml.html.HtmlElement) -> dict:
+        amenities = [
+            self.get_text(feature, strip=True) for feature in HOTEL_AMENITIES(document)
+        ]
+
+        reviews = []
+        for review in HOTEL_REVIEWS(document):
+            rate_tag = self.first(HOTEL_RATE(review))
+            title_tag = self.first(HOTEL_TITLE(review))
+            text_tag = HOTEL_TEXT(review)
+            trip_date_div = HOTEL_TRIP_DATE(review)[0]
+            trip_date_tag = self.first(DESCENDANT_SPAN(trip_date_div))
+
+            reviews.append(
+                self.build_review(
+                    title=(
+                        self.get_text(title_tag, strip=True)
+                        if title_tag is not None
+                        else None
+                    ),
+                    text=(
+                        "".join([self.get_text(span, strip=True) for span in text_tag])
+                        if text_tag
+                        else None
+                    ),
+                    rate=self.parse_rate(
+                        self.get_text(rate_tag, strip=True)
+                        if rate_tag is not None
+                        else None
+                    ),
+                    trip_date=self.parse_hotel_trip_date(
+                        self.get_text(trip_date_tag, strip=True)
+                        if trip_date_tag is not None
+                        else None
+                    ),
+                    review_id=self.parse_review_id(review.get("data-reviewid")),
+                )
+            )
+
+        return {
+            "basic_data": self.parse_basic_data(document),
+            "description": self.parse_description(document),
+            "features": amenities,
+            "reviews": reviews,
+        }
@@ -0,0 +1,24 @@
+import importlib
+
+from src.services.collector.parsers.base import PageParser
+
+# Backends are imported on first use, so a run only pays for the parser it picked
+PARSER_BACKENDS: dict[str, str] = {
+    "beautifulsoup": "src.services.collector.parsers.soup_parser:SoupPageParser",
+    "lxml": "src.services.collector.parsers.lxml_parser:LxmlPageParser",
+}
+
+
+def resolve_parser(name: str) -> tuple[str, str]:
+    try:
+        module_name, class_name = PARSER_BACKENDS[name].split(":")
+    except KeyError:
+        msg = f"Unknown parser backend: {name}"
+        raise ValueError(msg)
+    return module_name, class_name
+
+
+def get_parser(name: str) -> PageParser:
+    module_name, class_name = resolve_parser(name)
+    parser_class = getattr(importlib.import_module(module_name), class_name)
+    return parser_class()
@@ -0,0 +1,171 @@
+import json
+
+from bs4 import BeautifulSoup
+
+from src.services.collector.parsers.base import PageParser
+
+
+class SoupPageParser(PageParser):
+    name = "beautifulsoup"
+
+    def parse_document(self, response: str) -> BeautifulSoup:
+        return BeautifulSoup(response, "lxml")
+
+    def parse_search_attractions(self, document: BeautifulSoup) -> list[dict]:
+        card_sections = document.select(
+            "section.mowmC[data-automation='WebPresentation_SingleFlexCardSection'] header.VLKGO a:first-of-type"
+        )
+        return [
+            {"name": box.get_text(strip=True, separator=" "), "url": box.get("href")}
+            for box in card_sections
+        ]
+
+    def parse_search_hotel(self, document: BeautifulSoup) -> list[dict]:
+        parsed = [
+            {"name": box.get_text(strip=True, separator=" "), "url": box.get("href")}
+            for box in document.select(
+                "span.listItem div[data-automation=hotel-card-title] a"
+            )
+        ]
+        if parsed:
+            return parsed
+
+        return [
+            {"name": box.get_text(strip=True).split(". ")[-1], "url": box.get("href")}
+            for box in document.select("div.listing_title > a")
+        ]
+
+    def parse_search_restaurants(self, document: BeautifulSoup) -> list[dict]:
+        results = []
+        for card in document.select("div[data-automation='restaurantCard']"):
+            # Cards also link the photo and the reviews anchor of the same place
+            box = next(
+                (
+                    link
+                    for link in card.select("a[href*='/Restaurant_Review-']")
+                    if "#" not in link["href"] and link.get_text(strip=True)
+                ),
+                None,
+            )
+            if box is not None:
+                results.append(
+                    {
+                        "name": self.strip_rank(
+                            box.get_text(strip=True, separator=" ")
+                        ),
+                        "url": box.get("href"),
+                    }
+                )
+        return results
+
+    def parse_total_attractions(self, document: BeautifulSoup) -> int:
+        total_tag = document.find(
+            "section", {"data-automation": "WebPresentation_WebSortDisclaimer"}
+        )
+        return int(total_tag.get_text().split(" ")[0])
+
+    def parse_total_hotels(self, document: BeautifulSoup) -> int:
+        total_tag = document.find("span", string=lambda t: t and "properties" in t)
+        return int(total_tag.get_text().replace(",", "").split()[0])
+
+    def parse_total_restaurants(self, document: BeautifulSoup) -> int:
+        total_tag = document.find("span", string=lambda t: t and "results" in t)
+        return self.parse_count(total_tag.get_text())
+
+    def parse_next_page(self, document: BeautifulSoup) -> str:
+        return document.find("a", {"aria-label": "Next page"})["href"]
+
+    def parse_basic_data(self, document: BeautifulSoup) -> dict:
+        script_tag = document.find(
+            "script", string=lambda x: x and "aggregateRating" in x
+        )
+        return json.loads(script_tag.string) if script_tag else {}
+
+    def parse_description(self, document: BeautifulSoup) -> str | None:
+        description_tag = document.select_one("div.fIrGe._T")
+        return description_tag.get_text(strip=True) if description_tag else None
+
+    def parse_review_cards(self, document: BeautifulSoup) -> list[dict]:
+        reviews = []
+        for review in document.select("div[data-automation='reviewCard']"):
+            rate_tag = review.select_one('title[id*="lithium"]')
+            title_tag = review.select_one("a[href*='/ShowUserReviews']")
+            text_tag = review.select("div.fIrGe._T")
+            trip_date_tag = review.select_one("div.RpeCd")
+
+            reviews.append(
+                self.build_review(
+                    title=title_tag.get_text(strip=True) if title_tag else None,
+                    text=(
+                        "".join([span.get_text(strip=True) for span in text_tag])
+                        if text_tag
+                        else None
+                    ),
+                    rate=self.parse_rate(
+                        rate_tag.get_text(strip=True) if rate_tag else None
+                    ),
+                    trip_date=self.parse_attraction_trip_date(
+                        trip_date_tag.get_text(strip=True) if trip_date_tag else None
+                    ),
+                    review_id=self.parse_review_id(
+                        review.get("data-reviewid"),
+                        title_tag.get("href") if title_tag else None,
+                    ),
+                )
+            )
+        return reviews
+
+    def parse_attraction_details(self, document: BeautifulSoup) -> dict:
+        return {
+            "basic_data": self.parse_basic_data(document),
+            "description": self.parse_description(document),
+            "reviews": self.parse_review_cards(document),
+        }
+
+    def parse_restaurant_details(self, document: BeautifulSoup) -> dict:
+        return {
+            "basic_data": self.parse_basic_data(document),
+            "description": self.parse_description(document),
+            "reviews": self.parse_review_cards(document),
+        }
+
+    def parse_hotel_details(self, document: BeautifulSoup) -> dict:
+        amenities = [
+            feature.get_text(strip=True)
+            for feature in document.select("div[data-test-target*='amenity']")
+        ]
+
+        reviews = []
+        for review in document.select("div[data-reviewid]"):
+            rate_tag = review.select_one("div[data-test-target='review-rating'] title")
+            title_tag = review.select_one(
+                "div[data-test-target='review-title'] a span span"
+            )
+            text_tag = review.select("span[data-automation*='reviewText'] span")
+            trip_date_div = review.select_one("div.PDZqu")
+            trip_date_tag = trip_date_div.find("span")
+
+            reviews.append(
+                self.build_review(
+                    title=title_tag.get_text(strip=True) if title_tag else None,
+                    text=(
+                        "".join([span.get_text(strip=True) for span in text_tag])
+                        if text_tag
+                        else None
+                    ),
+                    rate=self.parse_rate(
+                        rate_tag.get_text(strip=True) if rate_tag else None
+                    ),
+                    trip_date=self.parse_hotel_trip_date(
+                        trip_date_tag.get_text(strip=True) if trip_date_tag else None
+                    ),
+                    review_id=self.parse_review_id(review.get("data-reviewid")),
+                )
+            )
+
+        return {
+            "basic_data": self.parse_basic_data(document),
+            "description": self.parse_description(document),
+            "features": amenities,
+            "reviews": reviews,
+        }
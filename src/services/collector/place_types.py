@@ -0,0 +1,55 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from src.schemas.collector.location import LocationSchema
+
+
+@dataclass(frozen=True)
+class PlaceType:
+    name: str
+    plural: str
+    listing_field: str
+    search_parser: str
+    total_parser: str
+    details_parser: str
+    search_strategy: str = "search"
+    reviews_strategy: str = "reviews"
+    # Some listing links have no offset, the pagination needs one to rewrite
+    listing_offset: Optional[tuple[str, str]] = None
+
+    def listing_url(self, location: LocationSchema, base_url: str) -> Optional[str]:
+        path = getattr(location, self.listing_field)
+        if not path:
+            return None
+        if self.listing_offset:
+            path = path.replace(*self.listing_offset)
+        return base_url + path
+
+
+PLACE_TYPES = {
+    "attractions": PlaceType(
+        name="attraction",
+        plural="attractions",
+        listing_field="attractions_url",
+        search_parser="parse_search_attractions",
+        total_parser="parse_total_attractions",
+        details_parser="parse_attraction_details",
+        listing_offset=("-Activities-", "-Activities-oa0-"),
+    ),
+    "hotels": PlaceType(
+        name="hotel",
+        plural="hotels",
+        listing_field="hotels_url",
+        search_parser="parse_search_hotel",
+        total_parser="parse_total_hotels",
+        details_parser="parse_hotel_details",
+    ),
+    "restaurants": PlaceType(
+        name="restaurant",
+        plural="restaurants",
+        listing_field="restaurants_url",
+        search_parser="parse_search_restaurants",
+        total_parser="parse_total_restaurants",
+        details_parser="parse_restaurant_details",
+    ),
+}
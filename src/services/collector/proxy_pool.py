@@ -0,0 +1,146 @@
+import asyncio
+import random
+import secrets
+from dataclasses import dataclass
+from typing import Optional
+
+from apify import Actor, ProxyConfiguration
+from loguru import logger as log
+
+from src.utils.constants import (
+    PROXY_ERROR_PENALTY,
+    PROXY_LATENCY_DECAY,
+    PROXY_MAX_ERRORS,
+    PROXY_POOL_SIZE,
+    PROXY_SCORE_SMOOTHING,
+)
+
+
+@dataclass
+class ProxySession:
+    session_id: str
+    url: str
+    requests: int = 0
+    errors: int = 0
+    consecutive_errors: int = 0
+    blocks: int = 0
+    latency: float = 0.0
+    retired: bool = False
+
+    @property
+    def score(self) -> float:
+        # Lower is better, unused sessions are tried before slow or failing ones
+        if not self.requests:
+            return 0.0
+        failure_rate = (self.errors + self.blocks) / self.requests
+        return self.latency + failure_rate * PROXY_ERROR_PENALTY
+
+
+class ProxyPool:
+    def __init__(
+        self,
+        use_apify_proxies: bool,
+        proxy_urls: Optional[list[str]] = None,
+        size: int = PROXY_POOL_SIZE,
+        max_errors: int = PROXY_MAX_ERRORS,
+    ) -> None:
+        self.use_apify_proxies = use_apify_proxies
+        self.proxy_urls = proxy_urls or None
+        self.size = max(size, 1)
+        self.max_errors = max_errors
+        self.configuration: Optional[ProxyConfiguration] = None
+        self.sessions: list[ProxySession] = []
+        self.pinned: dict[str, ProxySession] = {}
+        self.lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.use_apify_proxies or bool(self.proxy_urls)
+
+    async def open(self) -> Optional[ProxyConfiguration]:
+        if self.configuration is None and self.enabled:
+            # A plain URL list needs no Apify account, which keeps local runs offline
+            if self.proxy_urls:
+                self.configuration = ProxyConfiguration(proxy_urls=self.proxy_urls)
+            else:
+                self.configuration = await Actor.create_proxy_configuration()
+        return self.configuration
+
+    async def acquire(
+        self, session_key: Optional[str] = None
+    ) -> Optional[ProxySession]:
+        if not self.enabled:
+            return None
+
+        async with self.lock:
+            session = self.pinned.get(session_key) if session_key else None
+            if session is None or session.retired:
+                session = await self.pick()
+                if session_key and session:
+                    self.pinned[session_key] = session
+        return session
+
+    async def pick(self) -> Optional[ProxySession]:
+        if len(self.sessions) < self.size:
+            return await self.new_session()
+        # Weighted by score, so load rotates over the pool and still favours the
+        # fast, healthy sessions
+        return random.choices(
+            self.sessions,
+            weights=[
+                1 / (session.score + PROXY_SCORE_SMOOTHING) for session in self.sessions
+            ],
+        )[0]
+
+    async def new_session(self) -> Optional[ProxySession]:
+        configuration = await self.open()
+        if configuration is None:
+            return None
+
+        session_id = f"session_{secrets.token_hex(6)}"
+        url = await configuration.new_url(session_id=session_id)
+        if url is None:
+            return None
+
+        session = ProxySession(session_id=session_id, url=url)
+        self.sessions.append(session)
+        log.info(f"Using proxy session {session_id}")
+        return session
+
+    def release(self, session_key: str) -> None:
+        self.pinned.pop(session_key, None)
+
+    def report(
+        self,
+        session: Optional[ProxySession],
+        latency: float,
+        error: bool = False,
+        blocked: bool = False,
+    ) -> None:
+        if session is None:
+            return
+
+        session.requests += 1
+        session.latency = (
+            latency
+            if session.requests == 1
+            else PROXY_LATENCY_DECAY * latency
+            + (1 - PROXY_LATENCY_DECAY) * session.latency
+        )
+        if blocked:
+            session.blocks += 1
+            self.retire(session, reason="blocked")
+        elif error:
+            session.errors += 1
+            session.consecutive_errors += 1
+            if session.consecutive_errors >= self.max_errors:
+                self.retire(session, reason="failing")
+        else:
+            session.consecutive_errors = 0
+
+    def retire(self, session: ProxySession, reason: str) -> None:
+        if session.retired:
+            return
+        session.retired = True
+        self.sessions = [s for s in self.sessions if s is not session]
+        log.warning(f"Retiring {reason} proxy session {session.session_id}")
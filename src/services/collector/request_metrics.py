@@ -0,0 +1,182 @@
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Optional
+
+from aiohttp import (
+    ClientSession,
+    TraceConfig,
+    TraceConnectionCreateEndParams,
+    TraceConnectionCreateStartParams,
+    TraceConnectionQueuedEndParams,
+    TraceConnectionQueuedStartParams,
+    TraceDnsResolveHostEndParams,
+    TraceDnsResolveHostStartParams,
+    TraceRequestEndParams,
+    TraceRequestHeadersSentParams,
+    TraceRequestStartParams,
+)
+
+from src.utils.endpoints import get_endpoint_type
+from src.utils.histogram import Histogram
+
+PHASES = ("queue", "dns", "connect", "ttfb", "download", "total")
+
+
+@dataclass
+class RequestTiming:
+    started_at: Optional[float] = None
+    headers_sent_at: Optional[float] = None
+    response_at: Optional[float] = None
+    phases: dict[str, float] = field(default_factory=dict)
+    marks: dict[str, float] = field(default_factory=dict)
+
+    def start(self, phase: str) -> None:
+        self.marks[phase] = time.perf_counter()
+
+    def end(self, phase: str) -> None:
+        started = self.marks.pop(phase, None)
+        if started is not None:
+            self.phases[phase] = self.phases.get(phase, 0.0) + (
+                time.perf_counter() - started
+            )
+
+
+class RequestMetrics:
+    def __init__(self) -> None:
+        self.histograms: dict[str, dict[str, Histogram]] = defaultdict(
+            lambda: {phase: Histogram() for phase in PHASES}
+        )
+        self.statuses: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.started_at = time.time()
+
+    def trace_config(self) -> TraceConfig:
+        trace_config = TraceConfig(trace_config_ctx_factory=self.trace_context)
+        trace_config.on_request_start.append(self.on_request_start)
+        trace_config.on_connection_queued_start.append(self.on_queued_start)
+        trace_config.on_connection_queued_end.append(self.on_queued_end)
+        trace_config.on_dns_resolvehost_start.append(self.on_dns_start)
+        trace_config.on_dns_resolvehost_end.append(self.on_dns_end)
+        trace_config.on_connection_create_start.append(self.on_connect_start)
+        trace_config.on_connection_create_end.append(self.on_connect_end)
+        trace_config.on_request_headers_sent.append(self.on_headers_sent)
+        trace_config.on_request_end.append(self.on_request_end)
+        return trace_config
+
+    def trace_context(
+        self, trace_request_ctx: Optional[RequestTiming] = None
+    ) -> SimpleNamespace:
+        # Requests sent without a timing still get traced, they are just not recorded
+        return SimpleNamespace(timing=trace_request_ctx or RequestTiming())
+
+    async def on_request_start(
+        self,
+        session: ClientSession,
+        ctx: SimpleNamespace,
+        params: TraceRequestStartParams,
+    ) -> None:
+        if ctx.timing.started_at is None:
+            ctx.timing.started_at = time.perf_counter()
+
+    async def on_queued_start(
+        self,
+        session: ClientSession,
+        ctx: SimpleNamespace,
+        params: TraceConnectionQueuedStartParams,
+    ) -> None:
+        ctx.timing.start("queue")
+
+    async def on_queued_end(
+        self,
+        session: ClientSession,
+        ctx: SimpleNamespace,
+        params: TraceConnectionQueuedEndParams,
+    ) -> None:
+        ctx.timing.end("queue")
+
+    async def on_dns_start(
+        self,
+        session: ClientSession,
+        ctx: SimpleNamespace,
+        params: TraceDnsResolveHostStartParams,
+    ) -> None:
+        ctx.timing.start("dns")
+
+    async def on_dns_end(
+        self,
+        session: ClientSession,
+        ctx: SimpleNamespace,
+        params: TraceDnsResolveHostEndParams,
+    ) -> None:
+        ctx.timing.end("dns")
+
+    async def on_connect_start(
+        self,
+        session: ClientSession,
+        ctx: SimpleNamespace,
+        params: TraceConnectionCreateStartParams,
+    ) -> None:
+        ctx.timing.start("connect")
+
+    async def on_connect_end(
+        self,
+        session: ClientSession,
+        ctx: SimpleNamespace,
+        params: TraceConnectionCreateEndParams,
+    ) -> None:
+        ctx.timing.end("connect")
+        # Connection creation includes the DNS lookup, keep the phases disjoint
+        ctx.timing.phases["connect"] -= ctx.timing.phases.get("dns", 0.0)
+
+    async def on_headers_sent(
+        self,
+        session: ClientSession,
+        ctx: SimpleNamespace,
+        params: TraceRequestHeadersSentParams,
+    ) -> None:
+        ctx.timing.headers_sent_at = time.perf_counter()
+
+    async def on_request_end(
+        self,
+        session: ClientSession,
+        ctx: SimpleNamespace,
+        params: TraceRequestEndParams,
+    ) -> None:
+        ctx.timing.response_at = time.perf_counter()
+
+    def record(self, url: str, timing: RequestTiming, status: Optional[int]) -> None:
+        endpoint_type = get_endpoint_type(url)
+        histograms = self.histograms[endpoint_type]
+        self.statuses[endpoint_type][str(status) if status else "error"] += 1
+        if timing.started_at is None:
+            return
+
+        finished_at = time.perf_counter()
+        phases = dict(timing.phases)
+        if timing.headers_sent_at is not None and timing.response_at is not None:
+            phases["ttfb"] = timing.response_at - timing.headers_sent_at
+        if timing.response_at is not None:
+            phases["download"] = finished_at - timing.response_at
+        phases["total"] = finished_at - timing.started_at
+
+        for phase, value in phases.items():
+            if phase in histograms:
+                histograms[phase].observe(max(value, 0.0))
+
+    def summary(self) -> dict:
+        return {
+            "started_at": self.started_at,
+            "finished_at": time.time(),
+            "endpoints": {
+                endpoint_type: {
+                    "statuses": dict(self.statuses[endpoint_type]),
+                    "phases": {
+                        phase: histogram.summary()
+                        for phase, histogram in histograms.items()
+                        if histogram.count
+                    },
+                }
+                for endpoint_type, histograms in self.histograms.items()
+            },
+        }
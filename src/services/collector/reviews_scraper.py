@@ -1,116 +1,575 @@
 import asyncio
-import json
 import math
-from typing import Any, Callable, Optional, Union
+import re
+from collections import deque
+from contextlib import aclosing
+from datetime import datetime
+from functools import partial
+from itertools import islice
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterator,
+    Optional,
+    Union,
+)
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from loguru import logger as log
 
 from src.schemas.collector.location import LocationSchema
-from src.schemas.collector.place import PlaceSchema, ReviewSchema
+from src.schemas.collector.place import PlaceSchema
+from src.schemas.collector.review import CompactReview, load_reviews
 from src.schemas.collector.search import SearchSchema
 from src.services.collector.base import ReviewsBaseScraper
+from src.services.collector.dedup import ReviewDeduplicator
+from src.services.collector.location_cache import LocationCache
+from src.services.collector.parsers.executor import ParseExecutor
+from src.services.collector.place_types import PLACE_TYPES, PlaceType
+from src.services.collector.request_metrics import RequestMetrics
+from src.services.collector.watermarks import ReviewWatermarks
+from src.utils.constants import (
+    BASE_URL,
+    BURST,
+    CACHE_MAX_SIZE_MB,
+    CACHE_MODE,
+    CONCURRENCY,
+    CONNECT_TIMEOUT,
+    GRAPHQL_BATCH_SIZE,
+    MAX_CONCURRENCY,
+    MAX_CONNECTIONS,
+    MAX_CONNECTIONS_PER_HOST,
+    PARSE_EXECUTOR,
+    PARSER_BACKEND,
+    READ_TIMEOUT,
+    REQUEST_DEADLINE,
+    REQUESTS_PER_SECOND,
+    RETRY_ATTEMPTS,
+    REVIEWS_QUERY_ID,
+    REVIEWS_SOURCE,
+    REVIEWS_SOURCES,
+    TOTAL_TIMEOUT,
+    TYPEAHEAD_QUERY_ID,
+)
+
+LOCATION_ID_PATTERN = re.compile(r"-d(\d+)-")
+
+
+class PageFetchError(Exception):
+    pass
 
 
 class ReviewsScraper(ReviewsBaseScraper):
-    def __init__(self, use_apify_proxies: bool) -> None:
-        super().__init__(use_apify_proxies=use_apify_proxies)
+    def __init__(
+        self,
+        use_apify_proxies: bool,
+        proxy_urls: Optional[list[str]] = None,
+        max_connections: int = MAX_CONNECTIONS,
+        max_connections_per_host: int = MAX_CONNECTIONS_PER_HOST,
+        concurrency: int = CONCURRENCY,
+        requests_per_second: float = REQUESTS_PER_SECOND,
+        burst: int = BURST,
+        max_concurrency: int = MAX_CONCURRENCY,
+        parser_backend: str = PARSER_BACKEND,
+        parse_executor: str = PARSE_EXECUTOR,
+        cache_mode: str = CACHE_MODE,
+        cache_max_size_mb: int = CACHE_MAX_SIZE_MB,
+        max_retries: int = RETRY_ATTEMPTS,
+        request_deadline: float = REQUEST_DEADLINE,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        read_timeout: float = READ_TIMEOUT,
+        total_timeout: float = TOTAL_TIMEOUT,
+        request_metrics: Optional[RequestMetrics] = None,
+        incremental: bool = False,
+        dedup_index: bool = False,
+        reviews_source: str = REVIEWS_SOURCE,
+        graphql_batch_size: int = GRAPHQL_BATCH_SIZE,
+        base_url: str = BASE_URL,
+    ) -> None:
+        if reviews_source not in REVIEWS_SOURCES:
+            msg = f"Unknown reviews source: {reviews_source}"
+            raise ValueError(msg)
+
+        super().__init__(
+            use_apify_proxies=use_apify_proxies,
+            proxy_urls=proxy_urls,
+            max_connections=max_connections,
+            max_connections_per_host=max_connections_per_host,
+            requests_per_second=requests_per_second,
+            burst=burst,
+            max_concurrency=max_concurrency,
+            cache_mode=cache_mode,
+            cache_max_size_mb=cache_max_size_mb,
+            max_retries=max_retries,
+            request_deadline=request_deadline,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            total_timeout=total_timeout,
+            request_metrics=request_metrics,
+            graphql_batch_size=graphql_batch_size,
+            base_url=base_url,
+        )
+        self.concurrency = max(concurrency, 1)
+        self.incremental = incremental
+        self.reviews_source = reviews_source
+        self.review_watermarks = ReviewWatermarks()
+        self.review_dedup = ReviewDeduplicator(
+            path=(
+                self.storage_dir / "review_index" / "reviews.sqlite"
+                if dedup_index
+                else None
+            )
+        )
+        self.location_cache = LocationCache()
+        self.parse_executor = ParseExecutor(backend=parser_backend, mode=parse_executor)
 
-    async def fetch_pagination_results(
+    async def close_session(self) -> None:
+        self.parse_executor.shutdown()
+        await self.review_dedup.close()
+        await super().close_session()
+
+    async def iter_pagination_results(
         self,
         base_url: str,
         page_size: int,
         total_pages: int,
         strategy: str,
         parse_function: Callable,
-    ) -> list[Any]:
-        pagination_urls = self.generate_pagination_urls(
-            base_url=base_url,
-            page_size=page_size,
-            total_pages=total_pages,
-            strategy=strategy,
+        should_stop: Optional[Callable[[Any], bool]] = None,
+        skip_pages: int = 0,
+        session_key: Optional[str] = None,
+        skip_failed: bool = False,
+    ) -> AsyncIterator[Any]:
+        pagination_urls = islice(
+            self.generate_pagination_urls(
+                base_url=base_url,
+                page_size=page_size,
+                total_pages=total_pages,
+                strategy=strategy,
+            ),
+            skip_pages,
+            None,
         )
 
-        results = []
-        for url in pagination_urls:
+        async def fetch_page(url: str) -> Any:
             try:
-                response = await self.get_data(url=url, type="text")
-                data = parse_function(response=response)
+                response = await self.get_data(
+                    url=url, type="text", session_key=session_key
+                )
+                return await parse_function(response=response) if response else None
+            except Exception as e:
+                log.error(f"Error in fetching pagination results for {url}: {e}")
+                return None
 
+        async with aclosing(
+            self.iter_in_order(
+                pagination_urls,
+                fetch_page,
+                should_stop=should_stop,
+                skip_failed=skip_failed,
+            )
+        ) as pages:
+            async for data in pages:
+                yield data
+
+    async def iter_in_order(
+        self,
+        items: Iterator[Any],
+        fetch: Callable[[Any], Awaitable[Any]],
+        should_stop: Optional[Callable[[Any], bool]] = None,
+        skip_failed: bool = False,
+    ) -> AsyncIterator[Any]:
+        # A sliding window of `concurrency` fetches in flight, yielded in item order.
+        # A failed page raises, unless `skip_failed` lets the later pages through
+        pending: deque[tuple[Any, asyncio.Task]] = deque(
+            (item, asyncio.ensure_future(fetch(item)))
+            for item in islice(items, self.concurrency)
+        )
+        try:
+            while pending:
+                item, task = pending.popleft()
+                data = await task
+                if data is None:
+                    self.metrics.inc("pages_failed_total")
+                    if not skip_failed:
+                        # Later pages are dropped too, so callers can resume from this one
+                        msg = f"Failed to fetch page {item}"
+                        raise PageFetchError(msg)
+                    log.warning(f"Skipping page {item}, it could not be fetched")
+
+                next_item = next(items, None)
+                if next_item is not None:
+                    pending.append((next_item, asyncio.ensure_future(fetch(next_item))))
+
+                if data is None:
+                    continue
+                self.metrics.inc("pages_total")
+                yield data
+                if should_stop is not None and should_stop(data):
+                    return
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+    async def iter_graphql_review_pages(
+        self,
+        url: str,
+        page_size: int,
+        total_pages: int,
+        should_stop: Optional[Callable[[Any], bool]] = None,
+        skip_pages: int = 0,
+        skip_failed: bool = False,
+    ) -> AsyncIterator[PlaceSchema]:
+        match = LOCATION_ID_PATTERN.search(url)
+        if not match:
+            log.error(f"No location id in {url}, cannot fetch reviews as JSON")
+            return
+        location_id = int(match.group(1))
+        # Same offsets as the HTML pages, so cursors and watermarks stay comparable
+        offsets = iter(
+            range(page_size * (skip_pages + 1), page_size * total_pages, page_size)
+        )
+
+        async def fetch_page(offset: int) -> Optional[PlaceSchema]:
+            try:
+                data = await self.graphql.execute(
+                    REVIEWS_QUERY_ID,
+                    {
+                        "locationId": location_id,
+                        "offset": offset,
+                        "limit": page_size,
+                        "filters": [],
+                        "prefs": None,
+                        "initialPrefs": {},
+                        "filterCacheKey": None,
+                        "prefsCacheKey": "locationReviewPrefs",
+                        "needKeywords": False,
+                    },
+                )
+                if not data:
+                    return None
+                with self.profiler.span("parse.graphql_reviews"):
+                    return self.parse_graphql_reviews(data)
+            except Exception as e:
+                log.error(
+                    f"Error in fetching reviews at offset {offset} for {url}: {e}"
+                )
+                return None
+
+        async with aclosing(
+            self.iter_in_order(
+                offsets, fetch_page, should_stop=should_stop, skip_failed=skip_failed
+            )
+        ) as pages:
+            async for page in pages:
+                yield page
+
+    def parse_graphql_reviews(self, data: dict) -> PlaceSchema:
+        reviews = data["locations"][0]["reviewListPage"]["reviews"]
+        return PlaceSchema(
+            reviews=load_reviews(
+                {
+                    "review_id": str(review["id"]) if review.get("id") else None,
+                    "title": review.get("title"),
+                    "text": review.get("text"),
+                    "rate": (
+                        str(float(review["rating"]))
+                        if review.get("rating") is not None
+                        else None
+                    ),
+                    "trip_date": self.parse_stay_date(
+                        (review.get("tripInfo") or {}).get("stayDate")
+                    ),
+                }
+                for review in reviews
+            )
+        )
+
+    def parse_stay_date(self, stay_date: Optional[str]) -> Optional[str]:
+        # "2024-03-31" from the API, shown as "Mar 2024" on the pages
+        if not stay_date:
+            return None
+        try:
+            return datetime.strptime(stay_date[:10], "%Y-%m-%d").strftime("%b %Y")
+        except ValueError:
+            return stay_date
+
+    async def fetch_pagination_results(
+        self,
+        base_url: str,
+        page_size: int,
+        total_pages: int,
+        strategy: str,
+        parse_function: Callable,
+        should_stop: Optional[Callable[[Any], bool]] = None,
+        session_key: Optional[str] = None,
+    ) -> list[Any]:
+        results = []
+        async with aclosing(
+            self.iter_pagination_results(
+                base_url=base_url,
+                page_size=page_size,
+                total_pages=total_pages,
+                strategy=strategy,
+                parse_function=parse_function,
+                should_stop=should_stop,
+                session_key=session_key,
+                # One missing page of results must not cost the pages that came back
+                skip_failed=True,
+            )
+        ) as pages:
+            async for data in pages:
                 if isinstance(data, list):
                     results.extend(data)
                 else:
                     results.append(data)
 
-                await asyncio.sleep(5)
-            except Exception as e:
-                log.error(f"Error in fetching pagination results for {url}: {e}")
-
         return results
 
+    async def iter_place_details(
+        self,
+        url: str,
+        place_type: str,
+        parse_function: Callable,
+        max_reviews_page: Optional[int] = None,
+        start_page: int = 0,
+        strategy: str = "reviews",
+        skip_failed: bool = False,
+    ) -> AsyncIterator[Union[PlaceSchema, list[CompactReview]]]:
+        # Yields the place (with its first page of reviews), then each further page
+        # and pins one proxy session for all of them. Raises PageFetchError on the
+        # first page that fails, after yielding the pages before it, unless
+        # `skip_failed` skips it
+        try:
+            details = await self.fetch_details_page(url, place_type, parse_function)
+            log.info(f"Scraping {place_type} details for {details.basic_data.name}")
+
+            reviews_page_size = len(details.reviews) or 0
+            if reviews_page_size == 0:
+                yield details
+                return
+
+            known_reviews = (
+                await self.review_watermarks.load(url) if self.incremental else []
+            )
+            # Stopping is decided against the previous run only, `seen` also grows
+            # with the reviews yielded during this one
+            known_set = set(known_reviews)
+            seen = set(known_reviews)
+            new_fingerprints: list[str] = []
+            first_page_known = self.review_watermarks.is_known_page(details, known_set)
+            total_reviews_pages = self.count_review_pages(
+                details, reviews_page_size, max_reviews_page
+            )
+
+            if start_page > 0:
+                # Pages before the cursor were already emitted by an earlier run
+                details.reviews = []
+            elif self.incremental:
+                details.reviews = self.review_watermarks.filter_new(
+                    details.reviews, known=seen, fingerprints=new_fingerprints
+                )
+            details.reviews = await self.filter_duplicates(url, details.reviews)
+            yield details
+
+            if not first_page_known:
+                review_pages = self.iter_review_pages(
+                    url,
+                    page_size=reviews_page_size,
+                    total_pages=total_reviews_pages,
+                    strategy=strategy,
+                    parse_function=parse_function,
+                    should_stop=partial(
+                        self.review_watermarks.is_known_page, known=known_set
+                    ),
+                    skip_pages=max(start_page - 1, 0),
+                    skip_failed=skip_failed,
+                )
+                async with aclosing(review_pages) as pages:
+                    async for page in pages:
+                        reviews = page.reviews or []
+                        if self.incremental:
+                            reviews = self.review_watermarks.filter_new(
+                                reviews, known=seen, fingerprints=new_fingerprints
+                            )
+                        yield await self.filter_duplicates(url, reviews)
+
+            if self.incremental:
+                # Saved by the caller once the yielded reviews are in the dataset
+                self.review_watermarks.stage(
+                    url,
+                    new_fingerprints=new_fingerprints,
+                    known=known_reviews,
+                    review_count=int(details.basic_data.aggregate_rating.review_count),
+                )
+        finally:
+            self.proxy_pool.release(url)
+
+    async def fetch_details_page(
+        self, url: str, place_type: str, parse_function: Callable
+    ) -> PlaceSchema:
+        response = await self.get_data(url=url, type="text", session_key=url)
+        details = await parse_function(response=response) if response else None
+        if not details:
+            self.metrics.inc("pages_failed_total")
+            msg = f"No {place_type} details found for {url}"
+            raise PageFetchError(msg)
+
+        self.metrics.inc("pages_total")
+        return details
+
+    def count_review_pages(
+        self, details: PlaceSchema, page_size: int, max_reviews_page: Optional[int]
+    ) -> int:
+        total_reviews = int(details.basic_data.aggregate_rating.review_count)
+        total_pages = math.ceil(total_reviews / page_size)
+        if max_reviews_page and max_reviews_page < total_pages:
+            return max_reviews_page
+        return total_pages
+
+    def iter_review_pages(
+        self,
+        url: str,
+        page_size: int,
+        total_pages: int,
+        strategy: str,
+        parse_function: Callable,
+        should_stop: Optional[Callable[[Any], bool]] = None,
+        skip_pages: int = 0,
+        skip_failed: bool = False,
+    ) -> AsyncIterator[PlaceSchema]:
+        if self.reviews_source == "graphql":
+            return self.iter_graphql_review_pages(
+                url,
+                page_size=page_size,
+                total_pages=total_pages,
+                should_stop=should_stop,
+                skip_pages=skip_pages,
+                skip_failed=skip_failed,
+            )
+        return self.iter_pagination_results(
+            base_url=url,
+            page_size=page_size,
+            total_pages=total_pages,
+            strategy=strategy,
+            parse_function=parse_function,
+            should_stop=should_stop,
+            skip_pages=skip_pages,
+            session_key=url,
+            skip_failed=skip_failed,
+        )
+
+    async def collect_place_details(
+        self, url: str, stream: AsyncIterator[Union[PlaceSchema, list[CompactReview]]]
+    ) -> PlaceSchema | None:
+        place = None
+        try:
+            async with aclosing(stream) as items:
+                async for item in items:
+                    if isinstance(item, PlaceSchema):
+                        place = item
+                    else:
+                        place.reviews.extend(item)
+        except Exception:
+            # Nothing gets pushed, so a retry must not drop these as duplicates
+            if place and place.reviews:
+                self.review_dedup.forget(url, place.reviews)
+            raise
+
+        if place and place.reviews:
+            log.info(
+                f"Scraped {len(place.reviews)} reviews for {place.basic_data.name}"
+            )
+        return place
+
+    def build_place(self, data: dict) -> PlaceSchema:
+        with self.profiler.span("validate.place"):
+            reviews = data.pop("reviews", None) or []
+            place = PlaceSchema.model_validate(
+                data, context={"base_url": self.base_url}
+            )
+            place.reviews = [CompactReview.from_dict(review) for review in reviews]
+            return place
+
+    async def filter_duplicates(
+        self, url: str, reviews: list[CompactReview]
+    ) -> list[CompactReview]:
+        with self.profiler.span("dedup"):
+            unique = await self.review_dedup.filter(url, reviews)
+        self.metrics.inc("reviews_total", len(unique))
+        self.metrics.inc("reviews_duplicate_total", len(reviews) - len(unique))
+        return unique
+
     async def scrape_location(
         self,
         query: str,
         limit: int = 10,
+        locale: str = "vi",
     ) -> list[LocationSchema]:
-        payload = [
-            {
-                "variables": {
-                    "request": {
-                        "query": query,
-                        "limit": limit,
-                        "scope": "WORLDWIDE",
-                        "locale": "vi",
-                        "scopeGeoId": 1,
-                        "searchCenter": None,
-                        # Note: Can expand to search for differents.
-                        "types": [
-                            "LOCATION",
-                            # "QUERY_SUGGESTION",
-                            # "RESCUE_RESULT"
-                        ],
-                        "locationTypes": [
-                            "GEO",
-                            "AIRPORT",
-                            "ACCOMMODATION",
-                            "ATTRACTION",
-                            "ATTRACTION_PRODUCT",
-                            "EATERY",
-                            "NEIGHBORHOOD",
-                            "AIRLINE",
-                            "SHOPPING",
-                            "UNIVERSITY",
-                            "GENERAL_HOSPITAL",
-                            "PORT",
-                            "FERRY",
-                            "CORPORATION",
-                            "VACATION_RENTAL",
-                            "SHIP",
-                            "CRUISE_LINE",
-                            "CAR_RENTAL_OFFICE",
-                        ],
-                        "userId": None,
-                        "context": {},
-                        "enabledFeatures": ["articles"],
-                        "includeRecent": True,
-                    }
-                },
-                "query": "84b17ed122fbdbd4",
-                "extensions": {"preRegisteredQueryId": "84b17ed122fbdbd4"},
+        key = self.location_cache.build_key(query=query, limit=limit, locale=locale)
+        return await self.location_cache.get(
+            key,
+            fetch=lambda: self.fetch_location(query=query, limit=limit, locale=locale),
+        )
+
+    async def fetch_location(
+        self,
+        query: str,
+        limit: int = 10,
+        locale: str = "vi",
+    ) -> list[LocationSchema]:
+        variables = {
+            "request": {
+                "query": query,
+                "limit": limit,
+                "scope": "WORLDWIDE",
+                "locale": locale,
+                "scopeGeoId": 1,
+                "searchCenter": None,
+                # Note: Can expand to search for differents.
+                "types": [
+                    "LOCATION",
+                    # "QUERY_SUGGESTION",
+                    # "RESCUE_RESULT"
+                ],
+                "locationTypes": [
+                    "GEO",
+                    "AIRPORT",
+                    "ACCOMMODATION",
+                    "ATTRACTION",
+                    "ATTRACTION_PRODUCT",
+                    "EATERY",
+                    "NEIGHBORHOOD",
+                    "AIRLINE",
+                    "SHOPPING",
+                    "UNIVERSITY",
+                    "GENERAL_HOSPITAL",
+                    "PORT",
+                    "FERRY",
+                    "CORPORATION",
+                    "VACATION_RENTAL",
+                    "SHIP",
+                    "CRUISE_LINE",
+                    "CAR_RENTAL_OFFICE",
+                ],
+                "userId": None,
+                "context": {},
+                "enabledFeatures": ["articles"],
+                "includeRecent": True,
             }
-        ]
+        }
 
         try:
-            data = await self.post_data(
-                url="https://www.tripadvisor.com/data/graphql/ids", data=payload
-            )
+            # Lookups running at the same time are sent together in one batch
+            data = await self.graphql.execute(TYPEAHEAD_QUERY_ID, variables)
 
             if not data:
                 log.warning(f"No location data found for query: {query}")
                 return []
 
-            results = data[0]["data"]["Typeahead_autocomplete"]["results"]
+            results = data["Typeahead_autocomplete"]["results"]
             return [
                 LocationSchema.model_validate(result["details"]) for result in results
             ]
@@ -118,403 +577,320 @@ class ReviewsScraper(ReviewsBaseScraper):
             log.error(f"Error in location search for query {query}: {e}")
             return []
 
-    async def scrape_search_attractions(
+    async def scrape_search_places(
         self,
+        place_type: PlaceType,
         query: str,
         max_places_page: Optional[int] = None,
-        max_reviews_page: Optional[int] = None,
-        base_url: str = "https://www.tripadvisor.com",
-    ) -> list[SearchSchema]:
+        base_url: Optional[str] = None,
+    ) -> Optional[list[SearchSchema]]:
+        # None when the search failed, so the query is retried on resume
+        base_url = base_url or self.base_url
+        listing_url = None
         try:
             locations = await self.scrape_location(query=query)
             if not locations:
                 log.error(f"No locations found for query: {query}")
-                return []
+                return None
 
             location = locations[0]
             if location.is_geo is False:
-                return await self.scrape_attraction_details(
-                    url_path=location.url, max_reviews_page=max_reviews_page
-                )
+                return [SearchSchema(name=location.localized_name, url=location.url)]
 
-            attractions_url = base_url + location.attractions_url.replace(
-                "-Activities-", "-Activities-oa0-"
-            )
+            listing_url = place_type.listing_url(location, base_url=base_url)
+            if not listing_url:
+                log.error(f"No {place_type.plural} listing for query: {query}")
+                return None
 
-            log.info(f"Scraping attractions for query: {query}")
+            log.info(f"Scraping {place_type.plural} for query: {query}")
 
-            response = await self.get_data(url=attractions_url, type="text")
+            response = await self.get_data(
+                url=listing_url, type="text", session_key=listing_url
+            )
             if not response:
                 log.error(f"No search results for query: {query}")
-                return []
+                return None
 
-            results = self.parse_search_attractions(response=response)
+            items, total_places, next_page = await self.parse_executor.parse(
+                response,
+                place_type.search_parser,
+                place_type.total_parser,
+                "parse_next_page",
+            )
+            results = [SearchSchema(**item) for item in items]
             if not results:
                 log.error(f"No parseable results for query: {query}")
-                return []
+                self.metrics.inc("pages_failed_total")
+                return None
+            self.metrics.inc("pages_total")
 
-            soup = BeautifulSoup(response, "lxml")
-            attractions_page_size = len(results)
-            total_tag = soup.find(
-                "section", {"data-automation": "WebPresentation_WebSortDisclaimer"}
-            )
-            total_attractions = int(total_tag.get_text().split(" ")[0])
+            places_page_size = len(results)
 
-            total_attractions_pages = int(
-                math.ceil(total_attractions / attractions_page_size)
-            )
-            if max_places_page and max_places_page < total_attractions_pages:
-                total_attractions_pages = max_places_page
+            total_places_pages = int(math.ceil(total_places / places_page_size))
+            if max_places_page and max_places_page < total_places_pages:
+                total_places_pages = max_places_page
 
-            next_page_tag = soup.find("a", {"aria-label": "Next page"})["href"]
-            next_page_url = urljoin(attractions_url, next_page_tag)
+            next_page_url = urljoin(listing_url, next_page)
 
             additional_results = await self.fetch_pagination_results(
                 base_url=next_page_url,
-                page_size=attractions_page_size,
-                total_pages=total_attractions_pages,
-                strategy="search",
-                parse_function=self.parse_search_attractions,
+                page_size=places_page_size,
+                total_pages=total_places_pages,
+                strategy=place_type.search_strategy,
+                parse_function=partial(self.parse_search_places, place_type=place_type),
+                session_key=listing_url,
             )
-
             results.extend(additional_results)
 
-            log.info(f"Scraped {len(results)} attractions for query: {query}")
+            log.info(f"Scraped {len(results)} {place_type.plural} for query: {query}")
 
             return results
         except Exception as e:
-            log.error(f"Error in search attractions for query {query}: {e}")
-            return []
+            log.error(f"Error in search {place_type.plural} for query {query}: {e}")
+            return None
+        finally:
+            if listing_url:
+                self.proxy_pool.release(listing_url)
 
-    def parse_search_attractions(
+    async def parse_search_places(
         self,
         response: str,
+        place_type: PlaceType,
     ) -> list[SearchSchema]:
-        soup = BeautifulSoup(response, "lxml")
-        parsed = []
-
-        card_sections = soup.select(
-            "section.mowmC[data-automation='WebPresentation_SingleFlexCardSection'] header.VLKGO a:first-of-type"
-        )
-        for box in card_sections:
-            title = box.get_text(strip=True, separator=" ")
-            href = box.get("href")
-            parsed.append(SearchSchema(name=title, url=href))
-
-        return parsed
+        [items] = await self.parse_executor.parse(response, place_type.search_parser)
+        return [SearchSchema(**item) for item in items]
 
-    async def scrape_attraction_details(
+    async def scrape_place_details(
         self,
+        place_type: PlaceType,
         url_path: str,
         max_reviews_page: Optional[int] = None,
-        base_url: str = "https://www.tripadvisor.com",
+        base_url: Optional[str] = None,
     ) -> PlaceSchema | None:
+        url = (base_url or self.base_url) + url_path
         try:
-            url = base_url + url_path
-            response = await self.get_data(url=url, type="text")
-            if not response:
-                log.error(f"No attraction details found for {url}")
-                return None
-
-            attraction_details = self.parse_attraction_details(response=response)
-            if not attraction_details:
-                log.error(f"No parseable attraction details found for {url}")
-                return None
-
-            log.info(
-                f"Scraping attraction details for {attraction_details.basic_data.name}"
-            )
-
-            reviews_page_size = len(attraction_details.reviews) or 0
-            if reviews_page_size == 0:
-                return attraction_details
-
-            total_reviews = int(
-                attraction_details.basic_data.aggregate_rating.review_count
+            return await self.collect_place_details(
+                url,
+                self.iter_place_type_details(
+                    place_type=place_type,
+                    url_path=url_path,
+                    max_reviews_page=max_reviews_page,
+                    base_url=base_url,
+                    # A place keeps the review pages that came back around a failed one
+                    skip_failed=True,
+                ),
             )
-            total_reviews_pages = math.ceil(total_reviews / reviews_page_size)
-            if max_reviews_page and max_reviews_page < total_reviews_pages:
-                total_reviews_pages = max_reviews_page
-
-            additional_results = await self.fetch_pagination_results(
-                base_url=url,
-                page_size=reviews_page_size,
-                total_pages=total_reviews_pages,
-                strategy="reviews",
-                parse_function=self.parse_attraction_details,
-            )
-
-            attraction_details.reviews.extend(
-                getattr(response, "reviews", []) for response in additional_results
-            )
-
-            log.info(
-                f"Scraped {len(attraction_details.reviews)} reviews for {attraction_details.basic_data.name}"
-            )
-
-            return attraction_details
         except Exception as e:
             log.error(
-                f"Error in scraping attraction details with reviews for {url}: {e}"
+                f"Error in scraping {place_type.name} details with reviews for {url}: {e}"
             )
             return None
 
-    def parse_attraction_details(
+    def iter_place_type_details(
+        self,
+        place_type: PlaceType,
+        url_path: str,
+        max_reviews_page: Optional[int] = None,
+        base_url: Optional[str] = None,
+        start_page: int = 0,
+        skip_failed: bool = False,
+    ) -> AsyncIterator[Union[PlaceSchema, list[CompactReview]]]:
+        return self.iter_place_details(
+            url=(base_url or self.base_url) + url_path,
+            place_type=place_type.name,
+            parse_function=partial(self.parse_place_details, place_type=place_type),
+            max_reviews_page=max_reviews_page,
+            start_page=start_page,
+            strategy=place_type.reviews_strategy,
+            skip_failed=skip_failed,
+        )
+
+    async def parse_place_details(
         self,
         response: str,
+        place_type: PlaceType,
     ) -> PlaceSchema | None:
         try:
-            soup = BeautifulSoup(response, "lxml")
-
-            script_tag = soup.find(
-                "script", string=lambda x: x and "aggregateRating" in x
-            )
-            basic_data = json.loads(script_tag.string) if script_tag else {}
-
-            description_tag = soup.select_one("div.fIrGe._T")
-            description = (
-                description_tag.get_text(strip=True) if description_tag else None
-            )
-
-            reviews = []
-            for review in soup.select("div[data-automation='reviewCard']"):
-                rate_tag = review.select_one('title[id*="lithium"]')
-                title_tag = review.select_one("a[href*='/ShowUserReviews']")
-                text_tag = review.select("div.fIrGe._T")
-                trip_date_tag = review.select_one("div.RpeCd")
-
-                rate = (
-                    rate_tag.get_text(strip=True).split()[0].replace(",", ".")
-                    if rate_tag
-                    else None
-                )
-                title = title_tag.get_text(strip=True) if title_tag else None
-                text = (
-                    "".join([span.get_text(strip=True) for span in text_tag])
-                    if text_tag
-                    else None
-                )
-                trip_date = (
-                    trip_date_tag.get_text(strip=True).split("•")[0]
-                    if trip_date_tag
-                    else None
-                )
-
-                reviews.append(
-                    ReviewSchema(title=title, text=text, rate=rate, trip_date=trip_date)
-                )
-
-            return PlaceSchema(
-                basic_data=basic_data,
-                description=description,
-                reviews=reviews,
+            [data] = await self.parse_executor.parse(
+                response, place_type.details_parser
             )
+            return self.build_place(data)
         except Exception as e:
-            log.error(f"Error in parsing attraction details with reviews: {e}")
+            log.error(f"Error in parsing {place_type.name} details with reviews: {e}")
             return None
 
-    async def scrape_search_hotels(
+    async def fetch_place(
         self,
-        query: str,
-        max_places_page: Optional[int] = None,
-        max_reviews_page: Optional[int] = None,
-        base_url: str = "https://www.tripadvisor.com",
-    ) -> Union[list[SearchSchema], PlaceSchema, None]:
+        place_type: PlaceType,
+        url_path: str,
+        base_url: Optional[str] = None,
+    ) -> PlaceSchema:
+        # The details page alone, with its first page of reviews unfiltered. Raises
+        # PageFetchError when it cannot be fetched or parsed
+        url = (base_url or self.base_url) + url_path
         try:
-            locations = await self.scrape_location(query=query)
-            if not locations:
-                log.error(f"No locations found for query: {query}")
-                return []
-
-            location = locations[0]
-            if location.is_geo is False:
-                return await self.scrape_hotel_details(
-                    url_path=location.url, max_reviews_page=max_reviews_page
-                )
-
-            hotel_url = base_url + location.hotels_url
-
-            log.info(f"Scraping hotels for query: {query}")
-
-            response = await self.get_data(url=hotel_url, type="text")
-            if not response:
-                log.error(f"No search results for query: {query}")
-                return []
-
-            results = self.parse_search_hotel(response=response)
-            if not results:
-                log.error(f"No parseable results for query: {query}")
-                return []
-
-            soup = BeautifulSoup(response, "lxml")
-            hotels_page_size = len(results)
-            total_tag = soup.find("span", string=lambda t: t and "properties" in t)
-            total_hotels = int(total_tag.get_text().replace(",", "").split()[0])
-
-            total_hotels_pages = int(math.ceil(total_hotels / hotels_page_size))
-            if max_places_page and max_places_page < total_hotels_pages:
-                total_hotels_pages = max_places_page
-
-            next_page_tag = soup.find("a", {"aria-label": "Next page"})["href"]
-            next_page_url = urljoin(hotel_url, next_page_tag)
-
-            additional_results = await self.fetch_pagination_results(
-                base_url=next_page_url,
-                page_size=hotels_page_size,
-                total_pages=total_hotels_pages,
-                strategy="search",
-                parse_function=self.parse_search_hotel,
+            return await self.fetch_details_page(
+                url,
+                place_type=place_type.name,
+                parse_function=partial(self.parse_place_details, place_type=place_type),
             )
+        finally:
+            self.proxy_pool.release(url)
 
-            results.extend(additional_results)
-
-            log.info(f"Scraped {len(results)} hotels for query: {query}")
-
-            return results
-        except Exception as e:
-            log.error(f"Error in search hotels for query {query}: {e}")
-            return []
-
-    def parse_search_hotel(
+    async def iter_review_range(
         self,
-        response: str,
-    ) -> list[SearchSchema]:
-        soup = BeautifulSoup(response, "lxml")
-        parsed = []
+        place_type: PlaceType,
+        url_path: str,
+        page_size: int,
+        start_page: int,
+        end_page: int,
+        base_url: Optional[str] = None,
+    ) -> AsyncIterator[list[CompactReview]]:
+        # Review pages [start_page, end_page) of a place, page 0 being the details page.
+        # Raises PageFetchError on the first page that fails, or when none came back
+        url = (base_url or self.base_url) + url_path
+        review_pages = self.iter_review_pages(
+            url,
+            page_size=page_size,
+            total_pages=end_page,
+            strategy=place_type.reviews_strategy,
+            parse_function=partial(self.parse_place_details, place_type=place_type),
+            skip_pages=start_page - 1,
+        )
+        fetched = 0
+        try:
+            async with aclosing(review_pages) as pages:
+                async for page in pages:
+                    fetched += 1
+                    yield await self.filter_duplicates(url, page.reviews or [])
+        finally:
+            self.proxy_pool.release(url)
+        if fetched == 0 and end_page > start_page:
+            msg = f"No review pages {start_page}-{end_page - 1} found for {url}"
+            raise PageFetchError(msg)
 
-        for box in soup.select("span.listItem div[data-automation=hotel-card-title] a"):
-            title = box.get_text(strip=True, separator=" ")
-            href = box.get("href")
-            parsed.append(SearchSchema(name=title, url=href))
+    async def scrape_search_attractions(
+        self,
+        query: str,
+        max_places_page: Optional[int] = None,
+        max_reviews_page: Optional[int] = None,
+        base_url: Optional[str] = None,
+    ) -> Optional[list[SearchSchema]]:
+        return await self.scrape_search_places(
+            PLACE_TYPES["attractions"],
+            query=query,
+            max_places_page=max_places_page,
+            base_url=base_url,
+        )
 
-        if parsed:
-            return parsed
+    async def scrape_attraction_details(
+        self,
+        url_path: str,
+        max_reviews_page: Optional[int] = None,
+        base_url: Optional[str] = None,
+    ) -> PlaceSchema | None:
+        return await self.scrape_place_details(
+            PLACE_TYPES["attractions"],
+            url_path=url_path,
+            max_reviews_page=max_reviews_page,
+            base_url=base_url,
+        )
 
-        for box in soup.select("div.listing_title > a"):
-            title = box.get_text(strip=True).split(". ")[-1]
-            href = box.get("href")
-            parsed.append(SearchSchema(name=title, url=href))
+    def iter_attraction_details(
+        self,
+        url_path: str,
+        max_reviews_page: Optional[int] = None,
+        base_url: Optional[str] = None,
+        start_page: int = 0,
+    ) -> AsyncIterator[Union[PlaceSchema, list[CompactReview]]]:
+        return self.iter_place_type_details(
+            PLACE_TYPES["attractions"],
+            url_path=url_path,
+            max_reviews_page=max_reviews_page,
+            base_url=base_url,
+            start_page=start_page,
+        )
 
-        return parsed
+    async def scrape_search_hotels(
+        self,
+        query: str,
+        max_places_page: Optional[int] = None,
+        max_reviews_page: Optional[int] = None,
+        base_url: Optional[str] = None,
+    ) -> Optional[list[SearchSchema]]:
+        return await self.scrape_search_places(
+            PLACE_TYPES["hotels"],
+            query=query,
+            max_places_page=max_places_page,
+            base_url=base_url,
+        )
 
     async def scrape_hotel_details(
         self,
         url_path: str,
         max_reviews_page: Optional[int] = None,
-        base_url: str = "https://www.tripadvisor.com",
+        base_url: Optional[str] = None,
     ) -> PlaceSchema | None:
-        try:
-            url = base_url + url_path
-            result = await self.get_data(url=url, type="text")
-            if not result:
-                log.error(f"No hotel details found for {url}")
-                return None
-
-            hotel_details = self.parse_hotel_details(response=result)
-            if not hotel_details:
-                log.error(f"No parseable hotel details found for {url}")
-                return None
-
-            log.info(f"Scraping hotel details for {hotel_details.basic_data.name}")
-
-            reviews_page_size = len(hotel_details.reviews) or 0
-            if reviews_page_size == 0:
-                return hotel_details
-
-            total_reviews = int(hotel_details.basic_data.aggregate_rating.review_count)
-            total_reviews_pages = math.ceil(total_reviews / reviews_page_size)
-            if max_reviews_page and max_reviews_page < total_reviews_pages:
-                total_reviews_pages = max_reviews_page
-
-            additional_results = await self.fetch_pagination_results(
-                base_url=url,
-                page_size=reviews_page_size,
-                total_pages=total_reviews_pages,
-                strategy="reviews",
-                parse_function=self.parse_hotel_details,
-            )
-
-            hotel_details.reviews.extend(
-                getattr(result, "reviews", []) for result in additional_results
-            )
+        return await self.scrape_place_details(
+            PLACE_TYPES["hotels"],
+            url_path=url_path,
+            max_reviews_page=max_reviews_page,
+            base_url=base_url,
+        )
 
-            log.info(
-                f"Scraped {len(hotel_details.reviews)} reviews for {hotel_details.basic_data.name}"
-            )
+    def iter_hotel_details(
+        self,
+        url_path: str,
+        max_reviews_page: Optional[int] = None,
+        base_url: Optional[str] = None,
+        start_page: int = 0,
+    ) -> AsyncIterator[Union[PlaceSchema, list[CompactReview]]]:
+        return self.iter_place_type_details(
+            PLACE_TYPES["hotels"],
+            url_path=url_path,
+            max_reviews_page=max_reviews_page,
+            base_url=base_url,
+            start_page=start_page,
+        )
 
-            return hotel_details
-        except Exception as e:
-            log.error(f"Error in scraping hotel details with reviews for {url}: {e}")
-            return None
+    async def scrape_search_restaurants(
+        self,
+        query: str,
+        max_places_page: Optional[int] = None,
+        max_reviews_page: Optional[int] = None,
+        base_url: Optional[str] = None,
+    ) -> Optional[list[SearchSchema]]:
+        return await self.scrape_search_places(
+            PLACE_TYPES["restaurants"],
+            query=query,
+            max_places_page=max_places_page,
+            base_url=base_url,
+        )
 
-    def parse_hotel_details(
+    async def scrape_restaurant_details(
         self,
-        response: str,
+        url_path: str,
+        max_reviews_page: Optional[int] = None,
+        base_url: Optional[str] = None,
     ) -> PlaceSchema | None:
-        try:
-            soup = BeautifulSoup(response, "lxml")
-
-            script_tag = soup.find(
-                "script", string=lambda x: x and "aggregateRating" in x
-            )
-            basic_data = json.loads(script_tag.string) if script_tag else {}
-
-            description_tag = soup.select_one("div.fIrGe._T")
-            description = (
-                description_tag.get_text(strip=True) if description_tag else None
-            )
-
-            amenities = [
-                feature.get_text(strip=True)
-                for feature in soup.select("div[data-test-target*='amenity']")
-            ]
-
-            reviews = []
-            for review in soup.select("div[data-reviewid]"):
-                rate_tag = review.select_one(
-                    "div[data-test-target='review-rating'] title"
-                )
-                title_tag = review.select_one(
-                    "div[data-test-target='review-title'] a span span"
-                )
-                text_tag = review.select("span[data-automation*='reviewText'] span")
-                trip_date_div = review.select_one("div.PDZqu")
-                trip_date_tag = trip_date_div.find("span")
-
-                rate = (
-                    rate_tag.get_text(strip=True).split()[0].replace(",", ".")
-                    if rate_tag
-                    else None
-                )
-                title = title_tag.get_text(strip=True) if title_tag else None
-                text = (
-                    "".join([span.get_text(strip=True) for span in text_tag])
-                    if text_tag
-                    else None
-                )
-                trip_date = (
-                    " ".join(
-                        [
-                            word.capitalize()
-                            for word in trip_date_tag.get_text(strip=True)
-                            .split(":")[-1]
-                            .split()
-                        ]
-                    )
-                    if trip_date_tag
-                    else None
-                )
-
-                reviews.append(
-                    ReviewSchema(title=title, text=text, rate=rate, trip_date=trip_date)
-                )
+        return await self.scrape_place_details(
+            PLACE_TYPES["restaurants"],
+            url_path=url_path,
+            max_reviews_page=max_reviews_page,
+            base_url=base_url,
+        )
 
-            return PlaceSchema(
-                basic_data=basic_data,
-                description=description,
-                features=amenities,
-                reviews=reviews,
-            )
-        except Exception as e:
-            log.error(f"Error in parsing hotel details with reviews: {e}")
-            return None
+    def iter_restaurant_details(
+        self,
+        url_path: str,
+        max_reviews_page: Optional[int] = None,
+        base_url: Optional[str] = None,
+        start_page: int = 0,
+    ) -> AsyncIterator[Union[PlaceSchema, list[CompactReview]]]:
+        return self.iter_place_type_details(
+            PLACE_TYPES["restaurants"],
+            url_path=url_path,
+            max_reviews_page=max_reviews_page,
+            base_url=base_url,
+            start_page=start_page,
+        )
@@ -0,0 +1,83 @@
+import hashlib
+import time
+from typing import Optional
+
+from apify import Actor
+from apify.storages import KeyValueStore
+from loguru import logger as log
+
+from src.schemas.collector.place import PlaceSchema
+from src.schemas.collector.review import CompactReview
+from src.utils.constants import WATERMARK_SIZE, WATERMARK_STORE
+from src.utils.fingerprint import review_fingerprint
+
+
+class ReviewWatermarks:
+    def __init__(
+        self, store_name: str = WATERMARK_STORE, size: int = WATERMARK_SIZE
+    ) -> None:
+        self.store_name = store_name
+        self.size = size
+        self.store: Optional[KeyValueStore] = None
+        # Watermarks wait here until the reviews they cover are in the dataset
+        self.pending: dict[str, dict] = {}
+
+    async def open_store(self) -> KeyValueStore:
+        if self.store is None:
+            self.store = await Actor.open_key_value_store(name=self.store_name)
+        return self.store
+
+    def store_key(self, url: str) -> str:
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    async def load(self, url: str) -> list[str]:
+        try:
+            store = await self.open_store()
+            record = await store.get_value(self.store_key(url))
+        except Exception as e:
+            log.warning(f"Failed to load review watermark for {url}: {e}")
+            return []
+        return record.get("fingerprints", []) if record else []
+
+    def is_known_page(self, page: Optional[PlaceSchema], known: set[str]) -> bool:
+        if not known or not page or not page.reviews:
+            return False
+        return all(review_fingerprint(review) in known for review in page.reviews)
+
+    def filter_new(
+        self, reviews: list[CompactReview], known: set[str], fingerprints: list[str]
+    ) -> list[CompactReview]:
+        new_reviews = []
+        for review in reviews:
+            fingerprint = review_fingerprint(review)
+            if fingerprint in known:
+                continue
+            known.add(fingerprint)
+            fingerprints.append(fingerprint)
+            new_reviews.append(review)
+        return new_reviews
+
+    def stage(
+        self,
+        url: str,
+        new_fingerprints: list[str],
+        known: list[str],
+        review_count: Optional[int],
+    ) -> None:
+        # Reviews are listed newest first, so the head of the list is the watermark
+        self.pending[url] = {
+            "url": url,
+            "review_count": review_count,
+            "fingerprints": (new_fingerprints + known)[: self.size],
+            "updated_at": time.time(),
+        }
+
+    async def commit(self, url: str) -> None:
+        record = self.pending.pop(url, None)
+        if record is None:
+            return
+        try:
+            store = await self.open_store()
+            await store.set_value(self.store_key(url), record)
+        except Exception as e:
+            log.warning(f"Failed to save review watermark for {url}: {e}")
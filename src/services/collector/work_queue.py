@@ -0,0 +1,309 @@
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Optional
+
+from loguru import logger as log
+
+from src.utils.constants import (
+    LEASE_TIMEOUT,
+    WORK_QUEUE_NAME,
+    WORK_QUEUE_TTL,
+    WORK_QUEUE_TTL_REFRESH,
+)
+
+
+@dataclass
+class WorkItem:
+    # Items with the same id are only enqueued once per crawl
+    id: str
+    kind: str
+    payload: dict[str, Any] = field(default_factory=dict)
+    attempts: int = 0
+
+    def dumps(self) -> str:
+        return json.dumps(asdict(self), ensure_ascii=False)
+
+    @classmethod
+    def loads(cls, data: str) -> "WorkItem":
+        return cls(**json.loads(data))
+
+
+class WorkQueue(ABC):
+    lease_timeout: float
+
+    async def open(self) -> None:
+        return None
+
+    async def close(self) -> None:
+        return None
+
+    @abstractmethod
+    async def put(self, items: list[WorkItem]) -> int: ...
+
+    @abstractmethod
+    async def lease(self, count: int = 1) -> list[WorkItem]: ...
+
+    @abstractmethod
+    async def extend(self, item: WorkItem) -> None: ...
+
+    @abstractmethod
+    async def ack(self, item: WorkItem) -> None: ...
+
+    @abstractmethod
+    async def nack(self, item: WorkItem) -> None: ...
+
+    @abstractmethod
+    async def claim(self, key: str) -> bool: ...
+
+    @abstractmethod
+    async def is_claimed(self, key: str) -> bool: ...
+
+    @abstractmethod
+    async def is_drained(self) -> bool: ...
+
+
+class LocalWorkQueue(WorkQueue):
+    def __init__(self, lease_timeout: float = LEASE_TIMEOUT) -> None:
+        self.lease_timeout = lease_timeout
+        self.items: dict[str, WorkItem] = {}
+        self.pending: deque[str] = deque()
+        self.leased: dict[str, float] = {}
+        self.seen: set[str] = set()
+        self.claimed: set[str] = set()
+
+    async def put(self, items: list[WorkItem]) -> int:
+        added = 0
+        for item in items:
+            if item.id in self.seen:
+                continue
+            self.seen.add(item.id)
+            self.items[item.id] = item
+            self.pending.append(item.id)
+            added += 1
+        return added
+
+    def requeue_expired(self) -> None:
+        now = time.monotonic()
+        for item_id, deadline in list(self.leased.items()):
+            if deadline <= now:
+                del self.leased[item_id]
+                self.pending.append(item_id)
+
+    async def lease(self, count: int = 1) -> list[WorkItem]:
+        self.requeue_expired()
+        items = []
+        while self.pending and len(items) < count:
+            item = self.items[self.pending.popleft()]
+            item.attempts += 1
+            self.leased[item.id] = time.monotonic() + self.lease_timeout
+            items.append(item)
+        return items
+
+    async def extend(self, item: WorkItem) -> None:
+        if item.id in self.leased:
+            self.leased[item.id] = time.monotonic() + self.lease_timeout
+
+    async def ack(self, item: WorkItem) -> None:
+        self.leased.pop(item.id, None)
+        self.items.pop(item.id, None)
+
+    async def nack(self, item: WorkItem) -> None:
+        if self.leased.pop(item.id, None) is not None:
+            self.pending.append(item.id)
+
+    async def claim(self, key: str) -> bool:
+        if key in self.claimed:
+            return False
+        self.claimed.add(key)
+        return True
+
+    async def is_claimed(self, key: str) -> bool:
+        return key in self.claimed
+
+    async def is_drained(self) -> bool:
+        return not self.pending and not self.leased
+
+
+# Items already enqueued by this run or another one are skipped
+PUT_SCRIPT = """
+if redis.call('SADD', KEYS[1], ARGV[1]) == 0 then
+    return 0
+end
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+redis.call('RPUSH', KEYS[3], ARGV[1])
+return 1
+"""
+
+# Expired leases go back to the queue and new ones are taken in one atomic step
+LEASE_SCRIPT = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[3])
+for _, id in ipairs(expired) do
+    redis.call('ZREM', KEYS[2], id)
+    redis.call('RPUSH', KEYS[1], id)
+end
+local ids = {}
+for i = 1, tonumber(ARGV[1]) do
+    local id = redis.call('LPOP', KEYS[1])
+    if not id then break end
+    redis.call('ZADD', KEYS[2], ARGV[2], id)
+    table.insert(ids, id)
+end
+return ids
+"""
+
+REDIS_KEYS = ("seen", "items", "pending", "leased", "attempts", "claimed")
+
+
+class RedisWorkQueue(WorkQueue):
+    # Pending ids are a list, leases a sorted set scored by their deadline
+    def __init__(
+        self,
+        url: str,
+        name: str = WORK_QUEUE_NAME,
+        lease_timeout: float = LEASE_TIMEOUT,
+        ttl: int = WORK_QUEUE_TTL,
+    ) -> None:
+        self.url = url
+        self.name = name
+        self.lease_timeout = lease_timeout
+        self.ttl = ttl
+        self.expires_refreshed_at: Optional[float] = None
+        self.client: Any = None
+        self.put_script: Any = None
+        self.lease_script: Any = None
+
+    def key(self, suffix: str) -> str:
+        return f"{self.name}:{suffix}"
+
+    async def expire(self, force: bool = False) -> None:
+        # Pushed back while the crawl writes, so only the keys of a finished crawl
+        # expire. Keys created since the last refresh get their TTL on the next one
+        now = time.monotonic()
+        if (
+            not force
+            and self.expires_refreshed_at is not None
+            and now - self.expires_refreshed_at < WORK_QUEUE_TTL_REFRESH
+        ):
+            return
+
+        self.expires_refreshed_at = now
+        async with self.client.pipeline(transaction=False) as pipe:
+            for suffix in REDIS_KEYS:
+                pipe.expire(self.key(suffix), self.ttl)
+            await pipe.execute()
+
+    async def open(self) -> None:
+        if self.client is not None:
+            return
+
+        # Only needed for distributed crawls, so not imported at startup
+        from redis.asyncio import Redis
+
+        self.client = Redis.from_url(self.url, decode_responses=True)
+        self.put_script = self.client.register_script(PUT_SCRIPT)
+        self.lease_script = self.client.register_script(LEASE_SCRIPT)
+        await self.client.ping()
+        log.info(f"Using work queue {self.name} on Redis")
+
+    async def close(self) -> None:
+        if self.client is not None:
+            await self.expire(force=True)
+            await self.client.aclose()
+            self.client = None
+
+    async def put(self, items: list[WorkItem]) -> int:
+        if not items:
+            return 0
+
+        async with self.client.pipeline(transaction=False) as pipe:
+            for item in items:
+                await self.put_script(
+                    keys=[self.key("seen"), self.key("items"), self.key("pending")],
+                    args=[item.id, item.dumps()],
+                    client=pipe,
+                )
+            added = await pipe.execute()
+        await self.expire()
+        return sum(added)
+
+    async def lease(self, count: int = 1) -> list[WorkItem]:
+        now = time.time()
+        item_ids = await self.lease_script(
+            keys=[self.key("pending"), self.key("leased")],
+            args=[count, now + self.lease_timeout, now],
+        )
+        if not item_ids:
+            return []
+
+        await self.expire()
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.hmget(self.key("items"), item_ids)
+            for item_id in item_ids:
+                pipe.hincrby(self.key("attempts"), item_id)
+            data, *attempts = await pipe.execute()
+
+        items = []
+        for item_id, item_data, item_attempts in zip(item_ids, data, attempts):
+            if item_data is None:
+                # Acked by an instance whose lease had already expired
+                await self.client.zrem(self.key("leased"), item_id)
+                continue
+            item = WorkItem.loads(item_data)
+            item.attempts = item_attempts
+            items.append(item)
+        return items
+
+    async def extend(self, item: WorkItem) -> None:
+        await self.client.zadd(
+            self.key("leased"), {item.id: time.time() + self.lease_timeout}, xx=True
+        )
+
+    async def ack(self, item: WorkItem) -> None:
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.zrem(self.key("leased"), item.id)
+            pipe.hdel(self.key("items"), item.id)
+            pipe.hdel(self.key("attempts"), item.id)
+            await pipe.execute()
+
+    async def nack(self, item: WorkItem) -> None:
+        if await self.client.zrem(self.key("leased"), item.id):
+            await self.client.rpush(self.key("pending"), item.id)
+
+    async def claim(self, key: str) -> bool:
+        claimed = await self.client.sadd(self.key("claimed"), key)
+        await self.expire()
+        return bool(claimed)
+
+    async def is_claimed(self, key: str) -> bool:
+        return bool(await self.client.sismember(self.key("claimed"), key))
+
+    async def is_drained(self) -> bool:
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.llen(self.key("pending"))
+            pipe.zcard(self.key("leased"))
+            pending, leased = await pipe.execute()
+        return not pending and not leased
+
+
+def create_work_queue(
+    kind: str,
+    name: str = WORK_QUEUE_NAME,
+    lease_timeout: float = LEASE_TIMEOUT,
+    redis_url: Optional[str] = None,
+    ttl: int = WORK_QUEUE_TTL,
+) -> WorkQueue:
+    if kind == "local":
+        return LocalWorkQueue(lease_timeout=lease_timeout)
+    if kind == "redis":
+        if not redis_url:
+            msg = "The Redis work queue needs a Redis URL"
+            raise ValueError(msg)
+        return RedisWorkQueue(
+            url=redis_url, name=name, lease_timeout=lease_timeout, ttl=ttl
+        )
+
+    msg = f"Unknown work queue: {kind}"
+    raise ValueError(msg)
@@ -0,0 +1,13 @@
+from typing import Optional
+
+BLOCK_STATUSES = (403, 429)
+BLOCK_MARKERS = ("captcha-delivery.com", "geo.captcha", "please enable js and disable")
+
+
+def is_blocked(status: int, body: Optional[str] = None) -> bool:
+    if status in BLOCK_STATUSES:
+        return True
+    if not body:
+        return False
+    head = body[:4096].lower()
+    return any(marker in head for marker in BLOCK_MARKERS)
@@ -1,5 +1,135 @@
 PLACE_TYPES_FUNCTION = {
-    "attractions": ("scrape_search_attractions", "scrape_attraction_details"),
-    "restaurants": ("scrape_search_restaurants", "scrape_restaurant_details"),
-    "hotels": ("scrape_search_hotels", "scrape_hotel_details"),
+    "attractions": (
+        "scrape_search_attractions",
+        "scrape_attraction_details",
+        "iter_attraction_details",
+    ),
+    "restaurants": (
+        "scrape_search_restaurants",
+        "scrape_restaurant_details",
+        "iter_restaurant_details",
+    ),
+    "hotels": ("scrape_search_hotels", "scrape_hotel_details", "iter_hotel_details"),
 }
+
+# Dataset output: one record per place, or a place record followed by its reviews
+OUTPUT_MODES = ("places", "reviews")
+OUTPUT_MODE = "places"
+
+# Scraped site, benchmarks point it at a local stand-in
+BASE_URL = "https://www.tripadvisor.com"
+
+# HTTP connection pool
+MAX_CONNECTIONS = 100
+MAX_CONNECTIONS_PER_HOST = 10
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 30
+
+# Pagination concurrency and pacing
+CONCURRENCY = 5
+REQUESTS_PER_SECOND = 2
+BURST = 5
+
+# Request pipeline
+QUERY_CONCURRENCY = 2
+DETAILS_CONCURRENCY = 3
+MAX_CONCURRENCY = 10
+
+# HTML parsing
+PARSER_BACKEND = "beautifulsoup"
+PARSE_EXECUTOR = "none"
+
+# Response cache
+CACHE_MODE = "off"
+CACHE_MAX_SIZE_MB = 1024
+CACHE_ACCESS_BATCH_SIZE = 100
+CACHE_TTLS = {
+    "graphql": 6 * 3600,
+    "search_page": 24 * 3600,
+    "review_page": 6 * 3600,
+}
+
+# GraphQL API, operations are pre-registered on TripAdvisor's side by id
+GRAPHQL_PATH = "/data/graphql/ids"
+TYPEAHEAD_QUERY_ID = "84b17ed122fbdbd4"
+REVIEWS_QUERY_ID = "ef1a9f94012220d3"
+GRAPHQL_BATCH_SIZE = 10
+GRAPHQL_BATCH_DELAY = 0.05
+
+# Where review pages after the first come from
+REVIEWS_SOURCES = ("html", "graphql")
+REVIEWS_SOURCE = "html"
+
+# Distributed crawls: work items shared by several runs through a queue
+WORK_QUEUES = ("off", "local", "redis")
+WORK_QUEUE = "off"
+WORK_QUEUE_NAME = "reviews-crawl"
+# Keys of a Redis queue expire this long after its last write, the TTLs are
+# pushed back at most once per refresh interval
+WORK_QUEUE_TTL = 24 * 3600
+WORK_QUEUE_TTL_REFRESH = 60
+LEASE_TIMEOUT = 300
+LEASE_POLL_INTERVAL = 2
+WORK_ITEM_MAX_ATTEMPTS = 3
+REVIEW_PAGES_PER_ITEM = 10
+
+# Location lookup cache
+LOCATION_CACHE_SIZE = 1024
+LOCATION_CACHE_STORE = "location-cache"
+LOCATION_CACHE_TTL = 30 * 24 * 3600
+
+# Incremental review scraping
+WATERMARK_STORE = "review-watermarks"
+WATERMARK_SIZE = 100
+
+# Review deduplication, fingerprints kept in memory besides the SQLite index
+DEDUP_SEEN_SIZE = 100_000
+
+# Dataset writes
+DATASET_BATCH_SIZE = 500
+DATASET_BATCH_BYTES = 5 * 1024 * 1024
+DATASET_FLUSH_INTERVAL = 2
+DATASET_BUFFER_SIZE = 5000
+
+# Crawl checkpoints, kept in the run's default key-value store
+CHECKPOINT_KEY = "CRAWL_STATE"
+
+# Proxy pool
+PROXY_POOL_SIZE = 10
+PROXY_LATENCY_DECAY = 0.3
+PROXY_ERROR_PENALTY = 5
+PROXY_MAX_ERRORS = 3
+# Keeps a session's pick weight, 1 / (score + smoothing), finite when unused
+PROXY_SCORE_SMOOTHING = 0.1
+
+# Retries and circuit breaking
+RETRY_ATTEMPTS = 4
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30
+REQUEST_DEADLINE = 120
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 30
+
+# Request timeouts, in seconds
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 30
+TOTAL_TIMEOUT = 60
+
+# Run summary, kept in the run's default key-value store
+RUN_SUMMARY_KEY = "RUN_SUMMARY"
+
+# Opt-in profiling, the report and flamegraph go to the default key-value store
+PROFILE_KEY = "PROFILE"
+PROFILE_FLAMEGRAPH_KEY = "PROFILE_FLAMEGRAPH"
+PROFILE_SAMPLE_INTERVAL = 0.01
+PROFILE_LAG_INTERVAL = 0.1
+PROFILE_STACK_DEPTH = 64
+PROFILE_TOP_ALLOCATIONS = 20
+
+# Live metrics, persisted to the default key-value store and served for Prometheus
+METRICS_KEY = "METRICS"
+METRICS_INTERVAL = 30
+METRICS_HOST = "0.0.0.0"
+
+# Request header profiles
+HEADER_POOL_SIZE = 50
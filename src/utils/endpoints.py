@@ -0,0 +1,11 @@
+GRAPHQL = "graphql"
+SEARCH_PAGE = "search_page"
+REVIEW_PAGE = "review_page"
+
+
+def get_endpoint_type(url: str) -> str:
+    if "/data/graphql/" in url:
+        return GRAPHQL
+    if "-Reviews-" in url:
+        return REVIEW_PAGE
+    return SEARCH_PAGE
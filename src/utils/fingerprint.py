@@ -0,0 +1,13 @@
+import hashlib
+
+from src.schemas.collector.review import CompactReview
+
+
+def review_fingerprint(review: CompactReview) -> str:
+    # TripAdvisor ids survive edits and translations, content hashes are the fallback
+    if review.review_id:
+        return f"r{review.review_id}"
+    content = "\x1f".join(
+        [review.title or "", review.text or "", review.trip_date or ""]
+    )
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
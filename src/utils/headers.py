@@ -1,32 +1,96 @@
 import random
-import string
-
-from fake_useragent import UserAgent
-
-
-def get_headers() -> dict[str, str]:
-    random_request_id = "".join(
-        random.choices(string.ascii_lowercase + string.digits, k=180)
-    )
-    ua = UserAgent(
-        browsers=["Google", "Chrome", "Firefox", "Edge"],
-        os=["Windows", "Linux", "Ubuntu"],
-        platforms=["desktop"],
-    )
-    return {
-        "X-Requested-By": random_request_id,
-        "User-Agent": ua.random,
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.9",
-        "Connection": "keep-alive",
-        "Upgrade-Insecure-Requests": "1",
-        "Sec-Fetch-Dest": "document",
-        "Sec-Fetch-Mode": "navigate",
-        "Sec-Fetch-Site": "none",
-        "Sec-Fetch-User": "?1",
-        "Cache-Control": "max-age=0",
-        "TE": "trailers",
-        "Referer": "https://www.tripadvisor.com",
-        "Origin": "https://www.tripadvisor.com",
-        "DNT": "1",
-    }
+import secrets
+import zlib
+from functools import lru_cache
+from typing import Optional
+
+from src.utils.constants import HEADER_POOL_SIZE
+
+BASE_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1",
+    "Sec-Fetch-Dest": "document",
+    "Sec-Fetch-Mode": "navigate",
+    "Sec-Fetch-Site": "none",
+    "Sec-Fetch-User": "?1",
+    "Cache-Control": "max-age=0",
+    "Referer": "https://www.tripadvisor.com",
+    "Origin": "https://www.tripadvisor.com",
+    "DNT": "1",
+}
+
+FIREFOX_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "TE": "trailers",
+}
+
+CLIENT_HINT_BRANDS = {
+    "Chrome": "Google Chrome",
+    "Edge": "Microsoft Edge",
+}
+
+CLIENT_HINT_PLATFORMS = {
+    "Windows": "Windows",
+    "Linux": "Linux",
+    "Ubuntu": "Linux",
+    "Mac OS X": "macOS",
+}
+
+
+class HeaderFactory:
+    def __init__(self, pool_size: int = HEADER_POOL_SIZE) -> None:
+        # Imported here, the browser data is only needed once the factory is built
+        from fake_useragent import UserAgent
+
+        ua = UserAgent(
+            browsers=["Google", "Chrome", "Firefox", "Edge"],
+            os=["Windows", "Linux", "Ubuntu"],
+            platforms=["desktop"],
+        )
+        self.profiles = [
+            self.build_profile(ua.getRandom) for _ in range(max(pool_size, 1))
+        ]
+
+    def build_profile(self, browser: dict) -> dict[str, str]:
+        profile = {**BASE_HEADERS, "User-Agent": browser["useragent"]}
+        if browser["browser"] == "Firefox":
+            return {**profile, **FIREFOX_HEADERS}
+
+        # Chromium browsers announce the same brand and version in client hints
+        brand = CLIENT_HINT_BRANDS.get(browser["browser"], "Google Chrome")
+        version = str(browser["browser_version"]).split(".")[0]
+        platform = CLIENT_HINT_PLATFORMS.get(browser["os"], "Windows")
+        return {
+            **profile,
+            "Sec-CH-UA": (
+                f'"Chromium";v="{version}", "{brand}";v="{version}", '
+                '"Not_A Brand";v="24"'
+            ),
+            "Sec-CH-UA-Mobile": "?0",
+            "Sec-CH-UA-Platform": f'"{platform}"',
+        }
+
+    def get_profile(self, session_key: Optional[str] = None) -> dict[str, str]:
+        if session_key is None:
+            return random.choice(self.profiles)
+        # A stable hash keeps one fingerprint per session without tracking sessions
+        index = zlib.crc32(session_key.encode()) % len(self.profiles)
+        return self.profiles[index]
+
+    def get_headers(self, session_key: Optional[str] = None) -> dict[str, str]:
+        return {
+            "X-Requested-By": secrets.token_hex(90),
+            **self.get_profile(session_key),
+        }
+
+
+@lru_cache(maxsize=1)
+def get_header_factory() -> HeaderFactory:
+    return HeaderFactory()
+
+
+def get_headers(session_key: Optional[str] = None) -> dict[str, str]:
+    return get_header_factory().get_headers(session_key)
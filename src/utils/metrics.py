@@ -0,0 +1,142 @@
+import time
+from collections import defaultdict
+from functools import lru_cache
+
+from src.utils.histogram import Histogram
+
+# Help texts of the metrics exposed to Prometheus
+METRICS = {
+    "requests_in_flight": "Requests sent and not answered yet",
+    "requests_total": "Responses by endpoint type and status",
+    "request_seconds": "Time to the response headers per attempt",
+    "response_bytes_total": "Response bodies downloaded, in bytes",
+    "cache_hits_total": "Responses served from the response cache",
+    "retries_total": "Attempts retried after a failure",
+    "blocked_total": "Responses detected as blocked",
+    "request_failures_total": "Requests given up after all attempts",
+    "pages_total": "Pages fetched and parsed",
+    "pages_failed_total": "Pages that could not be fetched or parsed",
+    "parse_seconds": "Page parsing time by first extractor",
+    "reviews_total": "Reviews kept after deduplication",
+    "reviews_duplicate_total": "Reviews dropped as duplicates",
+    "places_total": "Places completed",
+    "queue_depth": "Items waiting in a work queue",
+    "work_items_total": "Distributed work items by kind and outcome",
+    "dataset_buffer_records": "Records buffered before the next push",
+    "dataset_records_total": "Records pushed to the dataset",
+    "dataset_batches_total": "Batches pushed to the dataset",
+}
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    def __init__(self, prefix: str = "scraper") -> None:
+        self.prefix = prefix
+        self.counters: dict[str, dict[Labels, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+        self.gauges: dict[str, dict[Labels, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+        self.histograms: dict[str, dict[Labels, Histogram]] = defaultdict(
+            lambda: defaultdict(Histogram)
+        )
+        self.started_at = time.time()
+
+    def labels(self, labels: dict[str, str]) -> Labels:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        self.counters[name][self.labels(labels)] += value
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        self.gauges[name][self.labels(labels)] = value
+
+    def add(self, name: str, delta: float, **labels: str) -> None:
+        self.gauges[name][self.labels(labels)] += delta
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        self.histograms[name][self.labels(labels)].observe(value)
+
+    def total(self, name: str) -> float:
+        # Summed over every label set, e.g. all endpoint types
+        values = self.counters.get(name) or self.gauges.get(name) or {}
+        return sum(values.values())
+
+    def snapshot(self) -> dict:
+        def series(values: dict[Labels, float]) -> list[dict]:
+            return [
+                {"labels": dict(labels), "value": value}
+                for labels, value in values.items()
+            ]
+
+        return {
+            "started_at": self.started_at,
+            "updated_at": time.time(),
+            "counters": {
+                name: series(values) for name, values in self.counters.items()
+            },
+            "gauges": {name: series(values) for name, values in self.gauges.items()},
+            "histograms": {
+                name: [
+                    {"labels": dict(labels), **histogram.summary()}
+                    for labels, histogram in values.items()
+                ]
+                for name, values in self.histograms.items()
+            },
+        }
+
+    def render(self) -> str:
+        # Prometheus text exposition format, version 0.0.4
+        lines = []
+        for kind, metrics in (
+            ("counter", self.counters),
+            ("gauge", self.gauges),
+            ("histogram", self.histograms),
+        ):
+            for name, values in sorted(metrics.items()):
+                full_name = f"{self.prefix}_{name}"
+                lines.append(f"# HELP {full_name} {METRICS.get(name, name)}")
+                lines.append(f"# TYPE {full_name} {kind}")
+                for labels, value in values.items():
+                    if kind == "histogram":
+                        lines.extend(self.render_histogram(full_name, labels, value))
+                    else:
+                        lines.append(
+                            f"{full_name}{self.format_labels(labels)} {self.format_value(value)}"
+                        )
+        return "\n".join(lines) + "\n"
+
+    def render_histogram(
+        self, name: str, labels: Labels, histogram: Histogram
+    ) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*histogram.buckets, "+Inf"), histogram.counts):
+            cumulative += count
+            bucket_labels = self.format_labels((*labels, ("le", str(bound))))
+            lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+        lines.append(
+            f"{name}_sum{self.format_labels(labels)} {self.format_value(histogram.sum)}"
+        )
+        lines.append(f"{name}_count{self.format_labels(labels)} {histogram.count}")
+        return lines
+
+    def format_labels(self, labels: Labels) -> str:
+        if not labels:
+            return ""
+        pairs = ",".join(f'{key}="{self.escape(value)}"' for key, value in labels)
+        return "{" + pairs + "}"
+
+    def format_value(self, value: float) -> str:
+        # Counters of bytes outgrow the six digits of the default float format
+        return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+    def escape(self, value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+@lru_cache(maxsize=1)
+def get_metrics() -> MetricsRegistry:
+    return MetricsRegistry()
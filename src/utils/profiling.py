@@ -0,0 +1,159 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator, Optional
+
+from loguru import logger as log
+
+from src.utils.constants import (
+    PROFILE_LAG_INTERVAL,
+    PROFILE_SAMPLE_INTERVAL,
+    PROFILE_STACK_DEPTH,
+    PROFILE_TOP_ALLOCATIONS,
+)
+from src.utils.histogram import Histogram
+
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+
+class Profiler:
+    def __init__(self) -> None:
+        # Spans cost a flag check until a run opts in
+        self.enabled = False
+        self.spans: dict[str, Histogram] = defaultdict(Histogram)
+        self.loop_lag = Histogram(LOOP_LAG_BUCKETS)
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self.sample_interval = 0.0
+        self.trace_memory = False
+        self.started_at = 0.0
+        self.finished_at = 0.0
+        self.lag_task: Optional[asyncio.Task] = None
+        self.sampler: Optional[threading.Thread] = None
+        self.stopping = threading.Event()
+        self.memory: dict = {}
+
+    def start(
+        self,
+        sample_interval: float = PROFILE_SAMPLE_INTERVAL,
+        trace_memory: bool = False,
+        lag_interval: float = PROFILE_LAG_INTERVAL,
+    ) -> None:
+        if self.enabled:
+            return
+
+        self.enabled = True
+        self.started_at = time.perf_counter()
+        self.sample_interval = sample_interval
+        self.trace_memory = trace_memory
+        self.lag_task = asyncio.ensure_future(self.sample_loop_lag(lag_interval))
+        if sample_interval > 0:
+            self.stopping.clear()
+            self.sampler = threading.Thread(
+                target=self.sample_stacks, name="profiler", daemon=True
+            )
+            self.sampler.start()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start(PROFILE_STACK_DEPTH)
+        log.info("Profiling enabled")
+
+    async def stop(self) -> None:
+        if not self.enabled:
+            return
+
+        self.enabled = False
+        self.finished_at = time.perf_counter()
+        if self.lag_task is not None:
+            self.lag_task.cancel()
+            self.lag_task = None
+        if self.sampler is not None:
+            self.stopping.set()
+            await asyncio.to_thread(self.sampler.join)
+            self.sampler = None
+        if self.trace_memory and tracemalloc.is_tracing():
+            self.memory = self.snapshot_memory()
+            tracemalloc.stop()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans[name].observe(time.perf_counter() - started)
+
+    async def sample_loop_lag(self, interval: float) -> None:
+        # How late the loop wakes a sleeping task is how long others blocked it
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.loop_lag.observe(max(time.perf_counter() - started - interval, 0.0))
+
+    def sample_stacks(self) -> None:
+        own_id = threading.get_ident()
+        while not self.stopping.wait(self.sample_interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():  # noqa: SLF001
+                if thread_id != own_id:
+                    self.stacks[self.fold(names.get(thread_id, "thread"), frame)] += 1
+            self.samples += 1
+
+    def fold(self, thread_name: str, frame: object) -> str:
+        # Collapsed stack, root first, as read by flamegraph.pl and speedscope
+        labels = []
+        while frame is not None and len(labels) < PROFILE_STACK_DEPTH:
+            code = frame.f_code
+            labels.append(
+                f"{code.co_name} ({os.path.basename(code.co_filename)}"
+                f":{code.co_firstlineno})"
+            )
+            frame = frame.f_back
+        return ";".join([thread_name, *reversed(labels)])
+
+    def snapshot_memory(self) -> dict:
+        current, peak = tracemalloc.get_traced_memory()
+        statistics = tracemalloc.take_snapshot().statistics("lineno")
+        return {
+            "current_mb": round(current / 1024 / 1024, 2),
+            "peak_mb": round(peak / 1024 / 1024, 2),
+            "top": [
+                {
+                    "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    "size_kb": round(stat.size / 1024, 1),
+                    "count": stat.count,
+                }
+                for stat in statistics[:PROFILE_TOP_ALLOCATIONS]
+            ],
+        }
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.items())
+
+    def report(self) -> dict:
+        finished_at = self.finished_at if not self.enabled else time.perf_counter()
+        return {
+            "duration": round(finished_at - self.started_at, 3),
+            # Spans overlap across concurrent tasks, sums are busy time per phase
+            "spans": {
+                name: histogram.summary()
+                for name, histogram in sorted(self.spans.items())
+            },
+            "loop_lag": self.loop_lag.summary(),
+            "sampler": {"interval": self.sample_interval, "samples": self.samples},
+            "memory": self.memory,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_profiler() -> Profiler:
+    return Profiler()
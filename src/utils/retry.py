@@ -0,0 +1,115 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import urlparse
+
+from loguru import logger as log
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class RetryableError(Exception):
+    def __init__(
+        self,
+        reason: str,
+        retry_after: Optional[float] = None,
+        host_failure: bool = True,
+    ) -> None:
+        super().__init__(reason)
+        self.retry_after = retry_after
+        self.host_failure = host_failure
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        attempts: int,
+        base_delay: float,
+        max_delay: float,
+        deadline: float,
+    ) -> None:
+        self.attempts = max(attempts, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        # Full jitter keeps workers that failed together from retrying together
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def parse_retry_after(self, value: Optional[str]) -> Optional[float]:
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+
+class CircuitBreaker:
+    def __init__(self, host: str, failure_threshold: int, reset_timeout: float) -> None:
+        self.host = host
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def retry_at(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return self.opened_at + self.reset_timeout
+
+    def record_success(self) -> None:
+        if self.opened_at is not None:
+            log.info(f"Circuit for {self.host} closed")
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures < self.failure_threshold:
+            return
+        # Also re-opens a half-open circuit whose trial request failed
+        if self.opened_at is None or time.monotonic() >= self.retry_at:
+            log.warning(
+                f"Circuit for {self.host} opened after {self.failures} failures, "
+                f"pausing for {self.reset_timeout}s"
+            )
+            self.opened_at = time.monotonic()
+
+
+class CircuitBreakers:
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, url: str) -> CircuitBreaker:
+        host = urlparse(url).netloc
+        breaker = self.breakers.get(host)
+        if breaker is None:
+            breaker = self.breakers[host] = CircuitBreaker(
+                host=host,
+                failure_threshold=self.failure_threshold,
+                reset_timeout=self.reset_timeout,
+            )
+        return breaker
+
+    async def wait(self, url: str, deadline: float) -> bool:
+        retry_at = self.get(url).retry_at
+        now = time.monotonic()
+        if retry_at <= now:
+            return True
+        if retry_at > deadline:
+            return False
+        await asyncio.sleep(retry_at - now)
+        return True
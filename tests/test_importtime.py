@@ -0,0 +1,15 @@
+from benchmarks.importtime import (
+    BUDGET_MS,
+    TARGET,
+    eager_lazy_modules,
+    measure,
+    median_total_ms,
+)
+
+
+def test_startup_imports_stay_within_budget() -> None:
+    # Each run imports the actor in a fresh interpreter
+    runs = [measure(TARGET) for _ in range(3)]
+
+    assert median_total_ms(runs, TARGET) < BUDGET_MS
+    assert eager_lazy_modules(runs[-1]) == []
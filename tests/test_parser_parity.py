@@ -0,0 +1,196 @@
+import json
+from pathlib import Path
+
+import pytest
+from benchmarks.parsers import EXTRACTORS
+from src.services.collector.parsers.executor import parse_page
+from src.services.collector.parsers.registry import PARSER_BACKENDS
+
+# Recorded pages, saved as <kind>*.html like the benchmark fixtures
+PAGES_DIR = Path(__file__).parent / "fixtures" / "pages"
+
+BASIC_DATA = json.dumps(
+    {
+        "@type": "LocalBusiness",
+        "name": "Café & Bar “Hanoi”",
+        "url": "/Attraction_Review-g293924-d1-Reviews.html",
+        "aggregateRating": {"ratingValue": "4.5", "reviewCount": 1234},
+        "description": "<b>Tags</b> &amp; entities stay as written",
+    }
+)
+
+
+def page(body: str, head: str = "") -> str:
+    return f"<!DOCTYPE html><html><head>{head}</head><body>{body}</body></html>"
+
+
+def review_card(
+    rate: str = "5,0 of 5 bubbles",
+    title: str = "<span>Great &amp; cheap</span>",
+    text: str = "<span>Lovely\n   place</span>",
+    trip_date: str = "Mar 2024 • Couples",
+    review_id: str = "",
+) -> str:
+    return (
+        f'<div data-automation="reviewCard"{review_id}>'
+        + (f'<svg><title id="lithium-1">{rate}</title></svg>' if rate else "")
+        + (
+            f'<a href="/ShowUserReviews-g293924-d1-r987654-Place.html">{title}</a>'
+            if title is not None
+            else ""
+        )
+        + (f'<div class="fIrGe _T">{text}</div>' if text is not None else "")
+        + (f'<div class="RpeCd">{trip_date}</div>' if trip_date is not None else "")
+        + "</div>"
+    )
+
+
+def hotel_review(
+    review_id: str = "111",
+    rate: str = "4,0 of 5 bubbles",
+    title: str = "<span><span>Quiet&nbsp;rooms</span></span>",
+    text: str = "<span>Clean</span><span> and <i>quiet</i></span>",
+    trip_date: str = "<span>Date of stay: June 2024</span>",
+) -> str:
+    return (
+        f'<div data-reviewid="{review_id}">'
+        + (
+            f'<div data-test-target="review-rating"><svg><title>{rate}</title>'
+            "</svg></div>"
+            if rate
+            else ""
+        )
+        + (
+            f'<div data-test-target="review-title"><a href="/ShowUserReviews">{title}'
+            "</a></div>"
+            if title
+            else ""
+        )
+        + f'<span data-automation="reviewText_0">{text}</span>'
+        + f'<div class="PDZqu">{trip_date}</div></div>'
+    )
+
+
+HANDCRAFTED = {
+    "attractions_search": {
+        "nested_tags_and_entities": page(
+            '<section class="mowmC" '
+            'data-automation="WebPresentation_SingleFlexCardSection">'
+            '<header class="VLKGO"><a href="/Attraction_Review-g293924-d1-Reviews-A.html">'
+            "<h3>1. Caf&eacute; &amp; <b>Bar</b><!-- promo --> Hanoi</h3></a>"
+            '<a href="/Attraction_Review-g293924-d1-Reviews.html#REVIEWS">12</a>'
+            "</header></section>"
+            '<section class="mowmC" '
+            'data-automation="WebPresentation_SingleFlexCardSection">'
+            '<header class="VLKGO"><a href="/Attraction_Review-g293924-d2-Reviews-B.html">'
+            "\n  <h3>2.\n   Old   Quarter</h3>\n</a></header></section>"
+            '<section data-automation="WebPresentation_WebSortDisclaimer">'
+            "<span>45 results match your filters</span></section>"
+            '<a aria-label="Next page" href="/Attractions-oa30.html?x=1&amp;y=2">'
+            "Next</a>"
+        ),
+    },
+    "hotels_search": {
+        "card_titles": page(
+            '<span class="listItem"><div data-automation="hotel-card-title">'
+            '<a href="/Hotel_Review-g293924-d1-Reviews-H.html">'
+            "<h3>1. H&ocirc;tel <em>du</em> Lac</h3></a></div></span>"
+            "<span>1,234 properties</span>"
+            '<a aria-label="Next page" href="/Hotels-oa30.html">Next</a>'
+        ),
+        "listing_title_fallback": page(
+            '<div class="listing_title"><a href="/Hotel_Review-g293924-d2-Reviews-H.html">'
+            "2. Lake&nbsp;View. Hotel</a></div>"
+            '<div class="listing_title"><span><a href="/Hotel_Review-x.html">'
+            "Not a direct child</a></span></div>"
+            "<span>12 properties</span>"
+            '<a aria-label="Next page" href="/Hotels-oa30.html">Next</a>'
+        ),
+    },
+    "restaurants_search": {
+        "cards_with_photo_and_review_links": page(
+            '<div data-automation="restaurantCard">'
+            '<a href="/Restaurant_Review-g293924-d1-Reviews-R.html"><img src="x.jpg"></a>'
+            '<div><a href="/Restaurant_Review-g293924-d1-Reviews-R.html">'
+            "<span>1.</span> Ph&#7903; <b>10</b></a></div>"
+            '<a href="/Restaurant_Review-g293924-d1-Reviews-R.html#REVIEWS">'
+            "321 reviews</a></div>"
+            '<div data-automation="restaurantCard">'
+            '<a href="/Restaurant_Review-g293924-d2-Reviews-R.html"><img src="y.jpg"></a>'
+            "</div>"
+            "<span>2,345 results</span>"
+            '<a aria-label="Next page" href="/Restaurants-oa30.html">Next</a>'
+        ),
+    },
+    "attraction_details": {
+        "missing_and_nested_fields": page(
+            '<div class="fIrGe _T">An <b>old</b> temple &amp; lake<!-- ad --></div>'
+            + review_card(review_id=' data-reviewid="555"')
+            + review_card(rate="", title=None, trip_date=None)
+            + review_card(
+                text="<span>First</span></div><div class='fIrGe _T'><span>second</span>",
+            )
+            + review_card(text=None, trip_date="Dec 2023"),
+            f'<script type="application/ld+json">{BASIC_DATA}</script>',
+        ),
+        "malformed_markup": page(
+            '<div class="fIrGe _T"><p>Unclosed <span>tags<p>everywhere</div>'
+            + review_card(text="<span>Broken <b>bold</span> text")
+            + '<div data-automation="reviewCard"><a href="/ShowUserReviews-r1">'
+            "No closing tags",
+            f'<script type="application/ld+json">{BASIC_DATA}</script>',
+        ),
+        "without_basic_data": page(review_card()),
+    },
+    "hotel_details": {
+        "missing_and_nested_fields": page(
+            '<div class="fIrGe _T">Rooms &amp; <i>suites</i></div>'
+            '<div data-test-target="amenity_text">Free <b>Wi-Fi</b></div>'
+            '<div data-test-target="amenity_pool">Pool&nbsp;</div>'
+            + hotel_review()
+            + hotel_review(review_id="222", rate="", title="")
+            + hotel_review(review_id="333", trip_date="")
+            + hotel_review(review_id="444", text="<span>&lt;3 &#x1F600;</span>"),
+            f'<script type="application/ld+json">{BASIC_DATA}</script>',
+        ),
+    },
+}
+# Restaurant pages use the same review cards as attractions
+HANDCRAFTED["restaurant_details"] = HANDCRAFTED["attraction_details"]
+
+
+def recorded_pages() -> list:
+    return [
+        pytest.param(kind, path.read_text(encoding="utf-8"), id=path.name)
+        for path in sorted(PAGES_DIR.glob("*.html"))
+        for kind in EXTRACTORS
+        if path.name.startswith(kind)
+    ]
+
+
+def handcrafted_pages() -> list:
+    return [
+        pytest.param(kind, html, id=f"{kind}-{name}")
+        for kind, pages in HANDCRAFTED.items()
+        for name, html in pages.items()
+    ]
+
+
+def assert_backends_agree(kind: str, html: str) -> None:
+    outputs = {
+        backend: parse_page(backend, html, EXTRACTORS[kind])
+        for backend in PARSER_BACKENDS
+    }
+    expected = outputs.pop("beautifulsoup")
+    for backend, output in outputs.items():
+        assert output == expected, f"{backend} differs from beautifulsoup on {kind}"
+
+
+@pytest.mark.parametrize(("kind", "html"), handcrafted_pages())
+def test_backends_agree_on_handcrafted_pages(kind: str, html: str) -> None:
+    assert_backends_agree(kind, html)
+
+
+@pytest.mark.parametrize(("kind", "html"), recorded_pages())
+def test_backends_agree_on_recorded_pages(kind: str, html: str) -> None:
+    assert_backends_agree(kind, html)
@@ -0,0 +1,53 @@
+from collections import Counter
+
+import pytest
+from src.services.collector.proxy_pool import ProxyPool
+
+PROXY_URLS = [f"http://127.0.0.1:{port}" for port in (8001, 8002, 8003)]
+
+
+async def fill_pool(pool: ProxyPool) -> None:
+    for _ in range(pool.size):
+        session = await pool.acquire()
+        pool.report(session, latency=0.1)
+
+
+@pytest.mark.anyio
+async def test_pick_rotates_over_healthy_sessions() -> None:
+    pool = ProxyPool(use_apify_proxies=False, proxy_urls=PROXY_URLS, size=3)
+    await fill_pool(pool)
+
+    picks = Counter()
+    for _ in range(600):
+        session = await pool.acquire()
+        pool.report(session, latency=0.1)
+        picks[session.url] += 1
+
+    assert set(picks) == set(PROXY_URLS)
+    assert min(picks.values()) > 100
+
+
+@pytest.mark.anyio
+async def test_pick_favours_healthy_sessions() -> None:
+    pool = ProxyPool(use_apify_proxies=False, proxy_urls=PROXY_URLS, size=3)
+    await fill_pool(pool)
+    failing = pool.sessions[0]
+    # Spread errors keep it in the pool, a run of max_errors would retire it
+    failing.requests, failing.errors = 10, 5
+
+    picks = Counter([(await pool.acquire()).session_id for _ in range(600)])
+
+    healthy = [session.session_id for session in pool.sessions[1:]]
+    assert all(picks[failing.session_id] < picks[key] for key in healthy)
+
+
+@pytest.mark.anyio
+async def test_pinned_session_is_reused_until_released() -> None:
+    pool = ProxyPool(use_apify_proxies=False, proxy_urls=PROXY_URLS, size=3)
+    await fill_pool(pool)
+
+    pinned = await pool.acquire("place")
+    assert all([await pool.acquire("place") is pinned for _ in range(20)])
+
+    pool.release("place")
+    assert "place" not in pool.pinned
@@ -0,0 +1,82 @@
+from pathlib import Path
+from typing import Optional
+
+import pytest
+from benchmarks.fixtures import load_fixtures
+from benchmarks.server import ServerProfile, StandInServer
+from src.schemas.collector.place import PlaceSchema
+from src.services.collector.place_types import PLACE_TYPES
+from src.services.collector.reviews_scraper import ReviewsScraper
+
+PLACE_PATHS = [
+    f"/Hotel_Review-g293924-d{place_id}-Reviews-Hotel_{place_id}.html"
+    for place_id in range(3)
+]
+
+
+async def scrape_places(
+    base_url: str, cache_mode: str, cache_path: Path, reviews_source: str
+) -> list[Optional[PlaceSchema]]:
+    scraper = ReviewsScraper(
+        use_apify_proxies=False,
+        requests_per_second=0,
+        max_retries=0,
+        cache_mode=cache_mode,
+        reviews_source=reviews_source,
+        base_url=base_url,
+        parser_backend="lxml",
+    )
+    scraper.response_cache.path = cache_path
+    async with scraper:
+        return [
+            await scraper.scrape_place_details(
+                PLACE_TYPES["hotels"], url_path=path, max_reviews_page=3
+            )
+            for path in PLACE_PATHS
+        ]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("reviews_source", ["html", "graphql"])
+async def test_replay_returns_the_cached_records(
+    tmp_path: Path, reviews_source: str
+) -> None:
+    cache_path = tmp_path / "responses.sqlite"
+    server = StandInServer(
+        load_fixtures(pages=2), ServerProfile(latency=0, jitter=0, seed=1)
+    )
+    await server.start()
+    try:
+        recorded = await scrape_places(
+            server.base_url, "on", cache_path, reviews_source
+        )
+    finally:
+        await server.stop()
+
+    assert all(place and place.reviews for place in recorded)
+
+    # The server is gone, every response has to come from the cache
+    replayed = await scrape_places(
+        server.base_url, "replay", cache_path, reviews_source
+    )
+
+    assert [place.model_dump() for place in replayed] == [
+        place.model_dump() for place in recorded
+    ]
+
+
+@pytest.mark.anyio
+async def test_replay_misses_are_not_fetched(tmp_path: Path) -> None:
+    server = StandInServer(
+        load_fixtures(pages=2), ServerProfile(latency=0, jitter=0, seed=1)
+    )
+    await server.start()
+    try:
+        [place, *_] = await scrape_places(
+            server.base_url, "replay", tmp_path / "responses.sqlite", "html"
+        )
+    finally:
+        await server.stop()
+
+    assert place is None
+    assert sum(server.requests.values()) == 0
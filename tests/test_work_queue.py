@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from src.services.collector.work_queue import (
+    LocalWorkQueue,
+    WorkItem,
+    create_work_queue,
+)
+
+
+def make_items(*ids: str) -> list[WorkItem]:
+    return [
+        WorkItem(id=item_id, kind="query", payload={"query": item_id})
+        for item_id in ids
+    ]
+
+
+@pytest.mark.anyio
+async def test_put_skips_items_seen_before() -> None:
+    queue = LocalWorkQueue()
+
+    assert await queue.put(make_items("a", "b")) == 2
+    assert await queue.put(make_items("b", "c")) == 1
+
+    leased = await queue.lease(count=10)
+    assert [item.id for item in leased] == ["a", "b", "c"]
+    for item in leased:
+        await queue.ack(item)
+    # Acked items stay seen, a later put does not bring them back
+    assert await queue.put(make_items("a")) == 0
+    assert await queue.is_drained()
+
+
+@pytest.mark.anyio
+async def test_nack_requeues_and_counts_attempts() -> None:
+    queue = LocalWorkQueue()
+    await queue.put(make_items("a"))
+
+    [item] = await queue.lease()
+    assert item.attempts == 1
+    assert not await queue.is_drained()
+
+    await queue.nack(item)
+    [item] = await queue.lease()
+    assert item.attempts == 2
+
+    await queue.ack(item)
+    assert await queue.lease() == []
+    assert await queue.is_drained()
+
+
+@pytest.mark.anyio
+async def test_expired_lease_is_requeued() -> None:
+    queue = LocalWorkQueue(lease_timeout=0.05)
+    await queue.put(make_items("a"))
+
+    [item] = await queue.lease()
+    assert await queue.lease() == []
+
+    await asyncio.sleep(0.1)
+    [retried] = await queue.lease()
+    assert retried.id == item.id
+    assert retried.attempts == 2
+
+
+@pytest.mark.anyio
+async def test_extend_keeps_the_lease() -> None:
+    queue = LocalWorkQueue(lease_timeout=0.1)
+    await queue.put(make_items("a"))
+
+    [item] = await queue.lease()
+    for _ in range(3):
+        await asyncio.sleep(0.05)
+        await queue.extend(item)
+        assert await queue.lease() == []
+
+
+@pytest.mark.anyio
+async def test_claim_is_taken_once() -> None:
+    queue = LocalWorkQueue()
+
+    assert not await queue.is_claimed("place:a")
+    assert await queue.claim("place:a")
+    assert not await queue.claim("place:a")
+    assert await queue.is_claimed("place:a")
+
+
+def test_create_work_queue_rejects_unknown_kinds() -> None:
+    assert isinstance(create_work_queue("local"), LocalWorkQueue)
+    with pytest.raises(ValueError, match="Redis URL"):
+        create_work_queue("redis")
+    with pytest.raises(ValueError, match="Unknown work queue"):
+        create_work_queue("off")